@@ -0,0 +1,31 @@
+"""Throughput of the numeric generators hot loops with every bit generator.
+
+    Both the raw draws of the ``random_generator`` and a full generator call (which also boxes the result to a tuple) are measured,
+    the difference between the bit generators shows in the raw draws.
+
+    Run from the repository root:
+
+    >>> python -m benchmarks.bit_generators
+"""
+from timeit import repeat
+from makedata.data_generators.BaseGenerators import BIT_GENERATORS
+from makedata.data_generators.numeric_generators.PrimitveNumerics import IntegerGenerator, FloatGenerator
+
+
+SAMPLES = 1_000_000
+REPEATS = 5
+
+
+def main():
+    print(f"{'generator':<18}{'bit generator':<14}{'raw M/s':>10}{'call M/s':>10}")
+    for generator_class, draw in ((IntegerGenerator, "integers"), (FloatGenerator, "uniform")):
+        for bit_generator in BIT_GENERATORS:
+            gen = generator_class(0, 1000, seed=42, bit_generator=bit_generator)
+            raw_draw = getattr(gen.random_generator, draw)
+            raw = min(repeat(lambda: raw_draw(0, 1000, size=SAMPLES), number=1, repeat=REPEATS))
+            call = min(repeat(lambda: gen(SAMPLES), number=1, repeat=REPEATS))
+            print(f"{generator_class.__name__:<18}{bit_generator:<14}{SAMPLES / raw / 1e6:>10.1f}{SAMPLES / call / 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
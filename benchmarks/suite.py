@@ -0,0 +1,272 @@
+"""Throughput, per-call latency and peak memory of every generator and of ``BaseModel`` with every output format, over sizes of k.
+
+    Every case is a fresh generator (or model) called with k samples, for k in powers of 10 up to 10**7.
+    A call is repeated until it ran for ``--min-time`` seconds, and the fastest of ``--repeats`` rounds is its latency.
+    The peak memory is the peak of the memory traced by ``tracemalloc`` (python and numpy allocations) during one more call.
+
+    The results are written as JSON, and can be compared against the results of a previous run (a baseline),
+    a case is a regression if it's latency grew by more than the threshold, which is set for all the cases and can be overwritten per case.
+
+    Run from the repository root:
+
+    >>> python -m benchmarks.suite -o results.json --max-k 100000
+    >>> python -m benchmarks.suite -o current.json --baseline results.json --threshold 0.2 --case-threshold NameGenerator=0.4
+
+    The command exits with status 1 if there are regressions, so it can be used as a CI gate.
+"""
+from argparse import ArgumentParser
+from datetime import datetime, timezone
+from tempfile import TemporaryDirectory
+from timeit import Timer
+from os.path import join as syspath_join
+import json
+import platform
+import sys
+import tracemalloc
+import numpy as np
+from makedata.data_generators.numeric_generators.PrimitveNumerics import IntegerGenerator, FloatGenerator
+from makedata.data_generators.numeric_generators.UniqueNumerics import UniqueIntegerGenerator
+from makedata.data_generators.formatted_generators.DateGenerator import DateGenerator
+from makedata.data_generators.formatted_generators.NameGenerator import NameGenerator
+from makedata.data_generators.formatted_generators.PatternGenerator import PatternGenerator
+from makedata.data_generators.formatted_generators.FormattedNumberGenerator import FormattedNumberGenerator
+from makedata.data_generators.formatted_generators.TextGenerator import TextGenerator
+from makedata.models.BaseModels import BaseModel
+from makedata.models.ModelFormats import ModelFormats
+
+
+# The version of the results file layout.
+RESULTS_VERSION = 1
+
+SEED = 42
+MAX_K = 10**7
+MIN_TIME = 0.2
+REPEATS = 3
+THRESHOLD = 0.2
+
+# The output formats of 'BaseModel' that build a row per sample in python, they are benchmarked up to this k by default.
+ROW_FORMATS_MAX_K = 10**6
+
+# The rate of the ordered 'DateGenerator' case, a century of it has about 3 * 10**7 events, more than a call of 'MAX_K' dates.
+ORDERED_DATES_RATE = 1e-2
+
+
+def _ordered_dates(gen, k):
+    """Generate k ordered dates from the start of the timeframe, so the repeated calls of a case never pass it's end."""
+    gen.current_time = 0.0
+    return gen(k, steps="s")
+
+
+def _model():
+    return BaseModel([UniqueIntegerGenerator(0, 10**12, name="id"),
+                        NameGenerator(locale="en_INTER", default_format_name="ffl", name="name"),
+                        IntegerGenerator(18, 90, name="age"),
+                        DateGenerator("1-1-1950", "31-12-2005", name="birthday")], seed=SEED)
+
+
+def build_cases(save_dir):
+    """The benchmark cases, as a mapping between every case's name and it's (factory, call, max_k).
+
+        ``factory()`` creates a fresh generator or model, ``call(subject, k)`` generates k samples with it.
+    """
+    cases = dict()
+    cases["IntegerGenerator"] = (lambda: IntegerGenerator(0, 10**6, seed=SEED), lambda gen, k: gen(k), MAX_K)
+    cases["FloatGenerator"] = (lambda: FloatGenerator(0, 1, seed=SEED), lambda gen, k: gen(k), MAX_K)
+    cases["IntegerGenerator[auto]"] = (lambda: IntegerGenerator(0, 100, dtype="auto", seed=SEED), lambda gen, k: gen(k), MAX_K)
+    cases["FloatGenerator[float32]"] = (lambda: FloatGenerator(0, 1, dtype="float32", seed=SEED), lambda gen, k: gen(k), MAX_K)
+    cases["UniqueIntegerGenerator"] = (lambda: UniqueIntegerGenerator(0, 10**12, seed=SEED), lambda gen, k: gen(k), MAX_K)
+
+    # Day steps generate dates, which have no timezone.
+    for steps, tz in (("D", None), ("s", None), ("s", "Asia/Jerusalem")):
+        cases[f"DateGenerator[steps={steps},tz={tz}]"] = (lambda: DateGenerator("1-1-2000", "31-12-2020", seed=SEED),
+                                                        lambda gen, k, steps=steps, tz=tz: gen(k, steps=steps, tzinfo=tz), MAX_K)
+    cases["DateGenerator[ordered]"] = (lambda: DateGenerator("1-1-2000", "31-12-2100", ordered=True, rate=ORDERED_DATES_RATE, seed=SEED),
+                                        _ordered_dates, MAX_K)
+
+    for format_name in NameGenerator.formats:
+        cases[f"NameGenerator[{format_name}]"] = (lambda: NameGenerator(locale="en_INTER", seed=SEED),
+                                                    lambda gen, k, format_name=format_name: gen(k, format_name=format_name), MAX_K)
+    for format_name in PatternGenerator.formats:
+        cases[f"PatternGenerator[{format_name}]"] = (lambda: PatternGenerator(seed=SEED),
+                                                    lambda gen, k, format_name=format_name: gen(k, format_name=format_name), MAX_K)
+    for format_name in ("default", "dollars", "accounting"):
+        cases[f"FormattedNumberGenerator[{format_name}]"] = (lambda: FormattedNumberGenerator(-10**6, 10**6, seed=SEED),
+                                                            lambda gen, k, format_name=format_name: gen(k, format_name=format_name), MAX_K)
+    cases["TextGenerator"] = (lambda: TextGenerator(seed=SEED), lambda gen, k: gen(k), MAX_K)
+
+    for return_type in (ModelFormats.DICT, ModelFormats.DF, ModelFormats.JSON, ModelFormats.SAVE_CSV, ModelFormats.SAVE_JSON, ModelFormats.SAVE_NDJSON):
+        save_path = syspath_join(save_dir, f"model.{return_type.value}")
+        max_k = ROW_FORMATS_MAX_K if return_type in (ModelFormats.DICT, ModelFormats.JSON, ModelFormats.SAVE_JSON) else MAX_K
+        cases[f"BaseModel[{return_type.name}]"] = (lambda: _model(),
+                                                    lambda model, k, return_type=return_type, save_path=save_path: model(k, return_type=return_type, save_path=save_path),
+                                                    max_k)
+    return cases
+
+
+def measure(factory, call, k, min_time=MIN_TIME, repeats=REPEATS):
+    """Measure one case with k samples.
+
+        Returns
+        -------
+        dict
+            The latency (the fastest and the median of the rounds, in seconds per call), the throughput (samples per second) and the peak memory (bytes).
+    """
+    subject = factory()
+    # A warm-up call, so loading sources and compiling formats is not measured.
+    call(subject, min(k, 1000))
+
+    # The number of calls in a round grows 10 times at a time, until a round takes 'min_time'.
+    timer = Timer(lambda: call(subject, k))
+    number = 1
+    elapsed = timer.timeit(number)
+    while elapsed < min_time:
+        number *= 10
+        elapsed = timer.timeit(number)
+    rounds = [elapsed / number]
+    while len(rounds) < repeats:
+        rounds.append(timer.timeit(number) / number)
+
+    tracemalloc.start()
+    try:
+        call(subject, k)
+        peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    seconds_per_call = min(rounds)
+    return {"k": k,
+            "seconds_per_call": seconds_per_call,
+            "median_seconds_per_call": float(np.median(rounds)),
+            "throughput": k / seconds_per_call,
+            "peak_memory": peak_memory}
+
+
+def run(sizes, case_filter=None, min_time=MIN_TIME, repeats=REPEATS, max_k=MAX_K, report=print):
+    """Run the benchmark cases.
+
+        Parameters
+        ----------
+        sizes : list of int
+            The values of k to run every case with.
+        case_filter : str, optional
+            Only run the cases whose name contains it.
+        min_time : float, optional
+            The minimal time (in seconds) of a round of calls.
+        repeats : int, optional
+            The maximal number of rounds.
+        max_k : int, optional
+            The largest k to run.
+        report : callable, optional
+            Called with a line of text after every measurement.
+
+        Returns
+        -------
+        dict
+            The results file content: the environment and the results, by '<case>/k=<k>'. The result of a failed case only has it's error.
+    """
+    results = dict()
+    with TemporaryDirectory() as save_dir:
+        for case_name, (factory, call, case_max_k) in build_cases(save_dir).items():
+            if case_filter is not None and case_filter not in case_name:
+                continue
+            for k in sizes:
+                if k > min(max_k, case_max_k):
+                    continue
+                # A failing case is recorded and skipped for the larger sizes, so it doesn't stop the rest of the suite.
+                try:
+                    result = measure(factory, call, k, min_time, repeats)
+                except Exception as error:
+                    results[f"{case_name}/k={k}"] = {"k": k, "error": f"{type(error).__name__}: {error}"}
+                    report(f"{case_name:<48}{k:>10}  failed, {type(error).__name__}: {error}")
+                    break
+                results[f"{case_name}/k={k}"] = result
+                report(f"{case_name:<48}{k:>10}{result['seconds_per_call'] * 1e3:>14.4f}{result['throughput']:>16,.0f}{result['peak_memory'] / 2**20:>12.2f}")
+
+    return {"version": RESULTS_VERSION,
+            "created": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "results": results}
+
+
+def compare(results, baseline, threshold=THRESHOLD, case_thresholds=None):
+    """Compare results against a baseline.
+
+        Parameters
+        ----------
+        results : dict
+            The results of ``run``.
+        baseline : dict
+            The results of a previous run.
+        threshold : float, optional
+            The allowed slowdown, as a fraction of the baseline latency (0.2 allows 20% slower).
+        case_thresholds : dict, optional
+            Thresholds that overwrite ``threshold`` for the cases whose name starts with the key, the longest key matching a case is used.
+
+        Returns
+        -------
+        list
+            A (key, baseline latency, latency, ratio, is regression) for every result that is in the baseline, failed cases are not compared.
+    """
+    case_thresholds = case_thresholds or dict()
+    comparison = []
+    for key, result in results["results"].items():
+        if key not in baseline["results"] or "error" in result or "error" in baseline["results"][key]:
+            continue
+        case_name = key.rsplit("/", 1)[0]
+        matching = [prefix for prefix in case_thresholds if case_name.startswith(prefix)]
+        allowed = case_thresholds[max(matching, key=len)] if matching else threshold
+
+        baseline_latency = baseline["results"][key]["seconds_per_call"]
+        ratio = result["seconds_per_call"] / baseline_latency
+        comparison.append((key, baseline_latency, result["seconds_per_call"], ratio, ratio > 1 + allowed))
+    return comparison
+
+
+def _parse_case_threshold(value):
+    prefix, separator, threshold = value.rpartition("=")
+    if not separator or not prefix:
+        raise ValueError(f"A case threshold has to be 'CASE=THRESHOLD', but is '{value}'.")
+    return prefix, float(threshold)
+
+
+def main(argv=None):
+    parser = ArgumentParser(description="Benchmark the generators and models of makedata.")
+    parser.add_argument("-o", "--output", default=None, help="A JSON file to write the results to.")
+    parser.add_argument("-b", "--baseline", default=None, help="A results file of a previous run to compare against.")
+    parser.add_argument("-t", "--threshold", type=float, default=THRESHOLD, help="The allowed slowdown, as a fraction of the baseline.")
+    parser.add_argument("--case-threshold", action="append", default=[], type=_parse_case_threshold,
+                        help="'CASE=THRESHOLD', the allowed slowdown of the cases whose name starts with CASE, can be repeated.")
+    parser.add_argument("-k", "--filter", default=None, help="Only run the cases whose name contains this.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=None, help="The values of k, by default the powers of 10 up to --max-k.")
+    parser.add_argument("--max-k", type=int, default=MAX_K, help="The largest k to run.")
+    parser.add_argument("--min-time", type=float, default=MIN_TIME, help="The minimal time of a round of calls, in seconds.")
+    parser.add_argument("--repeats", type=int, default=REPEATS, help="The maximal number of rounds.")
+    args = parser.parse_args(argv)
+
+    sizes = args.sizes if args.sizes is not None else [10**power for power in range(len(str(args.max_k)))]
+    print(f"{'case':<48}{'k':>10}{'ms/call':>14}{'samples/s':>16}{'peak MiB':>12}")
+    results = run(sorted(sizes), args.filter, args.min_time, args.repeats, args.max_k)
+
+    if args.output is not None:
+        with open(args.output, "w") as results_file:
+            json.dump(results, results_file, indent=1)
+
+    if args.baseline is None:
+        return 0
+    with open(args.baseline, "r") as baseline_file:
+        baseline = json.load(baseline_file)
+    comparison = compare(results, baseline, args.threshold, dict(args.case_threshold))
+
+    print(f"\n{'case':<60}{'baseline ms':>14}{'ms':>14}{'ratio':>8}")
+    regressions = 0
+    for key, baseline_latency, latency, ratio, is_regression in comparison:
+        regressions += is_regression
+        print(f"{key:<60}{baseline_latency * 1e3:>14.4f}{latency * 1e3:>14.4f}{ratio:>8.2f}{'  REGRESSION' if is_regression else ''}")
+    print(f"\n{regressions} regressions in {len(comparison)} compared results.")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
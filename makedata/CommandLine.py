@@ -0,0 +1,282 @@
+"""The ``makedata`` command: generate a dataset from a model spec, in chunks, to stdout or a file.
+
+    Usage example, 10 million rows of a model defined in a python module, in 4 processes:
+
+    $ makedata my_fixtures.people:personModel --rows 10000000 --seed 42 --format csv --workers 4 -o people.csv
+    10000000 rows in 12.31s (812,347 rows/sec), peak memory 181.2 MiB (workers 176.5 MiB), seed 42
+
+    The model can also be a .json or .toml spec file (see ``makedata.models.ModelSpecs.compile_spec``):
+
+    $ makedata people.toml --rows 10000000 --format ndjson --workers 4 -o people.ndjson
+"""
+from argparse import ArgumentParser
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from importlib import import_module
+from numpy.random import SeedSequence
+import sys
+import time
+import pandas as pd
+from .models.BaseModels import BaseModel
+from .models.ModelSpecs import GenerationPlan, compile_spec
+from . import Instrumentation
+
+try:
+    import resource
+except ImportError:
+    # Not available on windows, where the peak memory is not reported.
+    resource = None
+
+
+# The output formats of the command, every chunk is rendered to text in one of them.
+OUTPUT_FORMATS = ("csv", "ndjson")
+
+# How many chunks every worker process may have generated ahead of the writer.
+CHUNKS_AHEAD_PER_WORKER = 2
+
+# The extensions of spec files, any other model spec is 'module:attribute'.
+SPEC_FILE_EXTENSIONS = (".json", ".toml")
+
+# The model of a worker process, loaded once by '_init_worker'.
+_worker_model = None
+
+
+def is_spec_file(spec):
+    """True if a model spec is the path of a .json or .toml spec file."""
+    return spec.lower().endswith(SPEC_FILE_EXTENSIONS)
+
+
+def load_model(spec):
+    """Load the model a spec refers to.
+
+        Parameters
+        ----------
+        spec : str
+            | The path of a .json or .toml spec file (compiled with ``compile_spec``),
+            | or 'module:attribute', where the attribute (can be dotted) is a ``BaseModel``, or a callable that returns one.
+
+        Returns
+        -------
+        BaseModel
+            The model.
+
+        Raises
+        ------
+        ValueError
+            If the spec is malformed or doesn't refer to a ``BaseModel``.
+    """
+    if is_spec_file(spec):
+        return compile_spec(spec).model()
+
+    module_name, separator, attribute_path = spec.partition(":")
+    if not separator or not module_name or not attribute_path:
+        raise ValueError(f"The model spec '{spec}' has to be 'module:attribute'.")
+
+    model = import_module(module_name)
+    for attribute in attribute_path.split("."):
+        model = getattr(model, attribute)
+    if callable(model) and not isinstance(model, BaseModel):
+        model = model()
+    if not isinstance(model, BaseModel):
+        raise ValueError(f"The model spec '{spec}' refers to a '{type(model).__name__}', not a 'BaseModel'.")
+    return model
+
+
+def render_chunk(model, start, stop, output_format, index_key=None):
+    """Generate the rows [start, stop) of a model's position-addressable stream, rendered as text.
+
+        A model with constraints, unique columns or ordered generators can't address it's rows by position, it generates it's next ``stop - start`` rows instead.
+
+        Parameters
+        ----------
+        model : BaseModel
+            The model to generate with.
+        start : int
+            The position of the first row.
+        stop : int
+            The position after the last row.
+        output_format : str
+            One of ``OUTPUT_FORMATS``, a csv chunk starting at row 0 has a header.
+        index_key : str, optional
+            A name of a generator to use as the index.
+
+        Returns
+        -------
+        str
+            The rendered rows.
+    """
+    if model.position_addressable:
+        generated_data = model.generate_range(start, stop, split_samples=False)
+    else:
+        generated_data = model._generate_columns(stop - start, index_key)
+    if output_format == "csv":
+        return BaseModel._data_frame(generated_data, index_key, first_index=start).to_csv(header=start == 0)
+
+    lines = pd.DataFrame.from_dict(generated_data).to_json(orient="records", lines=True, force_ascii=False)
+    return lines if not lines or lines.endswith("\n") else lines + "\n"
+
+
+def _init_worker(source, seed):
+    global _worker_model
+    # A compiled plan is sent as is, so the worker doesn't read the spec or it's sources.
+    _worker_model = source.model() if isinstance(source, GenerationPlan) else load_model(source)
+    if seed is not None:
+        _worker_model.reset_seeds(seed)
+
+
+def _render_worker_chunk(start, stop, output_format, index_key):
+    return render_chunk(_worker_model, start, stop, output_format, index_key)
+
+
+def _write(output, text, rows):
+    """Write rendered rows, counting them for the active ``MetricsRegistry``."""
+    output.write(text)
+    registry = Instrumentation.active_registry
+    if registry is not None:
+        sink = getattr(output, "name", "output")
+        registry.add_count(sink, "rows", rows)
+        registry.add_count(sink, "bytes", len(text.encode("utf-8")))
+
+
+def _peak_memory():
+    """The peak resident memory (in MiB) of this process and of it's largest finished child, None if it can't be measured."""
+    if resource is None:
+        return None, None
+    # 'ru_maxrss' is in KiB on linux, and in bytes on macOS.
+    unit = 1 if sys.platform == "darwin" else 1024
+    to_mib = lambda usage: usage.ru_maxrss * unit / 2**20
+    return to_mib(resource.getrusage(resource.RUSAGE_SELF)), to_mib(resource.getrusage(resource.RUSAGE_CHILDREN))
+
+
+def generate(spec, rows, output, seed=None, output_format="csv", chunk_size=10**5, workers=1, index_key=None):
+    """Generate ``rows`` rows of a model spec, and write them in order to ``output``.
+
+        The rows are the first ``rows`` rows of the model's position-addressable stream, generated in chunks,
+        so the output is the same for any ``chunk_size`` and number of ``workers``.
+        A model with constraints, unique columns or ordered generators generates it's rows one chunk after the other instead, in a single process.
+
+        Parameters
+        ----------
+        spec : str
+            The model spec, see ``load_model``.
+        rows : int
+            How many rows to generate.
+        output : file object
+            A text file to write to.
+        seed : int, optional
+            | A seed for the model, overwriting the seeds of it's generators.
+            | If not given and the model has no seed, a seed is drawn, so the run can be reproduced.
+        output_format : str, optional
+            One of ``OUTPUT_FORMATS``.
+        chunk_size : int, optional
+            How many rows to generate at a time.
+        workers : int, optional
+            | How many processes to generate in, every process loads the spec.
+            | A spec file is compiled once, and it's plan is sent to the processes with it's sources in shared memory.
+        index_key : str, optional
+            A name of a generator to use as the index, if not given the ``index_key`` of a spec file is used.
+
+        Returns
+        -------
+        int or None
+            The seed used, None if the model's own seeds were used.
+
+        Raises
+        ------
+        ValueError
+            If the arguments are invalid, or ``workers`` is bigger than 1 for a model with constraints, unique columns or ordered generators.
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"'output_format' has to be one of {OUTPUT_FORMATS}, but is '{output_format}'.")
+    if chunk_size < 1 or workers < 1:
+        raise ValueError("'chunk_size' and 'workers' have to be positive integers.")
+
+    plan = compile_spec(spec) if is_spec_file(spec) else None
+    model = plan.model() if plan is not None else load_model(spec)
+    if index_key is None and plan is not None:
+        index_key = plan.index_key
+    if workers > 1 and not model.position_addressable:
+        raise ValueError(f"The model '{model.name}' has constraints, unique columns or ordered generators, so it's chunks depend on each other and it can only use 1 worker.")
+    if seed is None and model.seed_sequence is None:
+        seed = SeedSequence().entropy
+    if seed is not None:
+        model.reset_seeds(seed)
+
+    chunks = [(start, min(start + chunk_size, rows)) for start in range(0, rows, chunk_size)]
+    if workers == 1:
+        for start, stop in chunks:
+            _write(output, render_chunk(model, start, stop, output_format, index_key), stop - start)
+        return seed
+
+    # The plan of compile_spec is cached, so the sources of a copy of it are shared.
+    if plan is not None:
+        plan = plan.copy()
+        plan.share_data()
+    try:
+        # A bounded window of chunks is generated ahead, and they are written in order.
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(plan if plan is not None else spec, seed)) as executor:
+            pending = deque()
+            for start, stop in chunks:
+                pending.append((executor.submit(_render_worker_chunk, start, stop, output_format, index_key), stop - start))
+                if len(pending) >= workers * CHUNKS_AHEAD_PER_WORKER:
+                    future, rows = pending.popleft()
+                    _write(output, future.result(), rows)
+            while pending:
+                future, rows = pending.popleft()
+                _write(output, future.result(), rows)
+    finally:
+        if plan is not None:
+            plan.unshare_data()
+    return seed
+
+
+def main(argv=None):
+    """The entry point of the ``makedata`` command."""
+    parser = ArgumentParser(prog="makedata", description="Generate a dataset from a makedata model.")
+    parser.add_argument("spec", help="The model, a .json/.toml spec file or 'module:attribute' of a BaseModel (or of a function that returns one).")
+    parser.add_argument("-n", "--rows", type=int, required=True, help="How many rows to generate.")
+    parser.add_argument("-s", "--seed", type=int, default=None, help="A seed for the model, if not given the model's seeds are used (or a new seed is drawn).")
+    parser.add_argument("-f", "--format", choices=OUTPUT_FORMATS, default="csv", help="The output format.")
+    parser.add_argument("-o", "--output", default="-", help="The output file, '-' for stdout.")
+    parser.add_argument("-c", "--chunk-size", type=int, default=10**5, help="How many rows to generate at a time.")
+    parser.add_argument("-w", "--workers", type=int, default=1, help="How many processes to generate in.")
+    parser.add_argument("-i", "--index-key", default=None, help="A name of a generator to use as the index, by default the spec file's index_key.")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Don't report the throughput and peak memory.")
+    parser.add_argument("-m", "--metrics", choices=("text", "json"), default=None,
+                        help="Report the time of every column and phase, and the bytes written (the generation in worker processes is not included).")
+    parser.add_argument("--trace-memory", action="store_true", help="With --metrics, also report the peak memory of every column (slower).")
+    args = parser.parse_args(argv)
+
+    registry = Instrumentation.MetricsRegistry(args.trace_memory) if args.metrics is not None else None
+    started = time.perf_counter()
+    try:
+        with Instrumentation.instrument(registry) if registry is not None else nullcontext():
+            if args.output == "-":
+                seed = generate(args.spec, args.rows, sys.stdout, args.seed, args.format, args.chunk_size, args.workers, args.index_key)
+                sys.stdout.flush()
+            else:
+                with open(args.output, "w", encoding="utf-8", newline="") as output:
+                    seed = generate(args.spec, args.rows, output, args.seed, args.format, args.chunk_size, args.workers, args.index_key)
+    except (ValueError, ImportError, AttributeError) as error:
+        parser.exit(2, f"makedata: error: {error}\n")
+    elapsed = time.perf_counter() - started
+
+    if registry is not None:
+        print(registry.report(args.metrics), file=sys.stderr)
+
+    if not args.quiet:
+        report = f"{args.rows} rows in {elapsed:.2f}s ({args.rows / elapsed:,.0f} rows/sec)"
+        peak_memory, workers_peak_memory = _peak_memory()
+        if peak_memory is not None:
+            report += f", peak memory {peak_memory:.1f} MiB"
+            if args.workers > 1:
+                report += f" (workers {workers_peak_memory:.1f} MiB)"
+        if seed is not None:
+            report += f", seed {seed}"
+        print(report, file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
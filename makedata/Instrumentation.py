@@ -0,0 +1,317 @@
+"""Instrumentation of the generation hot path: where the time, the rows and the memory of a generation go.
+
+    Instrumentation is off unless a ``MetricsRegistry`` is active, and when it's off the hot path only checks ``active_registry``.
+    While a registry is active:
+
+    * Every generator call is timed, split to it's phases: sampling (drawing from the random generator),
+      formatting (rendering the samples to strings) and conversion (converting the result to a tuple).
+    * Every model generation is timed, split to generation (of the columns) and output (building the ``return_type``, or writing it).
+    * The rows and bytes emitted to every sink (a ``return_type``, or a file) are counted, and the rows the constraints of a model rejected.
+    * With ``trace_memory``, the peak memory traced by ``tracemalloc`` during the calls of every generator and model is kept.
+
+    Examples
+    --------
+    Finding the slow column of an export:
+
+    >>> from makedata.Instrumentation import instrument
+    >>> with instrument() as registry:
+    ...     personModel(10**5, return_type=ModelFormats.SAVE_CSV, save_path="people.csv")
+    >>> print(registry.report())
+    owner               calls     total s  sampling s  formatting s  conversion s  generation s    output s     samples        rows    rejected       bytes    peak MiB
+    FullName                1      0.2582      0.0053        0.2529             -             -           -      100000           -           -           -           -
+    Age                     1      0.0066      0.0009             -        0.0057             -           -      100000           -           -           -           -
+    Birthday                1      0.3485      0.0104        0.3364        0.0017             -           -      100000           -           -           -           -
+    PersonModel             1      0.8456           -             -             -        0.6150      0.2306           -      100000           -           -           -
+    people.csv              -           -           -             -             -             -           -           -      100000           -     3430701           -
+"""
+from collections import defaultdict
+from contextlib import contextmanager
+import json
+import threading
+import time
+import tracemalloc
+
+
+# The registry the hot path reports to, None while instrumentation is off.
+active_registry = None
+
+# The phases of a call, in the order they are reported.
+PHASES = ("sampling", "formatting", "conversion", "generation", "output")
+
+# The counters of every owner, in the order they are reported.
+COUNTERS = ("samples", "rows", "rejected", "bytes")
+
+
+class CallClock():
+    """The clock of one instrumented call, splitting it's time to phases.
+
+        The time since the previous lap is attributed to the open phase, which starts as the first phase of the call,
+        and is moved forward by ``lap``.
+    """
+    __slots__ = ("owner", "name", "started", "last", "open_phase", "phases", "memory_base", "memory_peak")
+
+    def __init__(self, owner, name, open_phase):
+        self.owner = owner
+        self.name = name
+        self.open_phase = open_phase
+        self.phases = dict()
+        self.started = self.last = time.perf_counter()
+        self.memory_base = 0
+        self.memory_peak = 0
+
+    def lap(self, phase=None, next_phase=None):
+        """Attribute the time since the previous lap to ``phase`` (the open phase by default), and open ``next_phase``."""
+        now = time.perf_counter()
+        phase = self.open_phase if phase is None else phase
+        self.phases[phase] = self.phases.get(phase, 0.0) + now - self.last
+        self.last = now
+        if next_phase is not None:
+            self.open_phase = next_phase
+
+
+class MetricsRegistry():
+    """Collects the timings, counters and memory peaks reported while it's active.
+
+        Parameters
+        ----------
+        trace_memory : bool, optional
+            If ``True``, keep the peak memory traced by ``tracemalloc`` during the calls of every owner.
+            Tracing makes every allocation slower, so it's off by default.
+
+        Attributes
+        ----------
+        trace_memory : bool
+            Whether the peak memory is traced.
+        timings : dict
+            A mapping between every (owner, phase) and it's [calls, seconds], where 'total' is the whole call.
+        counters : dict
+            A mapping between every (owner, counter) and it's value, e.g. ('people.csv', 'bytes').
+        memory_peaks : dict
+            A mapping between every owner and the peak memory (in bytes) traced in any of it's calls, above the memory traced when the call started.
+
+        See Also
+        --------
+        instrument : Activates a registry in a with statement.
+    """
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.timings = defaultdict(lambda: [0, 0.0])
+        self.counters = defaultdict(int)
+        self.memory_peaks = dict()
+        self._callbacks = []
+        self._lock = threading.Lock()
+        # Every thread has it's own stack of open calls, so the columns of a model can be generated concurrently.
+        self._local = threading.local()
+
+    def subscribe(self, callback):
+        """Call ``callback(owner, kind, name, value)`` on every report, where kind is 'timing', 'count' or 'memory'.
+
+            Parameters
+            ----------
+            callback : callable
+                The callback, called in the thread that reported.
+        """
+        self._callbacks.append(callback)
+
+    def unsubscribe(self, callback):
+        """Stop calling a subscribed callback."""
+        self._callbacks.remove(callback)
+
+    def add_timing(self, owner, phase, seconds, calls=1):
+        """Add a timing of an owner's phase."""
+        with self._lock:
+            timing = self.timings[(owner, phase)]
+            timing[0] += calls
+            timing[1] += seconds
+        for callback in self._callbacks:
+            callback(owner, "timing", phase, seconds)
+
+    def add_count(self, owner, counter, value):
+        """Add to a counter of an owner."""
+        with self._lock:
+            self.counters[(owner, counter)] += value
+        for callback in self._callbacks:
+            callback(owner, "count", counter, value)
+
+    def add_memory_peak(self, owner, peak):
+        """Keep the peak memory of an owner's call, if it's the highest so far."""
+        with self._lock:
+            self.memory_peaks[owner] = max(self.memory_peaks.get(owner, 0), peak)
+        for callback in self._callbacks:
+            callback(owner, "memory", "peak", peak)
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _fold_memory_peak(self, stack):
+        """Keep the traced peak in every open call, and reset it, so a nested call measures it's own peak."""
+        peak = tracemalloc.get_traced_memory()[1]
+        for clock in stack:
+            clock.memory_peak = max(clock.memory_peak, peak)
+        tracemalloc.reset_peak()
+
+    def start_call(self, owner, name, open_phase="sampling"):
+        """Open a call of ``owner`` (a generator or a model) on this thread.
+
+            Parameters
+            ----------
+            owner : object
+                The object whose call it is, only it's laps are attributed to the call.
+            name : str
+                The name the call is reported by.
+            open_phase : str, optional
+                The first phase of the call.
+        """
+        stack = self._stack()
+        clock = CallClock(owner, name, open_phase)
+        if self.trace_memory and tracemalloc.is_tracing():
+            self._fold_memory_peak(stack)
+            clock.memory_base = tracemalloc.get_traced_memory()[0]
+        stack.append(clock)
+
+    def current_call(self, owner):
+        """The open call of ``owner`` on this thread, None if the innermost open call is not it's."""
+        stack = self._stack()
+        if stack and stack[-1].owner is owner:
+            return stack[-1]
+        return None
+
+    def lap(self, owner, phase=None, next_phase=None):
+        """Attribute the time since the previous lap of ``owner``'s open call to ``phase`` (see ``CallClock.lap``)."""
+        clock = self.current_call(owner)
+        if clock is not None:
+            clock.lap(phase, next_phase)
+
+    def end_call(self, owner):
+        """Close the open call of ``owner``, and report it's phases and it's total time."""
+        clock = self.current_call(owner)
+        if clock is None:
+            return
+        clock.lap()
+        stack = self._stack()
+        stack.pop()
+
+        for phase, seconds in clock.phases.items():
+            self.add_timing(clock.name, phase, seconds)
+        self.add_timing(clock.name, "total", clock.last - clock.started)
+        if self.trace_memory and tracemalloc.is_tracing():
+            self._fold_memory_peak(stack + [clock])
+            self.add_memory_peak(clock.name, max(clock.memory_peak - clock.memory_base, 0))
+
+    def timed_call(self, owner, name, samples, function, *args, **kwargs):
+        """Call ``function(*args, **kwargs)`` as a call of ``owner`` that generates ``samples`` samples, and return it's result."""
+        self.start_call(owner, name)
+        try:
+            result = function(*args, **kwargs)
+        finally:
+            self.end_call(owner)
+        self.add_count(name, "samples", samples)
+        return result
+
+    def snapshot(self):
+        """All the collected metrics, by owner.
+
+            Returns
+            -------
+            dict
+                A JSON serializable mapping between every owner and it's 'timings' ({phase: {'calls', 'seconds'}}),
+                'counters' ({counter: value}) and 'memory_peak' (bytes, if traced).
+        """
+        with self._lock:
+            owners = dict()
+            for (owner, phase), (calls, seconds) in self.timings.items():
+                owners.setdefault(owner, {"timings": dict(), "counters": dict()})["timings"][phase] = {"calls": calls, "seconds": seconds}
+            for (owner, counter), value in self.counters.items():
+                owners.setdefault(owner, {"timings": dict(), "counters": dict()})["counters"][counter] = value
+            for owner, peak in self.memory_peaks.items():
+                owners.setdefault(owner, {"timings": dict(), "counters": dict()})["memory_peak"] = peak
+        return owners
+
+    def report(self, report_format="text"):
+        """Render the collected metrics.
+
+            Parameters
+            ----------
+            report_format : str, optional
+                'text' for a table with a row per owner, or 'json' for the ``snapshot`` as JSON.
+
+            Returns
+            -------
+            str
+                The report.
+
+            Raises
+            ------
+            ValueError
+                If ``report_format`` is not 'text' or 'json'.
+        """
+        if report_format == "json":
+            return json.dumps(self.snapshot(), indent=1)
+        if report_format != "text":
+            raise ValueError(f"'report_format' has to be 'text' or 'json', but is '{report_format}'.")
+
+        columns = ["calls", "total s"] + [f"{phase} s" for phase in PHASES] + list(COUNTERS) + ["peak MiB"]
+        width = max([len("owner")] + [len(str(owner)) for owner in self.snapshot()]) + 2
+        lines = [f"{'owner':<{width}}" + "".join(f"{column:>{max(len(column) + 2, 12)}}" for column in columns)]
+        for owner, metrics in self.snapshot().items():
+            timings, counters = metrics["timings"], metrics["counters"]
+            values = [timings["total"]["calls"] if "total" in timings else None,
+                        timings["total"]["seconds"] if "total" in timings else None]
+            values += [timings[phase]["seconds"] if phase in timings else None for phase in PHASES]
+            values += [counters.get(counter) for counter in COUNTERS]
+            values.append(metrics["memory_peak"] / 2**20 if "memory_peak" in metrics else None)
+
+            cells = []
+            for column, value in zip(columns, values):
+                column_width = max(len(column) + 2, 12)
+                if value is None:
+                    cells.append(f"{'-':>{column_width}}")
+                elif isinstance(value, float):
+                    cells.append(f"{value:>{column_width}.4f}")
+                else:
+                    cells.append(f"{value:>{column_width}}")
+            lines.append(f"{str(owner):<{width}}" + "".join(cells))
+        return "\n".join(lines)
+
+    def reset(self):
+        """Remove all the collected metrics."""
+        with self._lock:
+            self.timings.clear()
+            self.counters.clear()
+            self.memory_peaks.clear()
+
+
+@contextmanager
+def instrument(registry=None, trace_memory=False):
+    """Activate a ``MetricsRegistry`` for the duration of a with statement, the previous one is restored after it.
+
+        Parameters
+        ----------
+        registry : MetricsRegistry, optional
+            The registry to activate, if not given a new one is created.
+        trace_memory : bool, optional
+            If a new registry is created, whether it traces the peak memory. ``tracemalloc`` is started if needed, and stopped after.
+
+        Yields
+        ------
+        MetricsRegistry
+            The active registry.
+    """
+    global active_registry
+    if registry is None:
+        registry = MetricsRegistry(trace_memory)
+    started_tracing = registry.trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+
+    previous_registry = active_registry
+    active_registry = registry
+    try:
+        yield registry
+    finally:
+        active_registry = previous_registry
+        if started_tracing:
+            tracemalloc.stop()
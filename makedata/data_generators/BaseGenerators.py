@@ -1,19 +1,192 @@
 from re import findall, compile as recompile
 from os.path import isfile, isdir, join as syspath_join
 from json import load as json_load
-from inspect import isfunction
-from numpy.random import default_rng
+from inspect import isfunction, ismethod, ismodule, isclass
+from numpy.random import Generator, SeedSequence, BitGenerator, PCG64, PCG64DXSM, SFC64, Philox, MT19937
 from .GeneratorDecorators import GeneratingFunction
 from collections import Counter
+from copy import copy
+from functools import lru_cache, partial
+from hashlib import sha256
+from math import ceil
 from .GeneratorExceptions import FormatError, EmptySourceError, NoDefaultFormatError, FormatNotFoundError
+from .TextSources import LineIndexedFile
+from .SharedSources import SharedPool
+from .UniquenessTrackers import hash_values
+from .. import Instrumentation
+import numpy as np
 from string import Formatter
 import os
+import asyncio
 from re import compile as recompile, match
 
 
 # This compiled regex is used to clean parameter names in 'FormattedGenerator' formats, such as param[0]->param.
 FORMAT_KEY_CLEANING = recompile(r"[a-zA-Z_][\d\w]*")
 
+# The bit generators a 'GeneratorObject' can use, by name.
+BIT_GENERATORS = {"PCG64": PCG64, "PCG64DXSM": PCG64DXSM, "SFC64": SFC64, "Philox": Philox, "MT19937": MT19937}
+
+
+# The spawn key branch used to derive the random generators of the blocks of a position-addressable stream ('generate_range').
+BLOCK_STREAM_KEY = 0xB10C
+
+# How many samples every block of a position-addressable stream has, by default.
+DEFAULT_BLOCK_SIZE = 4096
+
+# Attributes of a 'GeneratorObject' that are runtime state rather than a part of it's definition.
+RUNTIME_ATTRIBUTES = frozenset(("seed", "seed_sequence", "random_generator", "samples_generated", "data", "is_generated_name"))
+
+# How many times 'GeneratorObject.generate_unique' generates the samples that collided before giving up.
+UNIQUE_ATTEMPTS = 100
+
+# The most samples an attempt of 'GeneratorObject.generate_unique' generates, as a multiple of the samples still missing.
+UNIQUE_MAX_OVERSAMPLE = 100
+
+
+def _code_digest(code):
+    """The sha256 of a code object's bytecode, constants and names, with the digests of the code objects nested in it."""
+    code_hash = sha256(code.co_code)
+    for const in code.co_consts:
+        code_hash.update((_code_digest(const) if hasattr(const, "co_code") else repr(const)).encode("utf-8"))
+    code_hash.update(repr(code.co_names).encode("utf-8"))
+    return code_hash.hexdigest()
+
+
+def _global_names(code):
+    """The names a code object, and the code objects nested in it, may read from it's globals."""
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if hasattr(const, "co_code"):
+            names |= _global_names(const)
+    return names
+
+
+def _cell_contents(cell):
+    """The value of a closure cell, None if it wasn't assigned yet."""
+    try:
+        return cell.cell_contents
+    except ValueError:
+        return None
+
+
+def stable_value(value, _seen=frozenset()):
+    """Convert a value to a JSON serializable value that is the same in every process (no memory addresses).
+
+        A function is described by it's code and the values bound to it (defaults, closure and the globals it reads),
+        so two functions are the same value only if they compute the same thing, e.g. two lambdas of the same scope are different values.
+        The same goes for a bound method (it's function and object), a ``functools.partial`` and a callable object (it's class and attributes).
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return {"dtype": str(value.dtype), "shape": list(value.shape), "sha256": sha256(np.ascontiguousarray(value).tobytes()).hexdigest()} \
+                if value.dtype != object else [stable_value(item, _seen) for item in value.tolist()]
+    if ismodule(value):
+        return f"module {value.__name__}"
+    if isclass(value):
+        return f"{value.__module__}.{value.__qualname__}"
+
+    # Values that contain themselves (e.g. a recursive function) are described once.
+    if id(value) in _seen:
+        return "<recursion>"
+    _seen = _seen | {id(value)}
+    if isinstance(value, dict):
+        return {str(key): stable_value(item, _seen) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [stable_value(item, _seen) for item in value]
+    if isinstance(value, (set, frozenset)):
+        return sorted(repr(item) for item in value)
+    if isinstance(value, partial):
+        return {"partial": stable_value(value.func, _seen), "args": stable_value(value.args, _seen), "keywords": stable_value(value.keywords, _seen)}
+    if ismethod(value):
+        return {"method": stable_value(value.__func__, _seen), "self": stable_value(value.__self__, _seen)}
+    if isfunction(value):
+        code = value.__code__
+        global_names = sorted(name for name in _global_names(code) if name in value.__globals__)
+        return {"function": f"{value.__module__}.{value.__qualname__}",
+                "code": _code_digest(code),
+                "defaults": stable_value(value.__defaults__, _seen),
+                "kwdefaults": stable_value(value.__kwdefaults__, _seen),
+                "closure": [stable_value(_cell_contents(cell), _seen) for cell in value.__closure__ or ()],
+                "globals": {name: stable_value(value.__globals__[name], _seen) for name in global_names}}
+    if callable(value) and hasattr(value, "__dict__"):
+        return {"class": stable_value(type(value)), "attributes": stable_value(vars(value), _seen)}
+    if callable(value) and hasattr(value, "__qualname__"):
+        return f"{value.__module__}.{value.__qualname__}"
+    return repr(value)
+
+
+def column_tuple(array):
+    """A column array as a tuple of numpy scalars of it's dtype if it's numeric, like a generated column, and of python objects otherwise."""
+    array = np.asarray(array)
+    return tuple(array) if array.dtype.kind in "biuf" else tuple(array.tolist())
+
+
+@lru_cache(maxsize=None)
+def _file_hash(path, size, mtime_ns):
+    """The sha256 of a file, cached by it's size and modification time so every file is read once."""
+    file_hash = sha256()
+    with open(path, "rb") as source:
+        for block in iter(lambda: source.read(1 << 20), b""):
+            file_hash.update(block)
+    return file_hash.hexdigest()
+
+
+def file_hash(path):
+    """The sha256 of a file's content."""
+    stat = os.stat(path)
+    return _file_hash(os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+
+async def run_in_executor(executor, function, *args, **kwargs):
+    """Run a blocking function in an executor without blocking the event loop, and wait for it's result.
+
+        The function can't be stopped once it started, so if the waiting task is cancelled,
+        the cancellation takes effect only after the function returns, leaving the objects it changes (e.g. a random generator) in a consistent state.
+
+        Parameters
+        ----------
+        executor : concurrent.futures.Executor or None
+            The executor to run in, if None the event loop's default executor (a thread pool) is used.
+        function : callable
+            The blocking function.
+        *args
+            Variable length argument list, passed to ``function``.
+        **kwargs
+            Arbitrary keyword arguments, passed to ``function``.
+
+        Returns
+        -------
+        The result of ``function``.
+    """
+    future = asyncio.get_running_loop().run_in_executor(executor, partial(function, *args, **kwargs))
+    try:
+        return await asyncio.shield(future)
+    except asyncio.CancelledError:
+        await asyncio.wait({future})
+        raise
+
+
+def _jsonable_state(state):
+    """Convert the numpy arrays of a bit generator state to lists, so it can be saved as JSON (bit generators accept lists when restoring)."""
+    if isinstance(state, dict):
+        return {key: _jsonable_state(value) for key, value in state.items()}
+    if isinstance(state, np.ndarray):
+        return state.tolist()
+    return state
+
+
+def _sequence_state(seed_sequence):
+    """The parameters that recreate a ``numpy.random.SeedSequence``, as JSON serializable values."""
+    entropy = seed_sequence.entropy
+    return {"entropy": [int(word) for word in entropy] if isinstance(entropy, (list, tuple, np.ndarray)) else int(entropy),
+            "spawn_key": [int(word) for word in seed_sequence.spawn_key],
+            "pool_size": seed_sequence.pool_size,
+            "n_children_spawned": seed_sequence.n_children_spawned}
+
 
 class GeneratorObject():
     """The basic generator class.
@@ -29,19 +202,36 @@ class GeneratorObject():
 
         Parameters
         ----------
-        seed : int or float or str, optional
+        seed : None or int or array_like[ints] or numpy.random.SeedSequence, optional
             The random seed used to seed the ``random_generator`` of a ``GeneratorObject``.
         name : str, optional
             The name of a ``GeneratorObject``
+        bit_generator : str, optional
+            | The name of the bit generator of the ``random_generator``, one of ``BIT_GENERATORS``.
+            | If not given, ``default_bit_generator`` is used.
+        inputs : list of str, optional
+            | The names of other generators of the same model, whose columns this ``GeneratorObject`` takes as inputs.
+            | The model generates them first, and passes them as arrays in an ``inputs`` dict argument, by name.
 
         Attributes
         ----------
         generators_counter : collections.Counter
             A counter used to keep track of how many ``GeneratorObject`` of each type are created.
-        random_generator : numpy.random.default_rng
-            The random generator used by all of the inheriting classes (``numpy.random.default_rng``).
+        default_bit_generator : str
+            | The name of the bit generator used when none is given. 'PCG64' unless changed,
+            | e.g. ``GeneratorObject.default_bit_generator = "SFC64"`` for faster generation with every new ``GeneratorObject``.
+        random_generator : numpy.random.Generator
+            The random generator used by all of the inheriting classes.
+        seed_sequence : numpy.random.SeedSequence
+            The seed sequence the ``random_generator`` was seeded with, used to spawn independent shards.
+        bit_generator : str
+            The name of the bit generator of the ``random_generator``.
+        samples_generated : int
+            How many samples this ``GeneratorObject`` generated, a progress counter saved with it's state.
         name : str
             The name of a ``GeneratorObject``
+        inputs : tuple
+            The names of the columns this ``GeneratorObject`` takes as inputs, empty if it's independent.
         is_generated_name : bool
             True if the name was generated by the constructor, False if it was provided.
 
@@ -57,15 +247,13 @@ class GeneratorObject():
         names
     """
     generators_counter = Counter()
+    default_bit_generator = "PCG64"
 
-    def __init__(self, seed=None, name=None):
+    def __init__(self, seed=None, name=None, bit_generator=None, inputs=None):
 
-        self.seed = seed
-
-        if seed is not None:
-            self.random_generator = default_rng(seed)
-        else:
-            self.random_generator = default_rng()
+        self.reset_seed(seed, bit_generator)
+        self.samples_generated = 0
+        self.inputs = tuple(inputs) if inputs is not None else tuple()
 
         # If name is not provided - generate one based on the generator's type and the generators_counter value of it.
         my_type = self.__class__.__name__
@@ -77,7 +265,7 @@ class GeneratorObject():
             self.is_generated_name = True
         GeneratorObject.generators_counter[my_type] += 1
 
-    def reset_seed(self, seed):
+    def reset_seed(self, seed, bit_generator=None):
         """**Recreate** this ``GeneratorObject``'s ``random_generator`` with a seed.
 
             .. warning:: 
@@ -89,6 +277,13 @@ class GeneratorObject():
             ----------
             seed : None or int or array_like[ints] or numpy.random.SeedSequence, numpy.random.BitGenerator
                 The seed to set the new ``random_generator`` with.
+            bit_generator : str, optional
+                The name of the bit generator to use, one of ``BIT_GENERATORS``. If not given, keep the current one (or use ``default_bit_generator``).
+
+            Raises
+            ------
+            ValueError
+                If ``bit_generator`` is not one of ``BIT_GENERATORS``.
             
             Examples
             --------
@@ -103,7 +298,58 @@ class GeneratorObject():
             <numpy.random._pcg64.PCG64 object at 0x0000023CC54EAEB0>
         """
         self.seed = seed
-        self.random_generator = default_rng(seed)
+
+        # A given bit generator instance is used as is.
+        if isinstance(seed, BitGenerator):
+            self.bit_generator = seed.__class__.__name__
+            self.seed_sequence = seed.seed_seq
+            self.random_generator = Generator(seed)
+            return
+
+        if bit_generator is None:
+            bit_generator = getattr(self, "bit_generator", self.default_bit_generator)
+        if bit_generator not in BIT_GENERATORS:
+            raise ValueError(f"'bit_generator' has to be one of {tuple(BIT_GENERATORS)}, but is '{bit_generator}'.")
+
+        self.bit_generator = bit_generator
+        self.seed_sequence = seed if isinstance(seed, SeedSequence) else SeedSequence(seed)
+        self.random_generator = Generator(BIT_GENERATORS[bit_generator](self.seed_sequence))
+
+    def spawn_shards(self, n):
+        """Create n copies of this ``GeneratorObject``, each with an independent ``random_generator`` spawned from ``seed_sequence``.
+
+            Use the shards to generate parts of the same column in parallel (e.g. one shard per process),
+            the shards are reproducible from the seed of this ``GeneratorObject`` and never overlap with each other or with it.
+
+            .. note::
+                The shards are shallow copies, they share their source data and formats with this ``GeneratorObject``.
+
+            Parameters
+            ----------
+            n : int
+                How many shards to create.
+
+            Returns
+            -------
+            list
+                The n shards.
+
+            Examples
+            --------
+            Splitting an ``IntegerGenerator`` to 2 shards:
+
+            >>> from makedata.data_generators.numeric_generators.PrimitveNumerics import IntegerGenerator
+            >>> gen = IntegerGenerator(0, 100, seed=42)
+            >>> first, second = gen.spawn_shards(2)
+            >>> first(3), second(3)
+            ((49, 91, 58), (7, 46, 18))
+        """
+        shards = []
+        for shard_seed in self.seed_sequence.spawn(n):
+            shard = copy(self)
+            shard.reset_seed(shard_seed, self.bit_generator)
+            shards.append(shard)
+        return shards
                         
     @GeneratingFunction
     def __call__(self, k, *args, **kwargs):
@@ -139,7 +385,248 @@ class GeneratorObject():
             >>> gen(5)
             [-5, 2, 1, -1, -1]
         """
-        return self._preprocess_data(k, *args, **kwargs)
+        registry = Instrumentation.active_registry
+        if registry is None:
+            generated_data = self._preprocess_data(k, *args, **kwargs)
+        else:
+            generated_data = registry.timed_call(self, self.name, k, self._preprocess_data, k, *args, **kwargs)
+        self.samples_generated += k
+        return generated_data
+
+    def _end_sampling(self):
+        """Mark the end of the sampling phase of the current call (the rest is formatting), for the active ``MetricsRegistry``."""
+        registry = Instrumentation.active_registry
+        if registry is not None:
+            registry.lap(self, "sampling", next_phase="formatting")
+
+    def generate_unique(self, k, tracker, *args, attempts=UNIQUE_ATTEMPTS, **kwargs):
+        """Generate k samples that were never generated with ``tracker`` before, and add them to it.
+
+            The samples are checked against the tracker in one vectorized step, and only the samples that collided are generated again,
+            so keeping a column unique across the chunks of an export costs about the collisions, not a set of every sample.
+
+            Parameters
+            ----------
+            k : int
+                Sample count to generate.
+            tracker : UniquenessTracker
+                The tracker of the samples generated so far.
+            attempts : int, optional
+                How many times to generate the samples that collided, before raising an exception.
+            *args
+                Variable length argument list, passed to the call.
+            **kwargs
+                Arbitrary keyword arguments, passed to the call.
+
+            Returns
+            -------
+            tuple
+                The samples, the samples of the first attempt that didn't collide first.
+
+            Raises
+            ------
+            IndexError
+                If k new samples weren't generated in ``attempts`` attempts, e.g. because the generator ran out of values.
+
+            See Also
+            --------
+            makedata.data_generators.UniquenessTrackers.UniquenessTracker : Tracks values in bounded memory.
+        """
+        parts = []
+        missing = k
+        drawn = 0
+        for _ in range(attempts):
+            if missing <= 0:
+                break
+            # As the tracker fills up fewer samples are new, so the missing samples are divided by the rate of new samples so far.
+            acceptance_rate = max(k - missing, 1) / drawn if drawn else 1.0
+            n = min(ceil(missing / acceptance_rate), missing * UNIQUE_MAX_OVERSAMPLE)
+            samples = np.asarray(self(n, *args, **kwargs))
+            # Only the samples that are used are added, the extra new samples are left for later calls.
+            new = tracker.check_and_add_keys(hash_values(samples), limit=missing)
+            parts.append(samples[new])
+            missing -= int(new.sum())
+            drawn += n
+        if missing > 0:
+            raise IndexError(f"Couldn't generate {k} unique samples with '{self.name}' in {attempts} attempts, {missing} are missing, " \
+                                "make sure it can generate enough values (has big enough range, big enough data source etc.)")
+        return column_tuple(np.concatenate(parts)) if parts else tuple()
+
+    async def agenerate(self, k, *args, executor=None, **kwargs):
+        """Generate k samples in an executor, the ``asyncio`` counterpart of calling this ``GeneratorObject``.
+
+            The event loop keeps running while the samples are generated, and the samples are the same the call would generate.
+
+            Parameters
+            ----------
+            k : int
+                Sample count to generate.
+            executor : concurrent.futures.Executor, optional
+                The executor to generate in, if not given the event loop's default executor is used.
+            *args
+                Variable length argument list, passed to the call.
+            **kwargs
+                Arbitrary keyword arguments, passed to the call.
+
+            Returns
+            -------
+            tuple
+                The samples.
+
+            Examples
+            --------
+            Generating integers in a request handler:
+
+            >>> gen = IntegerGenerator(0, 100, seed=42)
+            >>> await gen.agenerate(3)
+            (8, 77, 65)
+        """
+        return await run_in_executor(executor, self, k, *args, **kwargs)
+
+    def generate_range(self, start, stop, block_size=DEFAULT_BLOCK_SIZE, *args, inputs=None, **kwargs):
+        """Generate the samples in positions [start, stop) of this ``GeneratorObject``'s position-addressable stream.
+
+            The stream is split to blocks of ``block_size`` samples, and every block is generated with it's own random generator,
+            derived from ``seed_sequence`` and the block's number. So any range of the stream can be generated without generating what's before it,
+            and generating [0, k) and then [k, k+n) gives exactly the samples of [0, k+n).
+
+            .. note::
+                This stream is independent of the samples generated by calling the ``GeneratorObject``, and doesn't change it's ``random_generator``.
+                The same ``block_size`` has to be used for every range of a stream.
+
+            Parameters
+            ----------
+            start : int
+                The position of the first sample.
+            stop : int
+                The position after the last sample.
+            block_size : int, optional
+                How many samples every block of the stream has.
+            inputs : dict, optional
+                The input columns of the range (see ``inputs``), every block gets the part of them in it's positions.
+            *args
+                Variable length argument list, passed to the generation of every block.
+            **kwargs
+                Arbitrary keyword arguments, passed to the generation of every block.
+
+            Returns
+            -------
+            tuple
+                The ``stop - start`` samples.
+
+            Examples
+            --------
+            Continuing a stream of integers:
+
+            >>> from makedata.data_generators.numeric_generators.PrimitveNumerics import IntegerGenerator
+            >>> gen = IntegerGenerator(0, 100, seed=42)
+            >>> gen.generate_range(0, 5)
+            (55, 40, 89, 44, 48)
+            >>> gen.generate_range(0, 3) + gen.generate_range(3, 5)
+            (55, 40, 89, 44, 48)
+        """
+        if stop <= start:
+            return tuple()
+
+        if inputs is not None:
+            inputs = {name: np.asarray(column) for name, column in inputs.items()}
+
+        generated_data = []
+        random_generator = self.random_generator
+        blocks = range(start // block_size, (stop - 1) // block_size + 1)
+        try:
+            for block in blocks:
+                block_seed = SeedSequence(self.seed_sequence.entropy, spawn_key=tuple(self.seed_sequence.spawn_key) + (BLOCK_STREAM_KEY, block))
+                self.random_generator = Generator(BIT_GENERATORS[self.bit_generator](block_seed))
+                block_start = block * block_size
+                if inputs is not None:
+                    # The positions of the block outside of the range repeat the nearest input row, their samples are dropped.
+                    positions = np.clip(np.arange(block_start, block_start + block_size) - start, 0, stop - start - 1)
+                    kwargs["inputs"] = {name: column[positions] for name, column in inputs.items()}
+                block_data = self(block_size, *args, **kwargs)
+
+                generated_data.extend(block_data[max(start - block_start, 0):min(stop - block_start, block_size)])
+        finally:
+            self.random_generator = random_generator
+
+        # Whole blocks were generated, but only the samples of the range count.
+        dropped = len(blocks) * block_size - (stop - start)
+        self.samples_generated -= dropped
+        registry = Instrumentation.active_registry
+        if registry is not None:
+            registry.add_count(self.name, "samples", -dropped)
+        return tuple(generated_data)
+
+    @property
+    def position_addressable(self):
+        """Whether the samples of this ``GeneratorObject`` can be addressed by position (with ``generate_range``)."""
+        return True
+
+    def get_state(self):
+        """The state of this ``GeneratorObject``: it's ``random_generator`` state and seed sequence, and it's progress counter.
+
+            The state is JSON serializable, restoring it with ``set_state`` makes this ``GeneratorObject`` (or an identical one in another process)
+            continue generating exactly what it would have generated from the point the state was taken.
+
+            Returns
+            -------
+            dict
+                The state of this ``GeneratorObject``.
+
+            Examples
+            --------
+            Resuming a generator from a saved state:
+
+            >>> from makedata.data_generators.numeric_generators.PrimitveNumerics import IntegerGenerator
+            >>> gen = IntegerGenerator(0, 100, seed=42)
+            >>> state = gen.get_state()
+            >>> gen(3)
+            (8, 77, 65)
+            >>> gen.set_state(state)
+            >>> gen(3)
+            (8, 77, 65)
+        """
+        return {"name": self.name,
+                "bit_generator": self.bit_generator,
+                "random_state": _jsonable_state(self.random_generator.bit_generator.state),
+                "seed_sequence": _sequence_state(self.seed_sequence),
+                "samples_generated": self.samples_generated}
+
+    def get_definition(self):
+        """A description of what this ``GeneratorObject`` generates: it's type and parameters, without any runtime state.
+
+            Two ``GeneratorObject`` with the same definition and the same ``random_generator`` state generate the same data,
+            so the definition is used to identify generated data (e.g. by ``ModelCache``).
+
+            Returns
+            -------
+            dict
+                A JSON serializable definition.
+        """
+        definition = {key: stable_value(value) for key, value in vars(self).items() if not key.startswith("_") and key not in RUNTIME_ATTRIBUTES}
+        definition["class"] = stable_value(self.__class__)
+        return definition
+
+    def set_state(self, state):
+        """Restore a state taken with ``get_state``.
+
+            Parameters
+            ----------
+            state : dict
+                A state returned from ``get_state``.
+
+            Raises
+            ------
+            ValueError
+                If the bit generator of the state is not one of ``BIT_GENERATORS``.
+        """
+        # The random generator is recreated from the saved seed sequence (states saved before it was saved keep the current one),
+        # so anything derived from the seed sequence (e.g. the permutation of a 'UniqueIntegerGenerator') is restored too.
+        sequence_state = state.get("seed_sequence", _sequence_state(self.seed_sequence))
+        if state["bit_generator"] != self.bit_generator or sequence_state != _sequence_state(self.seed_sequence):
+            self.reset_seed(SeedSequence(**sequence_state), state["bit_generator"])
+        self.random_generator.bit_generator.state = state["random_state"]
+        self.samples_generated = state["samples_generated"]
 
     @GeneratingFunction
     def _data_generator(self, k, *args, **kwargs):
@@ -226,7 +713,7 @@ class FormattedGenerator(GeneratorObject):
             | A dictionary of the available formats for this ``GeneratorObject``,
             | where 'name_of_format': 'format' are the 'key':'value', respectively.
             | 'format' any string formatting you use.
-            | **Do not set a format manuallly e.g. ``GeneratorObject.formats["name"] = "format"``, it might break the integrity of the ``GeneratorObject``**
+            | **Do not set a format manuallly e.g. ``GeneratorObject.formats["name"] = "format"``, use ``add_format`` and ``remove_format``.**
         formats_symbols : dict, optional
             | A dictionary with a mapping between a symbol (abbreviation) of a format and it's full name.
             | Where 'symbol': 'name_of_format' are the 'key':'value', respectively.
@@ -241,15 +728,26 @@ class FormattedGenerator(GeneratorObject):
     def __init__(self, default_format=None, default_format_name=None, generate_format_symbols=False, default_must=False, ignore_errors=False, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
-        # Get the formats from the child class, to understand more, read about python inheritence and class attributes.
-        self.formats = getattr(self, "formats", dict())
+        # Get the formats and their symbols from the child class, to understand more, read about python inheritence and class attributes.
+        # They are copied into this instance's registry, so changing the formats of one generator never changes the class or other generators.
+        class_formats = getattr(self, "formats", dict())
+        class_formats_symbols = getattr(self, "formats_symbols", dict())
+
+        self.formats = dict()
+        self.formats_symbols = dict()
+        # The reverse of 'formats_symbols', a mapping between a format name and it's symbol.
+        self._names_symbols = dict()
+        # A mapping between every format name and symbol to it's format, so 'get_format' is a single lookup.
+        self._formats_lookup = dict()
+        # The compiled version of every format used by this generator, by the format.
+        self._compiled_formats = dict()
+        self._sorted_formats_names = None
+
+        for format_name, frmt in class_formats.items():
+            self.add_format(format_name, frmt)
+        for symbol, format_name in class_formats_symbols.items():
+            self._add_symbol(symbol, format_name)
 
-        # If in a child class, the formats dict contains the format name "default", raise an exception.
-        if "default" in self.formats:
-            raise ValueError("Can't use the name 'default' in the formats dict, it is a reserved name.")
-        
-        # Get the format symbols from the child class.
-        self.formats_symbols = getattr(self, "formats_symbols", dict())
         if generate_format_symbols:
             self._create_formats_symbols(ignore_errors)
 
@@ -289,11 +787,11 @@ class FormattedGenerator(GeneratorObject):
             ValueError
                 If a generated symbol already exists and 'ignore_errors' is ``False``.
         """
-        not_symbolised_formats = (f[0] for f in self.formats_names if f[1] == "")
+        not_symbolised_formats = [f[0] for f in self.formats_names if f[1] == ""]
         for frmt in not_symbolised_formats:
             symbol = "".join(s[0] for s in frmt.split("_"))
-            if symbol not in self.formats_symbols:
-                self.formats_symbols[symbol] = frmt
+            if symbol not in self._formats_lookup:
+                self._add_symbol(symbol, frmt)
             elif not ignore_errors:
                 # TODO maybe make it iterate for removing a single letter and checking agai, only if didn't find, generate error.
                 raise ValueError(f"Can't create symbol '{symbol}' for format '{frmt}' since a symbol like that already exists.")
@@ -318,16 +816,10 @@ class FormattedGenerator(GeneratorObject):
             ('init_male_first_and_last', 'imfl'), ('last_and_female_first', 'lff'), 
             ('last_and_male_first', 'lmf'), ('male_first_and_last', 'mfl')]
         """
-        f_names = []
-        for frmt in self.formats.keys():
-            try:
-                abrv_index = list(self.formats_symbols.values()).index(frmt)
-            except ValueError:
-                f_names.append((frmt, ""))
-                continue
-            symbol = list(self.formats_symbols.keys())[abrv_index]
-            f_names.append((frmt, symbol))
-        return sorted(f_names, key=lambda f: f[0])
+        # The sorted names are kept until the registry changes.
+        if self._sorted_formats_names is None:
+            self._sorted_formats_names = sorted((frmt, self._names_symbols.get(frmt, "")) for frmt in self.formats)
+        return list(self._sorted_formats_names)
 
     @property
     def formats_templates(self):
@@ -390,16 +882,139 @@ class FormattedGenerator(GeneratorObject):
                 return self.default_format
             except AttributeError:
                 raise NoDefaultFormatError(self)
-        
-        elif isinstance(name, str):
-            try:
-                if name in self.formats_symbols:
-                    name = self.formats_symbols[name]
-                return self.formats[name]
-            except KeyError:
-                raise FormatNotFoundError(name, self)
 
-        raise FormatNotFoundError(name, self)
+        try:
+            return self._formats_lookup[name]
+        except (KeyError, TypeError):
+            raise FormatNotFoundError(name, self)
+
+    def add_format(self, name, frmt, symbol=None):
+        """Validate, compile and add a format to this ``GeneratorObject``.
+
+            Parameters
+            ----------
+            name : str
+                The name of the new format.
+            frmt : str
+                The format.
+            symbol : str, optional
+                A symbol (abbreviation) for the new format.
+
+            Raises
+            ------
+            ValueError
+                If ``name`` or ``symbol`` is reserved or already used by another format or symbol.
+            FormatError
+                If ``frmt`` can't be compiled.
+
+            Examples
+            --------
+            Adding a format with a symbol to a ``NameGenerator``:
+
+            >>> from makedata.data_generators.formatted_generators.NameGenerator import NameGenerator
+            >>> gen = NameGenerator(locale="en_INTER", seed=42)
+            >>> gen.add_format("male_first_and_init_last", "{male_first_names} {last_names[0]}.", symbol="mfil")
+            >>> gen(2, "mfil")
+            ('Jace N.', 'Aryan H.')
+        """
+        if not isinstance(name, str):
+            raise TypeError(f"Format name '{name}' has to be an str, but is '{type(name)}'.")
+        if name == "default":
+            raise ValueError("Can't use the name 'default' for a format, it is a reserved name.")
+        if name in self._formats_lookup:
+            raise ValueError(f"Can't add format '{name}' since a format or a symbol with that name already exists.")
+
+        self._compiled_format(frmt)
+        self.formats[name] = frmt
+        self._formats_lookup[name] = frmt
+        self._sorted_formats_names = None
+
+        if symbol is not None:
+            self._add_symbol(symbol, name)
+
+    def remove_format(self, name):
+        """Remove a format (and it's symbol) from this ``GeneratorObject``.
+
+            Parameters
+            ----------
+            name : str
+                The name or the symbol of the format to remove.
+
+            Raises
+            ------
+            FormatNotFoundError
+                If no format corresponding the given name is found.
+        """
+        name = self.formats_symbols.get(name, name)
+        if name not in self.formats:
+            raise FormatNotFoundError(name, self)
+
+        del self.formats[name]
+        del self._formats_lookup[name]
+        symbol = self._names_symbols.pop(name, None)
+        if symbol is not None:
+            del self.formats_symbols[symbol]
+            del self._formats_lookup[symbol]
+        self._sorted_formats_names = None
+
+    def get_definition(self):
+        definition = super().get_definition()
+        definition["default_format"] = getattr(self, "default_format", None)
+        return definition
+
+    def _add_symbol(self, symbol, name):
+        """Set ``symbol`` as the symbol of the format ``name``.
+
+            Raises
+            ------
+            ValueError
+                If ``symbol`` is already used by a format or a symbol, if ``name`` already has a symbol or if ``name`` is not a format.
+        """
+        if name not in self.formats:
+            raise ValueError(f"Can't create symbol '{symbol}' for format '{name}' since no format with that name exists.")
+        if symbol == "default" or symbol in self._formats_lookup:
+            raise ValueError(f"Can't create symbol '{symbol}' for format '{name}' since a format or a symbol like that already exists.")
+        if name in self._names_symbols:
+            raise ValueError(f"Can't create symbol '{symbol}' for format '{name}' since it already has the symbol '{self._names_symbols[name]}'.")
+
+        self.formats_symbols[symbol] = name
+        self._names_symbols[name] = symbol
+        self._formats_lookup[symbol] = self.formats[name]
+        self._sorted_formats_names = None
+
+    def _compile_format(self, frmt):
+        """Validate a format and compile it to the form this ``GeneratorObject`` generates with.
+
+            Child classes that use a different formatting than ``str.format`` should overwrite this method.
+
+            Parameters
+            ----------
+            frmt : str
+                The format to compile.
+
+            Returns
+            -------
+            tuple
+                The parsed format, as returned from ``string.Formatter.parse``.
+
+            Raises
+            ------
+            FormatError
+                If ``frmt`` is not a valid format.
+        """
+        try:
+            return tuple(Formatter().parse(frmt))
+        except ValueError:
+            raise FormatError(frmt, self)
+
+    def _compiled_format(self, frmt):
+        """The compiled version of a format, compiled once and kept in the registry."""
+        try:
+            return self._compiled_formats[frmt]
+        except KeyError:
+            compiled = self._compile_format(frmt)
+            self._compiled_formats[frmt] = compiled
+            return compiled
 
     def _data_generator(self, k, format_used, *args, **kwargs):
         """formatted data generator
@@ -466,13 +1081,18 @@ class FileSourceGenerator(FormattedGenerator):
         ----------
         source_path : str
             The path to the source of the generator. The value is generated using file_path or locale.
+        file_parser : function
+            The parser used to read the source file.
         data : dict
-            The data used for generation.
+            | The data used for generation.
+            | It is loaded lazily on the first generation with a format, and only holds the keys referenced by the formats used so far.
 
         Raises
         ------
         ValueError
             If both or none of ``locale`` and ``file_path`` are used.
+        FileNotFoundError
+            If ``file_path`` doesn't exist.
             
         See Also
         --------
@@ -485,11 +1105,72 @@ class FileSourceGenerator(FormattedGenerator):
             self.source_path = file_path
         else:
             raise ValueError(f"File path has to be specified")
-        
+        if not os.path.exists(self.source_path):
+            raise FileNotFoundError(f"The source '{self.source_path}' doesn't exist.")
+
+        # The source is parsed lazily, only the keys referenced by the formats that are actually used are kept.
+        self.file_parser = file_parser
+        self.data = dict()
+
+    def _compile_format(self, frmt):
+        """Compile a format to the source keys it references.
+
+            Parameters
+            ----------
+            frmt : str
+                The format to extract the source keys from.
+
+            Returns
+            -------
+            tuple
+                The cleaned keys in the order they appear in the format, e.g. '{last_names} {male_first_names[0]}' -> ('last_names', 'male_first_names').
+
+            Raises
+            ------
+            FormatError
+                If ``frmt`` is not a valid format, or has a field that is not a source key (like '{}').
+        """
+        data_keys = []
+        for _, fname, _, _ in super()._compile_format(frmt):
+            if fname is None:
+                continue
+            key = match(FORMAT_KEY_CLEANING, fname)
+            if key is None:
+                raise FormatError(frmt, self)
+            data_keys.append(key[0])
+        return tuple(data_keys)
+
+    def _load_keys(self, keys):
+        """Load the given keys from the source file into ``data``, if they aren't loaded yet.
+
+            The whole file is parsed, but only the missing keys are kept, so ``data`` only holds what the used formats need.
+
+            Parameters
+            ----------
+            keys : iterable of str
+                The keys needed from the source.
+
+            Raises
+            ------
+            EmptySourceError
+                If the source file is empty.
+            KeyError
+                If a key doesn't exist in the source file.
+        """
+        missing_keys = [key for key in keys if key not in self.data]
+        if not missing_keys:
+            return
+
         with open(self.source_path, "r") as source:
-            self.data = file_parser(source)
-        if not self.data:
-            raise EmptySourceError()
+            parsed_source = self.file_parser(source)
+        if not parsed_source:
+            raise EmptySourceError(self)
+
+        for key in missing_keys:
+            try:
+                self.data[key] = np.array(parsed_source[key], dtype=object)
+            except KeyError:
+                raise KeyError(f"Key '{key}' doesn't exist in the source file '{self.source_path}'.")
 
     def _data_generator(self, k, format_used, *args, **kwargs):
         """Generate k samples with a given format.
@@ -513,12 +1194,13 @@ class FileSourceGenerator(FormattedGenerator):
         # TODO add choice for replacement for uniqueness
         generated_data = []
 
-        data_keys = [match(FORMAT_KEY_CLEANING, fname)[0] for _, fname, _, _ in Formatter().parse(format_used) if fname != ""]
+        data_keys = self._compiled_format(format_used)
 
         # Generating all values for the formatting.
         all_dataset = []
         for key in data_keys:
-            all_dataset.append(self.random_generator.choice(self.data[key], size=k))
+            all_dataset.append(self._sample_key(key, k))
+        self._end_sampling()
         
         # Formatting
         for data_point in zip(*all_dataset):
@@ -527,6 +1209,94 @@ class FileSourceGenerator(FormattedGenerator):
 
         return generated_data
 
+    def _source_files(self):
+        """The paths of the files this ``GeneratorObject`` draws data from."""
+        return [self.source_path]
+
+    def get_definition(self):
+        definition = super().get_definition()
+        # The sources are identified by their content, not by where they are.
+        del definition["source_path"]
+        definition["source_hashes"] = {os.path.basename(path): file_hash(path) for path in self._source_files()}
+        return definition
+
+    def _sample_key(self, key, k):
+        """Draw k values (with replacement) from the loaded source ``key``.
+
+            Parameters
+            ----------
+            key : str
+                The key in ``data`` to sample from.
+            k : int
+                How many samples to draw.
+
+            Returns
+            -------
+            array_like
+                The k drawn values.
+        """
+        pool = self.data[key]
+        return pool[self.random_generator.integers(0, len(pool), size=k)]
+
+    def _formats_keys(self):
+        """The source keys referenced by ``formats`` and the default format."""
+        templates = list(self.formats.values())
+        if self.has_default:
+            templates.append(self.default_format)
+        return {key for template in templates for key in self._compiled_format(template)}
+
+    def share_data(self, keys=None):
+        """Publish loaded source pools into shared memory, so ``multiprocessing`` workers attach to them instead of copying them.
+
+            Every published pool replaces it's key in ``data``, and pickles as it's shared memory name,
+            so sending this ``GeneratorObject`` to a worker is cheap regardless of the size of the source.
+
+            .. warning::
+                This ``GeneratorObject`` owns the published pools, call ``unshare_data`` once the workers are done with them.
+
+            Parameters
+            ----------
+            keys : iterable of str, optional
+                The keys to publish, they are loaded first if needed. If not given, every key referenced by ``formats`` and the default format is published.
+
+            Returns
+            -------
+            dict
+                The published ``SharedPool`` of every key.
+
+            Examples
+            --------
+            Generating names in a process pool, without sending the names lists to the workers:
+
+            >>> from multiprocessing import Pool
+            >>> from makedata.data_generators.formatted_generators.NameGenerator import NameGenerator
+            >>> gen = NameGenerator(locale="en_INTER", seed=42)
+            >>> pools = gen.share_data()
+            >>> with Pool(4) as pool:
+            ...     names = pool.starmap(NameGenerator.__call__, [(gen, 1000, "lmf")] * 4)
+            >>> gen.unshare_data()
+        """
+        if keys is None:
+            keys = self._formats_keys()
+        keys = sorted(keys)
+
+        self._load_keys(keys)
+        for key in keys:
+            if not isinstance(self.data[key], SharedPool):
+                pool = self.data[key]
+                self.data[key] = SharedPool.publish(pool[np.arange(len(pool))])
+        return {key: self.data[key] for key in keys}
+
+    def unshare_data(self):
+        """Destroy the shared pools published by this ``GeneratorObject``, they are loaded again from the source on the next use."""
+        for key, pool in list(self.data.items()):
+            if isinstance(pool, SharedPool):
+                if pool.is_owner:
+                    pool.unlink()
+                else:
+                    pool.close()
+                del self.data[key]
+
     def _preprocess_data(self, k, format_name="default", *args, **kwargs):
         """Get the generation format and call generator function.
 
@@ -549,7 +1319,7 @@ class FileSourceGenerator(FormattedGenerator):
             Raises
             ------
             EmptySourceError
-                If ``data`` is empty for some reason.
+                If the source file is empty for some reason.
 
             Examples
             --------
@@ -567,12 +1337,11 @@ class FileSourceGenerator(FormattedGenerator):
             >>> gen(5)
             ['Bodley Belle', 'Rumbley Ivy', 'Nettle Armani', 'Hickcox Alaina', 'Herbertson Arianna']
         """
-        if not self.data:
-            raise EmptySourceError()
-        
         # TODO maybe change format_used to formatting.
         format_used = self.get_format(format_name)
 
+        self._load_keys(self._compiled_format(format_used))
+
         return self._data_generator(k,format_used, *args, **kwargs)   
 
 class LocaleFileSourceGenerator(FileSourceGenerator):
@@ -611,7 +1380,7 @@ class LocaleFileSourceGenerator(FileSourceGenerator):
             self.locale = locale
 
             generator_name = self.__class__.__name__
-            source_path = syspath_join(os.path.normpath("makedata\data_generators\data_sources"), f"{generator_name}", f"{self.locale}.json")
+            source_path = syspath_join(os.path.dirname(__file__), "data_sources", f"{generator_name}", f"{self.locale}.json")
         else:
             raise TypeError(f"Locale '{locale}' has to be an str, but is '{type(locale)}''")
         
@@ -637,6 +1406,102 @@ class FromJSONGenerator(FileSourceGenerator):
     def __init__(self, *args, **kwargs):
         super().__init__(json_load, *args, **kwargs)
 
+class FromTextGenerator(FileSourceGenerator):
+    """A formatted generator that uses plain-text files, with one entry per line, for it's source.
+
+        The files are never loaded, every file is sampled through a ``LineIndexedFile``, which memory-maps it and reads only the drawn lines,
+        so huge word lists can be used as a source with O(k) memory.
+
+        The keys of the source are the names of the files without their extension,
+        so ``resources/text_files/names/en_US`` provides the keys 'female_first_names', 'last_names' and 'male_first_names'.
+
+        Parameters
+        ----------
+        file_path : str
+            The path to a text file, or to a directory of *.txt* files.
+        encoding : str, optional
+            The encoding of the text files.
+        index_dir : str, optional
+            A directory to save the line indexes in, ``makedata.data_generators.TextSources.INDEX_DIR`` by default.
+        persist_index : bool, optional
+            If ``False``, never save the line indexes to the disk.
+        *args
+            Variable length argument list.
+        **kwargs
+            Arbitrary keyword arguments.
+
+        Attributes
+        ----------
+        sources : dict
+            A mapping between every key and the path of it's text file.
+
+        See Also
+        --------
+        GeneratorObject  : All functinality derived from ``GeneratorObject``.
+        FormattedGenerator : All functinality derived from ``FormattedGenerator``.
+        FileSourceGenerator : All functinality derived from ``FileSourceGenerator``.
+        makedata.data_generators.TextSources.LineIndexedFile : The line-indexed text file every key is sampled from.
+
+        Examples
+        --------
+        Generating names from the plain-text name lists:
+
+        >>> from makedata.data_generators.BaseGenerators import FromTextGenerator
+        >>> gen = FromTextGenerator(file_path="resources/text_files/names/en_US", default_format="{male_first_names} {last_names}", seed=42)
+        >>> gen(3)
+        ('Jace Higgenbotham', 'Aryan Herold', 'Amos Stine')
+    """
+    def __init__(self, file_path, encoding="utf-8", index_dir=None, persist_index=True, *args, **kwargs):
+        super().__init__(LineIndexedFile, file_path, *args, **kwargs)
+        self.encoding = encoding
+        self.index_dir = index_dir
+        self.persist_index = persist_index
+
+        if isdir(self.source_path):
+            file_names = sorted(f for f in os.listdir(self.source_path) if f.endswith(".txt"))
+            self.sources = {os.path.splitext(f)[0]: syspath_join(self.source_path, f) for f in file_names}
+        else:
+            self.sources = {os.path.splitext(os.path.basename(self.source_path))[0]: self.source_path}
+        if not self.sources:
+            raise EmptySourceError(self)
+
+    def _source_files(self):
+        return list(self.sources.values())
+
+    def get_definition(self):
+        definition = super().get_definition()
+        for location_attribute in ("sources", "index_dir", "persist_index"):
+            del definition[location_attribute]
+        return definition
+
+    def _load_keys(self, keys):
+        """Open a ``LineIndexedFile`` for every key that isn't opened yet.
+
+            Parameters
+            ----------
+            keys : iterable of str
+                The keys needed from the source.
+
+            Raises
+            ------
+            EmptySourceError
+                If the file of a key has no entries.
+            KeyError
+                If there is no file for a key.
+        """
+        for key in keys:
+            if key in self.data:
+                continue
+            try:
+                source_file = self.sources[key]
+            except KeyError:
+                raise KeyError(f"Key '{key}' doesn't have a text file in the source '{self.source_path}'.")
+
+            lines = self.file_parser(source_file, encoding=self.encoding, index_dir=self.index_dir, persist_index=self.persist_index)
+            if len(lines) == 0:
+                raise EmptySourceError(self)
+            self.data[key] = lines
+
 class NumericGenerator(GeneratorObject):
     """A base class for all numeric ``GeneratorObject``.
 
@@ -1,3 +1,6 @@
+from .. import Instrumentation
+
+
 def GeneratingFunction(func):
     """Decorator to transform a ``GeneratorObject`` output to a tuple.
         
@@ -7,7 +10,19 @@ def GeneratingFunction(func):
     """
     def wrapper(*args, **kwargs):
         try:
-            result = tuple(func(*args, **kwargs))
+            registry = Instrumentation.active_registry
+            if registry is None:
+                result = tuple(func(*args, **kwargs))
+                return result
+
+            # Within an instrumented call of the generator, the conversion to a tuple is timed as it's own phase.
+            clock = registry.current_call(args[0]) if args else None
+            generated_data = func(*args, **kwargs)
+            if clock is not None:
+                clock.lap(next_phase="conversion")
+            result = tuple(generated_data)
+            if clock is not None:
+                clock.lap()
             return result
         except TypeError:
             raise TypeError(f"Method {func} has to return a result that can be used to generate a tuple such as an iterator or generator. " \
@@ -0,0 +1,148 @@
+from multiprocessing.shared_memory import SharedMemory
+import numpy as np
+
+
+# Every shared pool starts with it's entries count, followed by the (count + 1) offsets of the entries in the packed buffer.
+HEADER_DTYPE = np.uint64
+HEADER_ITEM_SIZE = np.dtype(HEADER_DTYPE).itemsize
+
+
+def _attach_shared_memory(name):
+    """Attach to an existing shared memory block, without making this process responsible for unlinking it."""
+    try:
+        return SharedMemory(name=name, track=False)
+    except TypeError:
+        # Before python 3.13 attaching always registers the block with the resource tracker.
+        # Workers share their parent's tracker, where the block is already registered, so it's left registered (unregistering would drop the owner's registration).
+        return SharedMemory(name=name)
+
+
+class SharedPool():
+    """A pool of strings published once into shared memory, that other processes can attach to by name.
+
+        The entries are packed into one utf-8 buffer, preceded by the offsets of every entry,
+        so attaching to a pool costs no copy of the entries, and pickling a pool only pickles it's name.
+        This is what makes it cheap to send a ``FileSourceGenerator`` with shared data to ``multiprocessing`` workers.
+
+        .. warning::
+            The process that published a pool owns it, and has to ``unlink`` it when it's no longer needed by any process.
+
+        Parameters
+        ----------
+        name : str
+            The name of the shared memory block of a published pool.
+
+        Attributes
+        ----------
+        name : str
+            The name of the shared memory block.
+        is_owner : bool
+            True if this pool was published by this object, meaning it's responsible for unlinking it.
+
+        Examples
+        --------
+        Publishing a pool and attaching to it (usually from another process):
+
+        >>> from makedata.data_generators.SharedSources import SharedPool
+        >>> pool = SharedPool.publish(["Liam", "Noah", "William"])
+        >>> attached = SharedPool(pool.name)
+        >>> attached[[2, 0]]
+        ['William', 'Liam']
+        >>> attached.close()
+        >>> pool.unlink()
+    """
+    def __init__(self, name, _shared_memory=None):
+        self.name = name
+        self.is_owner = _shared_memory is not None
+        self._shared_memory = _shared_memory if _shared_memory is not None else _attach_shared_memory(name)
+
+        count = int(np.frombuffer(self._shared_memory.buf, dtype=HEADER_DTYPE, count=1)[0])
+        self._offsets = np.frombuffer(self._shared_memory.buf, dtype=HEADER_DTYPE, count=count + 1, offset=HEADER_ITEM_SIZE)
+        self._entries_start = HEADER_ITEM_SIZE * (count + 2)
+
+    @classmethod
+    def publish(cls, values, name=None):
+        """Pack ``values`` into a new shared memory block.
+
+            Parameters
+            ----------
+            values : iterable of str
+                The entries of the pool.
+            name : str, optional
+                The name of the shared memory block, if not given a unique name is generated.
+
+            Returns
+            -------
+            SharedPool
+                The published pool, owning the shared memory block.
+
+            Raises
+            ------
+            ValueError
+                If ``values`` is empty.
+        """
+        encoded = [str(value).encode("utf-8") for value in values]
+        if not encoded:
+            raise ValueError("Can't publish an empty pool.")
+
+        offsets = np.zeros(len(encoded) + 1, dtype=HEADER_DTYPE)
+        np.cumsum(np.fromiter((len(value) for value in encoded), dtype=HEADER_DTYPE, count=len(encoded)), out=offsets[1:])
+        entries_start = HEADER_ITEM_SIZE * (len(encoded) + 2)
+
+        shared_memory = SharedMemory(name=name, create=True, size=entries_start + max(int(offsets[-1]), 1))
+        shared_memory.buf[:HEADER_ITEM_SIZE] = np.array([len(encoded)], dtype=HEADER_DTYPE).tobytes()
+        shared_memory.buf[HEADER_ITEM_SIZE:entries_start] = offsets.tobytes()
+        shared_memory.buf[entries_start:entries_start + int(offsets[-1])] = b"".join(encoded)
+
+        return cls(shared_memory.name, _shared_memory=shared_memory)
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, indices):
+        """Get the entries in the given positions.
+
+            Parameters
+            ----------
+            indices : int or array_like of ints
+                The positions of the entries to read.
+
+            Returns
+            -------
+            str or list
+                A single entry if ``indices`` is an int, else a list of the entries.
+        """
+        buffer = self._shared_memory.buf
+        entries_start = self._entries_start
+        if isinstance(indices, (int, np.integer)):
+            return bytes(buffer[entries_start + int(self._offsets[indices]):entries_start + int(self._offsets[indices + 1])]).decode("utf-8")
+
+        indices = np.asarray(indices)
+        starts = (self._offsets[indices] + entries_start).tolist()
+        ends = (self._offsets[indices + 1] + entries_start).tolist()
+        return [bytes(buffer[start:end]).decode("utf-8") for start, end in zip(starts, ends)]
+
+    def __reduce__(self):
+        # Only the name is pickled, the receiving process attaches to the block.
+        return (SharedPool, (self.name,))
+
+    def __del__(self):
+        # The views of the offsets have to be released before the block can be closed.
+        self.close()
+
+    def close(self):
+        """Detach this process from the pool."""
+        if getattr(self, "_shared_memory", None) is not None:
+            self._offsets = None
+            self._shared_memory.close()
+            self._shared_memory = None
+
+    def unlink(self):
+        """Detach from the pool and destroy it, should only be called by the owner, once no process uses it."""
+        shared_memory = self._shared_memory
+        self._offsets = None
+        self._shared_memory = None
+        if shared_memory is None:
+            shared_memory = SharedMemory(name=self.name)
+        shared_memory.close()
+        shared_memory.unlink()
@@ -0,0 +1,189 @@
+from os.path import abspath, basename, expanduser, isfile, join as syspath_join
+from glob import glob, escape as glob_escape
+from hashlib import sha256
+from mmap import mmap, ACCESS_READ
+import os
+import numpy as np
+
+
+# The size of the chunks the source file is scanned in when building a line index, so building it never holds the whole file.
+INDEX_CHUNK_SIZE = 1 << 26
+
+# The suffix of the name of a persistent line index.
+INDEX_SUFFIX = ".lineidx.npy"
+
+# The directory line indexes are saved in by default, a cache directory of the user, so the sources' directories (a package, a repository) are never written to.
+INDEX_DIR = syspath_join(os.environ.get("XDG_CACHE_HOME") or syspath_join(expanduser("~"), ".cache"), "makedata", "line_indices")
+
+
+class LineIndexedFile():
+    """A plain-text source with one entry per line, that is sampled without loading it.
+
+        A line-offset index (the start and end byte of every non-empty line) is built once and saved in ``index_dir``,
+        so the next time the file is used only the index is loaded, and it is memory-mapped as well.
+        The index is named after the file's path, size and modification time, so an index of a file that changed since is never loaded.
+        Entries are read by memory-mapping the file and slicing it at the offsets of the requested lines,
+        meaning sampling k entries costs O(k) memory, regardless of the file's size.
+
+        Parameters
+        ----------
+        path : str
+            The path to the text file.
+        encoding : str, optional
+            The encoding of the text file.
+        index_dir : str, optional
+            A directory to save the line index in, ``INDEX_DIR`` by default.
+        persist_index : bool, optional
+            If ``False``, never save the line index to the disk, build it in memory instead.
+
+        Attributes
+        ----------
+        path : str
+            The path to the text file.
+        encoding : str
+            The encoding of the text file.
+        index_dir : str
+            The directory of the persistent line index.
+        index_path : str
+            The path of the persistent line index of the file's current version.
+        offsets : numpy.ndarray
+            | An (n, 2) array of the start and end byte of every line.
+            | It is loaded (or built) on first use.
+
+        Examples
+        --------
+        Sampling 3 nouns from the vocabulary resources:
+
+        >>> from makedata.data_generators.TextSources import LineIndexedFile
+        >>> nouns = LineIndexedFile("makedata/data_generators/data_sources/TextGenerator/en_US/nouns.txt")
+        >>> len(nouns)
+        494
+        >>> nouns[[0, 1, 2]]
+        ['a bit', 'ab initio', 'abdicate']
+    """
+    def __init__(self, path, encoding="utf-8", index_dir=None, persist_index=True):
+        if not isfile(path):
+            raise FileNotFoundError(f"The source file '{path}' doesn't exist.")
+        self.path = path
+        self.encoding = encoding
+        self.persist_index = persist_index
+
+        self.index_dir = index_dir if index_dir is not None else INDEX_DIR
+        # Every source has it's own indexes, even if the names of the files are the same.
+        self._index_prefix = f"{basename(path)}.{sha256(abspath(path).encode('utf-8')).hexdigest()[:16]}"
+
+        self._offsets = None
+        self._mmap = None
+
+    @property
+    def index_path(self):
+        source_stat = os.stat(self.path)
+        return syspath_join(self.index_dir, f"{self._index_prefix}.{source_stat.st_size}.{source_stat.st_mtime_ns}{INDEX_SUFFIX}")
+
+    @property
+    def offsets(self):
+        if self._offsets is None:
+            self._offsets = self._load_index()
+        return self._offsets
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __getitem__(self, indices):
+        """Get the entries in the given line numbers.
+
+            Parameters
+            ----------
+            indices : int or array_like of ints
+                The line numbers (of the non-empty lines) to read.
+
+            Returns
+            -------
+            str or list
+                A single entry if ``indices`` is an int, else a list of the entries.
+        """
+        source = self._source()
+        if isinstance(indices, (int, np.integer)):
+            start, end = self.offsets[indices]
+            return source[start:end].decode(self.encoding)
+
+        encoding = self.encoding
+        return [source[start:end].decode(encoding) for start, end in self.offsets[np.asarray(indices)].tolist()]
+
+    def __getstate__(self):
+        # Memory maps can't be pickled, they are reopened on first use.
+        state = self.__dict__.copy()
+        state["_offsets"] = None
+        state["_mmap"] = None
+        return state
+
+    def _source(self):
+        """The memory-map of the text file, opened on first use."""
+        if self._mmap is None:
+            with open(self.path, "rb") as source:
+                self._mmap = mmap(source.fileno(), 0, access=ACCESS_READ)
+        return self._mmap
+
+    def _load_index(self):
+        """Load the persistent line index if it's up to date, else build it (and save it if ``persist_index``)."""
+        if os.path.getsize(self.path) == 0:
+            return np.empty((0, 2), dtype=np.uint64)
+
+        index_path = self.index_path
+        if isfile(index_path):
+            return np.load(index_path, mmap_mode="r")
+
+        offsets = self._build_index()
+        if self.persist_index:
+            # Write to a temporary file first, so a concurrent reader never loads a half written index.
+            temp_path = f"{index_path}.{os.getpid()}.tmp"
+            try:
+                os.makedirs(self.index_dir, exist_ok=True)
+                with open(temp_path, "wb") as index_file:
+                    np.save(index_file, offsets)
+                os.replace(temp_path, index_path)
+                # The indexes of the file's earlier versions are never loaded again.
+                for stale_path in glob(syspath_join(glob_escape(self.index_dir), f"{glob_escape(self._index_prefix)}.*{INDEX_SUFFIX}")):
+                    if stale_path != index_path:
+                        os.remove(stale_path)
+            except OSError:
+                # The index is only a cache, if it can't be saved (read only directory, etc.) just keep it in memory.
+                if isfile(temp_path):
+                    os.remove(temp_path)
+        return offsets
+
+    def _build_index(self):
+        """Scan the text file in chunks and find the start and end byte of every non-empty line.
+
+            Returns
+            -------
+            numpy.ndarray
+                An (n, 2) array of uint64, where every row is the [start, end) bytes of a line, excluding the line break.
+        """
+        source = self._source()
+        size = len(source)
+
+        newlines = []
+        for chunk_start in range(0, size, INDEX_CHUNK_SIZE):
+            chunk = np.frombuffer(source, dtype=np.uint8, count=min(INDEX_CHUNK_SIZE, size - chunk_start), offset=chunk_start)
+            newlines.append(np.flatnonzero(chunk == ord("\n")).astype(np.uint64) + chunk_start)
+            del chunk
+        newlines = np.concatenate(newlines)
+
+        starts = np.concatenate(([0], newlines + 1)).astype(np.uint64)
+        ends = np.concatenate((newlines, [size])).astype(np.uint64)
+
+        # Don't count a '\r' of a windows line break as a part of the line.
+        not_empty = ends > starts
+        last_bytes = np.zeros(len(ends), dtype=np.uint8)
+        last_bytes[not_empty] = np.frombuffer(source, dtype=np.uint8)[ends[not_empty].astype(np.int64) - 1]
+        ends[last_bytes == ord("\r")] -= 1
+
+        not_empty = ends > starts
+        return np.stack((starts[not_empty], ends[not_empty]), axis=1)
+
+    def close(self):
+        """Close the memory-map of the text file, it will be reopened if it's used again."""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
@@ -0,0 +1,280 @@
+from math import ceil, log
+from os.path import join as syspath_join
+import os
+import tempfile
+import numpy as np
+
+
+# The multipliers of the splitmix64 finalizer, that mixes the 64 bits of every key.
+MIX_MULTIPLIERS = (np.uint64(0xBF58476D1CE4E5B9), np.uint64(0x94D049BB133111EB))
+
+# The modes of a 'UniquenessTracker'.
+TRACKER_MODES = ("exact", "bloom")
+
+# How many keys an exact tracker keeps in memory by default, before spilling it's largest runs to disk (8 bytes each).
+MEMORY_KEYS = 2**24
+
+
+def _mix(keys):
+    """The splitmix64 finalizer of every key (an array of uint64)."""
+    keys = keys ^ (keys >> np.uint64(30))
+    keys *= MIX_MULTIPLIERS[0]
+    keys ^= keys >> np.uint64(27)
+    keys *= MIX_MULTIPLIERS[1]
+    return keys ^ (keys >> np.uint64(31))
+
+
+def hash_values(values):
+    """Hash every value to a fixed-width 64 bit key, in vectorized steps.
+
+        Integers and floats are hashed by their bits, any other value by the characters of it's string, 8 bytes at a time,
+        so the number of steps depends on the length of the longest string, not on the number of values.
+
+        Parameters
+        ----------
+        values : array_like
+            The values, of a single type.
+
+        Returns
+        -------
+        numpy.ndarray
+            A uint64 key for every value.
+    """
+    array = np.asarray(values)
+    if array.ndim != 1:
+        array = np.fromiter((str(value) for value in values), dtype=object, count=len(values))
+    if array.dtype.kind == "b":
+        array = array.astype(np.int64)
+    if array.dtype.kind in "iu":
+        return _mix(array.astype(np.int64).view(np.uint64))
+    if array.dtype.kind == "f":
+        # -0.0 and 0.0 are the same value.
+        return _mix((array.astype(np.float64) + 0.0).view(np.uint64))
+
+    array = np.ascontiguousarray(array.astype(str))
+    codes = array.view(np.uint32).reshape(len(array), -1)
+    if codes.shape[1] % 2:
+        codes = np.hstack([codes, np.zeros((len(array), 1), dtype=np.uint32)])
+    words = np.ascontiguousarray(codes).view(np.uint64)
+    lengths = np.char.str_len(array)
+    keys = _mix(lengths.astype(np.uint64))
+    # Only the words of every string are mixed, not the padding of the array, so a value has the same key in any array.
+    words_counts = (lengths + 1) // 2
+    for word in range(words.shape[1]):
+        keys = np.where(word < words_counts, _mix(keys + words[:, word]), keys)
+    return keys
+
+
+class UniquenessTracker():
+    """Tracks the values of a unique column across calls (e.g. the chunks of an export), in bounded memory.
+
+        Values are tracked by a 64 bit hash, checked and added in vectorized batches.
+        A tracker only ever errs by reporting a new value as seen (a hash collision, or a false positive of the Bloom filter),
+        which costs regenerating it, so the tracked values are always unique.
+
+        * 'exact' keeps the hashes in sorted runs, merged as they grow (8 bytes per value). With ``spill_dir``, once more than
+          ``memory_keys`` hashes are kept, the largest runs are written to disk and searched as memory-mapped files.
+        * 'bloom' keeps a Bloom filter sized for ``capacity`` values and ``error_rate`` false positives, about 1.2 bytes per value at 1%.
+
+        Parameters
+        ----------
+        mode : str, optional
+            'exact' or 'bloom'.
+        capacity : int, optional
+            The number of values a Bloom filter is sized for, it's error rate grows if more are added.
+        error_rate : float, optional
+            The false positive rate of a Bloom filter at ``capacity`` values.
+        spill_dir : str, optional
+            A directory for the spilled runs (or the Bloom filter's bits, as a memory-mapped file), a temporary directory inside it is used.
+        memory_keys : int, optional
+            How many hashes an exact tracker keeps in memory before spilling, if ``spill_dir`` is given.
+
+        Attributes
+        ----------
+        mode : str
+            The mode of the tracker.
+        added : int
+            How many values were added.
+
+        Raises
+        ------
+        ValueError
+            If ``mode`` is not one of ``TRACKER_MODES``, or the Bloom filter parameters are invalid.
+
+        Examples
+        --------
+        Keeping usernames unique across the chunks of an export, and spilling to disk:
+
+        >>> from makedata.data_generators.UniquenessTrackers import UniquenessTracker
+        >>> tracker = UniquenessTracker(spill_dir="/tmp")
+        >>> usernames = PatternGenerator(default_format="a{6}##", seed=42)
+        >>> for chunk in range(1000):
+        ...     write_chunk(usernames.generate_unique(10**5, tracker))
+    """
+    def __init__(self, mode="exact", capacity=10**7, error_rate=0.001, spill_dir=None, memory_keys=MEMORY_KEYS):
+        if mode not in TRACKER_MODES:
+            raise ValueError(f"'mode' has to be one of {TRACKER_MODES}, but is '{mode}'.")
+        self.mode = mode
+        self.added = 0
+        self.memory_keys = memory_keys
+        self._spill_dir = tempfile.mkdtemp(prefix="makedata-unique-", dir=spill_dir) if spill_dir is not None else None
+        self._spilled = 0
+
+        if mode == "exact":
+            self._runs = []
+            return
+
+        if capacity < 1 or not 0 < error_rate < 1:
+            raise ValueError("A Bloom filter needs a positive 'capacity' and an 'error_rate' in (0, 1).")
+        self._bits_count = ceil(-capacity * log(error_rate) / log(2)**2)
+        self._hashes_count = max(1, round(self._bits_count / capacity * log(2)))
+        bytes_count = (self._bits_count + 7) // 8
+        if self._spill_dir is not None:
+            self._bits = np.lib.format.open_memmap(syspath_join(self._spill_dir, "bloom.npy"), mode="w+", dtype=np.uint8, shape=(bytes_count,))
+        else:
+            self._bits = np.zeros(bytes_count, dtype=np.uint8)
+
+    def __len__(self):
+        return self.added
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _bit_positions(self, keys):
+        """The bits of every key in the Bloom filter, by double hashing, as an array of (hashes, keys)."""
+        first, second = keys, _mix(keys ^ MIX_MULTIPLIERS[0]) | np.uint64(1)
+        steps = np.arange(self._hashes_count, dtype=np.uint64)[:, None]
+        return (first[None, :] + steps * second[None, :]) % np.uint64(self._bits_count)
+
+    def _contains_sorted(self, keys):
+        """A boolean array, True for the keys that were added, of sorted keys."""
+        if self.mode == "bloom":
+            positions = self._bit_positions(keys)
+            bits = self._bits[positions >> np.uint64(3)] >> (positions & np.uint64(7)).astype(np.uint8)
+            return (bits & 1).astype(bool).all(axis=0)
+
+        # The keys are sorted, so the searches walk every run forward instead of jumping around it.
+        found = np.zeros(len(keys), dtype=bool)
+        for run in self._runs:
+            positions = np.minimum(np.searchsorted(run, keys), len(run) - 1)
+            found |= run[positions] == keys
+        return found
+
+    def _insert(self, keys):
+        """Add sorted unique keys that weren't added before."""
+        if not len(keys):
+            return
+        self.added += len(keys)
+        if self.mode == "bloom":
+            positions = self._bit_positions(keys).ravel()
+            np.bitwise_or.at(self._bits, positions >> np.uint64(3), (np.uint8(1) << (positions & np.uint64(7)).astype(np.uint8)))
+            return
+
+        # The runs are kept in decreasing size, a new run is merged with the runs that are not at least twice as large, so there are O(log n) runs.
+        while self._runs and len(self._runs[-1]) <= 2 * len(keys):
+            run = self._runs.pop()
+            # The runs are disjoint, and a stable sort merges two sorted runs in linear time.
+            keys = np.sort(np.concatenate([run, keys]), kind="stable")
+            if isinstance(run, np.memmap):
+                path = run.filename
+                del run
+                os.remove(path)
+        self._runs.append(keys)
+        self._spill()
+
+    def _spill(self):
+        """Write the largest runs kept in memory to disk, until at most ``memory_keys`` hashes are kept in memory."""
+        if self._spill_dir is None:
+            return
+        in_memory = sum(len(run) for run in self._runs if not isinstance(run, np.memmap))
+        for index, run in enumerate(self._runs):
+            if in_memory <= self.memory_keys:
+                break
+            if isinstance(run, np.memmap):
+                continue
+            in_memory -= len(run)
+            path = syspath_join(self._spill_dir, f"run{self._spilled}.npy")
+            self._spilled += 1
+            np.save(path, run)
+            self._runs[index] = np.load(path, mmap_mode="r")
+
+    def contains_keys(self, keys):
+        """A boolean array, True for the keys (hashes from ``hash_values``) that were added."""
+        keys = np.asarray(keys, dtype=np.uint64)
+        order = np.argsort(keys)
+        found = np.empty(len(keys), dtype=bool)
+        found[order] = self._contains_sorted(keys[order])
+        return found
+
+    def add_keys(self, keys):
+        """Add keys (hashes from ``hash_values``)."""
+        keys = np.unique(np.asarray(keys, dtype=np.uint64))
+        self._insert(keys[~self._contains_sorted(keys)])
+
+    def check_and_add_keys(self, keys, limit=None):
+        """Add the new keys (hashes from ``hash_values``), the first occurrence of every key that wasn't added before.
+
+            The keys are sorted once, and searched and added in that order.
+
+            Parameters
+            ----------
+            keys : array_like
+                The keys.
+            limit : int, optional
+                Add only the first ``limit`` new keys.
+
+            Returns
+            -------
+            numpy.ndarray
+                A boolean array, True for the keys that were added.
+        """
+        keys = np.asarray(keys, dtype=np.uint64)
+        unique_keys, first_indices = np.unique(keys, return_index=True)
+        is_new = ~self._contains_sorted(unique_keys)
+        new_keys, new_indices = unique_keys[is_new], first_indices[is_new]
+        if limit is not None and len(new_indices) > limit:
+            # The first new keys by their position, kept in sorted order.
+            first_new = np.sort(np.argsort(new_indices, kind="stable")[:limit])
+            new_keys, new_indices = new_keys[first_new], new_indices[first_new]
+        self._insert(new_keys)
+        new = np.zeros(len(keys), dtype=bool)
+        new[new_indices] = True
+        return new
+
+    def contains(self, values):
+        """A boolean array, True for the values that were added."""
+        return self.contains_keys(hash_values(values))
+
+    def add(self, values):
+        """Add values."""
+        self.add_keys(hash_values(values))
+
+    def check_and_add(self, values):
+        """Add the new values, the first occurrence of every value that wasn't added before.
+
+            Parameters
+            ----------
+            values : array_like
+                The values.
+
+            Returns
+            -------
+            numpy.ndarray
+                A boolean array, True for the values that were added.
+        """
+        return self.check_and_add_keys(hash_values(values))
+
+    def close(self):
+        """Remove the spilled files, the tracker can't be used after it."""
+        if self.mode == "exact":
+            self._runs = []
+        else:
+            self._bits = None
+        if self._spill_dir is not None:
+            for file_name in os.listdir(self._spill_dir):
+                os.remove(syspath_join(self._spill_dir, file_name))
+            os.rmdir(self._spill_dir)
+            self._spill_dir = None
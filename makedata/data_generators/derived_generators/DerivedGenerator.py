@@ -0,0 +1,91 @@
+from ..BaseGenerators import GeneratorObject
+from ..GeneratorDecorators import GeneratingFunction
+
+
+class DerivedGenerator(GeneratorObject):
+    """Generator to generate a column from other columns of it's model, such as an email from a name or an end date after a start date.
+
+        The column is computed for the whole batch at once by ``function``, which gets the ``random_generator``
+        and the input columns as arrays (in the order of ``inputs``), and returns the k samples.
+        Any randomness should be drawn from the given random generator, with one vectorized call per batch,
+        so the column is reproducible from the seed and works with ``BaseModel.generate_range``.
+
+        Parameters
+        ----------
+        function : callable
+            ``function(random_generator, *input_columns)``, returning an array_like of k samples.
+        inputs : list of str
+            The names of the generators of the model whose columns are the inputs of ``function``.
+        *args
+            Variable length argument list
+        **kwargs
+            Arbitrary keyword arguments.
+
+        Attributes
+        ----------
+        function : callable
+            The function that computes the column.
+
+        Raises
+        ------
+        ValueError
+            If ``inputs`` is empty.
+
+        See Also
+        --------
+        :class:`makedata.models.BaseModels.BaseModel` : Generates the columns of it's generators in the order of their inputs.
+
+        Examples
+        --------
+        Deriving an email from a name, and a total from a price and a random quantity:
+
+        >>> import numpy as np
+        >>> from makedata.data_generators.derived_generators.DerivedGenerator import DerivedGenerator
+        >>> nameGen = NameGenerator(locale="en_INTER", default_format_name="mfl", name="FullName")
+        >>> emailGen = DerivedGenerator(lambda rng, names: np.char.add(np.char.replace(np.char.lower(names), " ", "."), "@example.com"),
+        ...                             inputs=["FullName"], name="Email")
+        >>> priceGen = IntegerGenerator(10, 100, name="Price")
+        >>> totalGen = DerivedGenerator(lambda rng, prices: prices * rng.integers(1, 4, size=len(prices)), inputs=["Price"], name="Total")
+        >>> BaseModel([emailGen, nameGen, totalGen, priceGen], seed=42)(2)
+        {0: {'Email': 'dominic.cloth@example.com', 'FullName': 'Dominic Cloth', 'Total': 270, 'Price': 90},
+        1: {'Email': 'braylen.barron@example.com', 'FullName': 'Braylen Barron', 'Total': 78, 'Price': 78}}
+    """
+    def __init__(self, function, inputs, *args, **kwargs):
+        if not inputs:
+            raise ValueError("A DerivedGenerator has to have at least one input column.")
+        super().__init__(inputs=inputs, *args, **kwargs)
+        self.function = function
+
+    def _preprocess_data(self, k, inputs=None, *args, **kwargs):
+        """Check that all the input columns were given, and call the generator function.
+
+            Raises
+            ------
+            ValueError
+                If an input column is missing, e.g. because this generator was called outside of a model.
+        """
+        missing = [name for name in self.inputs if inputs is None or name not in inputs]
+        if missing:
+            raise ValueError(f"The generator {self.name} needs the input columns {missing}, generate it as a part of a model that has them.")
+        return self._data_generator(k, inputs)
+
+    @GeneratingFunction
+    def _data_generator(self, k, inputs):
+        """Compute k samples from the input columns.
+
+            Parameters
+            ----------
+            k : int
+                Generate k samples.
+            inputs : dict
+                The input columns, by name.
+
+            Raises
+            ------
+            ValueError
+                If ``function`` didn't return k samples.
+        """
+        generated_data = self.function(self.random_generator, *(inputs[name] for name in self.inputs))
+        if len(generated_data) != k:
+            raise ValueError(f"The function of the generator {self.name} returned {len(generated_data)} samples instead of {k}.")
+        return generated_data
@@ -8,6 +8,10 @@ from ..GeneratorExceptions import FormatError
 from dateutil.relativedelta import relativedelta
 from ..GeneratorDecorators import GeneratingFunction
 
+
+# The number of seconds in a day, the period of a diurnal rate profile.
+SECONDS_PER_DAY = 86400
+
 class DateGenerator(FormattedGenerator):
     """Generator to generate k dates in a given range, using a spesific format.
 
@@ -26,6 +30,14 @@ class DateGenerator(FormattedGenerator):
         yearfirst : bool, optional
             Whether to interpret the first value in an ambiguous 3-integer date (e.g. 01/05/09) as the year. 
             If ``True``, the first number is taken to  be the year, otherwise the last number is taken to be the year. 
+        ordered : bool, optional
+            | If ``True``, generate monotonically increasing timestamps from the start of the ``timeframe``, like an event log,
+            | instead of independent ones. The timestamps continue from the last generated one in every call, so a stream of chunks is ordered without sorting.
+        rate : float, optional
+            The mean number of events per second of an ``ordered`` generator, required if ``ordered``.
+        diurnal_profile : array_like of floats, optional
+            | 24 non-negative weights, the relative rate of events in every hour of the day, e.g. to have less events at night.
+            | The mean rate stays ``rate``. Can only be used if ``ordered``.
         *args
                 Variable length argument list
         **kwargs
@@ -38,6 +50,13 @@ class DateGenerator(FormattedGenerator):
         time_frame : tuple
             A dictionary with a mapping between an abbreviations of a format and it's full name.
             Where 'abbreviation': 'name_of_format' are the 'key':'value', respectively.
+        current_time : float
+            The number of seconds from the start of the ``timeframe`` to the last timestamp an ``ordered`` generator generated.
+
+        Raises
+        ------
+        ValueError
+            If the ``timeframe`` is invalid, or the ordered mode parameters are invalid.
         
         See Also
         --------
@@ -57,10 +76,19 @@ class DateGenerator(FormattedGenerator):
         >>> gen2 = DateGenerator(datetime(2020, 8, 2), datetime(2020, 12, 30), seed=42)
         >>> gen2(5)
         ('15-08-2020', '26-11-2020', '08-11-2020', '06-10-2020', '05-10-2020')
+
+        Generating an event log of about one event a minute, with quiet nights, in chunks:
+
+        >>> profile = [0.2] * 7 + [1.5] * 12 + [0.5] * 5
+        >>> gen3 = DateGenerator("1-1-2021", "1-1-2022", default_format="%Y-%m-%d %H:%M:%S", ordered=True, rate=1 / 60, diurnal_profile=profile, seed=42)
+        >>> gen3(3, steps="s")
+        ('2021-01-01 00:10:58', '2021-01-01 00:21:37', '2021-01-01 00:32:30')
+        >>> gen3(2, steps="s")
+        ('2021-01-01 00:33:47', '2021-01-01 00:34:10')
     """
     default_format = r"%d-%m-%Y"
 
-    def __init__(self, start_time, end_time, tzinfo=None, dayfirst=True, yearfirst=False, *args, **kwargs):
+    def __init__(self, start_time, end_time, tzinfo=None, dayfirst=True, yearfirst=False, ordered=False, rate=None, diurnal_profile=None, *args, **kwargs):
         super().__init__(default_must=True, *args, **kwargs)
 
         timeframe = [start_time, end_time]
@@ -88,7 +116,31 @@ class DateGenerator(FormattedGenerator):
                             '{self.timeframe[0]}' can't be bigger than the second datetime '{self.timeframe[1]}'.")
         
         self.time_defference = self.timeframe[1].timestamp() - self.timeframe[0].timestamp()
-        
+
+        if ordered and (rate is None or rate <= 0):
+            raise ValueError(f"An ordered DateGenerator needs a positive 'rate', but 'rate' is {rate}.")
+        if diurnal_profile is not None:
+            if not ordered:
+                raise ValueError("'diurnal_profile' can only be used with an ordered DateGenerator.")
+            diurnal_profile = np.asarray(diurnal_profile, dtype=np.float64)
+            if diurnal_profile.shape != (24,) or (diurnal_profile < 0).any() or diurnal_profile.sum() == 0:
+                raise ValueError("'diurnal_profile' has to be 24 non-negative weights, with at least one positive weight.")
+
+        self.ordered = ordered
+        self.rate = rate
+        self.diurnal_profile = tuple(diurnal_profile.tolist()) if diurnal_profile is not None else None
+        self.current_time = 0.0
+
+        if ordered:
+            # The expected number of events from midnight to every hour of the day, so the events are generated as a homogeneous process
+            # of 1 event per unit in the expected events axis, and mapped back to time through it.
+            hourly_rates = diurnal_profile / diurnal_profile.mean() if diurnal_profile is not None else np.ones(24)
+            self._hours_seconds = np.arange(25) * 3600.0
+            self._expected_events = np.concatenate(([0], np.cumsum(hourly_rates * 3600 * rate)))
+            start = self.timeframe[0].replace(tzinfo=None)
+            self._midnight = datetime(start.year, start.month, start.day)
+            self._start_seconds = (start - self._midnight).total_seconds()
+
 
     def _convert_to_date(self, time, dayfirst, yearfirst):
         """Convert ``time`` to a ``datetime`` object.
@@ -115,6 +167,71 @@ class DateGenerator(FormattedGenerator):
         else:
             raise TypeError(f"Variable 'time' of type {type(time)} is not a supported type.")
     
+    def _expected_events_until(self, seconds):
+        """The expected number of events from the midnight before the ``timeframe`` until ``seconds`` after it."""
+        days, seconds_of_day = np.divmod(seconds, SECONDS_PER_DAY)
+        return days * self._expected_events[-1] + np.interp(seconds_of_day, self._hours_seconds, self._expected_events)
+
+    def _seconds_until(self, expected_events):
+        """The inverse of ``_expected_events_until``."""
+        days, events_of_day = np.divmod(expected_events, self._expected_events[-1])
+        return days * SECONDS_PER_DAY + np.interp(events_of_day, self._expected_events, self._hours_seconds)
+
+    def _ordered_dates(self, k, steps):
+        """Generate the next k ordered dates, continuing from ``current_time``.
+
+            The gaps between events are drawn as exponential inter-arrival times (a Poisson process) in one call,
+            and their cumulative sum is mapped to time through the diurnal profile.
+
+            Raises
+            ------
+            ValueError
+                If the dates pass the end of the ``timeframe``.
+        """
+        start_events = self._expected_events_until(self._start_seconds + self.current_time)
+        seconds = self._seconds_until(start_events + np.cumsum(self.random_generator.exponential(1.0, size=k))) - self._start_seconds
+        # Keep the dates ordered even if float rounding moves the first one before the last generated date.
+        seconds = np.maximum(seconds, self.current_time)
+
+        if k and seconds[-1] > self.time_defference:
+            raise ValueError(f"The ordered dates passed the end of the timeframe {self.timeframe[1]}, "
+                                f"use a bigger timeframe or a lower 'rate' (generated {self.samples_generated} dates).")
+        if k:
+            self.current_time = float(seconds[-1])
+
+        microseconds = np.round((seconds + self._start_seconds) * 1e6).astype("timedelta64[us]")
+        return (np.datetime64(self._midnight, "us") + microseconds).astype(f"datetime64[{steps}]").astype(datetime)
+
+    def generate_range(self, start, stop, *args, **kwargs):
+        """Generate the samples in positions [start, stop) of this ``DateGenerator``'s position-addressable stream.
+
+            Raises
+            ------
+            ValueError
+                If this ``DateGenerator`` is ``ordered``, every ordered date depends on all the dates before it, so it can only be generated in order.
+
+            See Also
+            --------
+            :meth:`makedata.data_generators.BaseGenerators.GeneratorObject.generate_range` : The position-addressable stream.
+        """
+        if self.ordered:
+            raise ValueError("An ordered DateGenerator can't generate a range, generate it's dates in order by calling it (e.g. with 'BaseModel.iter_chunks').")
+        return super().generate_range(start, stop, *args, **kwargs)
+
+    @property
+    def position_addressable(self):
+        """Whether the dates of this ``DateGenerator`` can be addressed by position, False if it's ``ordered``."""
+        return not self.ordered
+
+    def get_state(self):
+        state = super().get_state()
+        state["current_time"] = self.current_time
+        return state
+
+    def set_state(self, state):
+        super().set_state(state)
+        self.current_time = state.get("current_time", 0.0)
+
     @GeneratingFunction
     def _data_generator(self, k, format_used=None, tzinfo=None, steps="D", return_datetime=False):
         """Generate k dates.
@@ -151,14 +268,18 @@ class DateGenerator(FormattedGenerator):
             format_used = self.default_format
         
         # Generate k dates.
-        chosen_deltas = self.random_generator.integers(0, self.time_defference, size=k).astype("timedelta64[s]").astype(f"timedelta64[{steps}]")
-        chosen_dates = (np.datetime64(self.timeframe[0], steps) + chosen_deltas).astype(datetime)
+        if self.ordered:
+            chosen_dates = self._ordered_dates(k, steps)
+        else:
+            chosen_deltas = self.random_generator.integers(0, self.time_defference, size=k).astype("timedelta64[s]").astype(f"timedelta64[{steps}]")
+            chosen_dates = (np.datetime64(self.timeframe[0], steps) + chosen_deltas).astype(datetime)
+        self._end_sampling()
         
         # If a default timezone is provided, but a new one is not, use the default.
         if tzinfo is None and self.tzinfo is not None:
             tzinfo = self.tzinfo
 
-        # If this part fails, it is probably because of a bad format
+        # If this part fails, it is probably because of a bad format, the dates are formatted here (not lazily) so it's caught.
         try:
             if tzinfo is not None:
                 if isinstance(tzinfo, str):
@@ -168,13 +289,13 @@ class DateGenerator(FormattedGenerator):
                         return (default_tzinfo(date, tzinfo) for date in chosen_dates)
 
                     func = lambda date: default_tzinfo(date, tzinfo).strftime(format_used)
-                    return map(func, chosen_dates)
+                    return list(map(func, chosen_dates))
 
             if return_datetime:
                 return chosen_dates
 
             func = lambda date: date.strftime(format_used)
-            return map(func, chosen_dates)
+            return list(map(func, chosen_dates))
 
         except ValueError:
                 raise FormatError(format_used, self)
\ No newline at end of file
@@ -0,0 +1,219 @@
+from ..BaseGenerators import FormattedGenerator, NumericGenerator
+from ..GeneratorDecorators import GeneratingFunction
+from ..GeneratorExceptions import FormatError
+from math import ceil
+from string import Formatter
+import re
+import numpy as np
+
+
+# The format specification of a number: [sign][grouping][.precision][f]
+NUMBER_SPEC_PATTERN = re.compile(r"(?P<sign>[-+ (])?(?P<grouping>[,_])?(?:\.(?P<precision>\d+))?f?")
+
+# The largest scaled (integer) value that can be rendered.
+MAX_SCALED_VALUE = 2**62
+
+# The decimal places the scaled bounds are rounded to before rounding them up, so float errors of the scaling (e.g. 0.05 * 100) are ignored.
+SCALED_BOUND_DECIMALS = 6
+
+
+class FormattedNumberGenerator(FormattedGenerator, NumericGenerator):
+    """Generator to generate k formatted numbers in a given range, such as prices and amounts.
+
+        A format is a template with a single replacement field, where the text around the field is kept as is (e.g. a currency symbol or code),
+        and the field's specification decides how the number is rendered: ``[sign][grouping][.precision][f]``.
+
+        * sign - '-' a sign only for negative numbers (the default), '+' a sign for every number,
+          ' ' a space for positive numbers, '(' parentheses around negative numbers (accounting style).
+        * grouping - ',' or '_' to separate the thousands of the integer part.
+        * precision - the number of decimal places, if not given the numbers are integers.
+
+        Numbers are drawn uniformly from the numbers in [low, high) with the format's precision (as integers in units of the last decimal place).
+        The whole batch is rendered at once: the numbers are split to their integer and fraction digits with integer arithmetic,
+        laid out as a matrix of characters viewed as fixed width strings, and joined with the currency and sign using numpy's string operations,
+        with no ``format`` call per sample.
+
+        Parameters
+        ----------
+        low : numeric type
+            Minimum value for the generator.
+        high : numeric type
+            Maximum number for the generator.
+        *args
+            Variable length argument list
+        **kwargs
+            Arbitrary keyword arguments.
+
+        Attributes
+        ----------
+        low : numeric type
+            Minimum value for the generator.
+        high : numeric type
+            Maximum number for the generator.
+
+        Raises
+        ------
+        ValueError
+            If ``low``>``high``.
+
+        See Also
+        --------
+        :class:`makedata.data_generators.BaseGenerators.FormattedGenerator` : All the available functionalities derived from ``FormattedGenerator``.
+
+        Examples
+        --------
+        Generating prices and accounting style amounts:
+
+        >>> from makedata.data_generators.formatted_generators.FormattedNumberGenerator import FormattedNumberGenerator
+        >>> gen = FormattedNumberGenerator(-5000, 5000, seed=42)
+        >>> gen(2)
+        ('-4,107.50', '2,739.56')
+        >>> gen(3, format_name="accounting")
+        ('$1,545.71', '($611.22)', '($669.85)')
+    """
+    default_format = "{:,.2f}"
+
+    formats = {"dollars": "${:,.2f}",
+                "dollars_code": "{:,.2f} USD",
+                "euros": "€{:,.2f}",
+                "shekels": "₪{:,.2f}",
+                "accounting": "${:(,.2f}",
+                "signed": "{:+,.2f}",
+                "integer": "{:,}"}
+
+    def __init__(self, low, high, *args, **kwargs):
+        # The range is validated and kept by 'NumericGenerator', the next class after 'FormattedGenerator'.
+        super().__init__(*args, low=low, high=high, **kwargs)
+
+    def _compile_format(self, frmt):
+        """Compile a format to it's prefix, suffix, sign style, grouping separator and precision.
+
+            Parameters
+            ----------
+            frmt : str
+                The format to compile.
+
+            Returns
+            -------
+            tuple
+                (prefix, suffix, sign, grouping, precision), where ``grouping`` is None if the thousands aren't separated.
+
+            Raises
+            ------
+            FormatError
+                If the format doesn't have exactly one replacement field, or it's specification is invalid.
+        """
+        try:
+            parsed = tuple(Formatter().parse(frmt))
+        except (ValueError, TypeError):
+            raise FormatError(str(frmt), self)
+
+        fields = [i for i, (_, field_name, _, _) in enumerate(parsed) if field_name is not None]
+        if len(fields) != 1 or parsed[fields[0]][1] != "" or parsed[fields[0]][3] is not None:
+            raise FormatError(frmt, self)
+
+        spec = NUMBER_SPEC_PATTERN.fullmatch(parsed[fields[0]][2])
+        if spec is None:
+            raise FormatError(frmt, self)
+
+        prefix = "".join(literal for literal, _, _, _ in parsed[:fields[0] + 1])
+        suffix = "".join(literal for literal, _, _, _ in parsed[fields[0] + 1:])
+        precision = int(spec["precision"]) if spec["precision"] is not None else 0
+        return prefix, suffix, spec["sign"] or "-", spec["grouping"], precision
+
+    @staticmethod
+    def _digits(numbers, grouping=None):
+        """Render non-negative integers to strings, through a matrix of their characters.
+
+            Parameters
+            ----------
+            numbers : numpy.ndarray
+                The non-negative integers.
+            grouping : str, optional
+                A separator to put between every 3 digits.
+
+            Returns
+            -------
+            numpy.ndarray
+                The rendered numbers.
+        """
+        max_digits = len(str(int(numbers.max()))) if len(numbers) else 1
+        # The digits are peeled from the right, one column at a time, and leading zeros (but the last digit) become spaces,
+        # which are stripped once the matrix is viewed as strings.
+        digits = np.empty((max_digits, len(numbers)), dtype=np.uint32)
+        remaining = numbers
+        for column in range(max_digits - 1, -1, -1):
+            is_leading = remaining == 0
+            remaining, digit = np.divmod(remaining, 10)
+            digits[column] = digit + ord("0")
+            if column < max_digits - 1:
+                digits[column, is_leading] = ord(" ")
+        digits = np.ascontiguousarray(digits.T)
+
+        if grouping is not None:
+            # Every 4th position from the right is a separator, the rest take the digits in order.
+            width = max_digits + (max_digits - 1) // 3
+            from_right = np.arange(width - 1, -1, -1)
+            is_separator = from_right % 4 == 3
+            digit_columns = max_digits - 1 - (from_right - from_right // 4)
+
+            grouped = np.empty((len(numbers), width), dtype=np.uint32)
+            grouped[:, ~is_separator] = digits[:, digit_columns[~is_separator]]
+            # A separator is only kept if there is a digit before it.
+            grouped[:, is_separator] = np.where(grouped[:, np.flatnonzero(is_separator) - 1] == ord(" "), ord(" "), ord(grouping))
+            digits = grouped
+
+        return np.char.lstrip(digits.view(f"U{digits.shape[1]}").ravel())
+
+    @staticmethod
+    def _scaled_bound(value, scale):
+        """The smallest number of units of ``1 / scale`` that is at least ``value``."""
+        return ceil(round(value * scale, SCALED_BOUND_DECIMALS))
+
+    @GeneratingFunction
+    def _data_generator(self, k, format_used):
+        """Generate k formatted numbers.
+
+            Parameters
+            ----------
+            k : int
+                Generate k samples.
+            format_used : str
+                The format to render the numbers with.
+
+            Raises
+            ------
+            ValueError
+                If the range and the precision of the format are too big to be rendered, or the range has no numbers with the format's precision.
+        """
+        prefix, suffix, sign, grouping, precision = self._compiled_format(format_used)
+        scale = 10 ** precision
+        if max(abs(self.low), abs(self.high)) * scale >= MAX_SCALED_VALUE:
+            raise ValueError(f"Can't render numbers in [{self.low}, {self.high}) with {precision} decimal places.")
+
+        low, high = self._scaled_bound(self.low, scale), self._scaled_bound(self.high, scale)
+        if low >= high:
+            raise ValueError(f"There are no numbers with {precision} decimal places in [{self.low}, {self.high}).")
+        scaled = self.random_generator.integers(low, high, size=k, dtype=np.int64)
+        self._end_sampling()
+        negative = scaled < 0
+        integer_part, fraction_part = np.divmod(np.abs(scaled), scale)
+
+        rendered = self._digits(integer_part, grouping)
+        if precision:
+            powers = 10 ** np.arange(precision - 1, -1, -1, dtype=np.int64)
+            fraction = np.empty((k, precision + 1), dtype=np.uint32)
+            fraction[:, 0] = ord(".")
+            fraction[:, 1:] = (fraction_part[:, None] // powers) % 10 + ord("0")
+            rendered = np.char.add(rendered, fraction.view(f"U{precision + 1}").ravel())
+
+        if sign == "(":
+            opening = np.where(negative, "(", "")
+        elif sign == "-":
+            opening = np.where(negative, "-", "")
+        else:
+            opening = np.where(negative, "-", sign)
+        rendered = np.char.add(np.char.add(opening, prefix), np.char.add(rendered, suffix))
+        if sign == "(":
+            rendered = np.char.add(rendered, np.where(negative, ")", ""))
+        return rendered
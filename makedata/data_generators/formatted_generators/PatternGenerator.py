@@ -0,0 +1,175 @@
+from ..BaseGenerators import FormattedGenerator
+from ..GeneratorDecorators import GeneratingFunction
+from ..GeneratorExceptions import FormatError
+from string import ascii_uppercase, ascii_lowercase, digits
+import numpy as np
+
+
+# The character classes of the pattern language, by their symbol.
+PATTERN_CLASSES = {"#": digits,
+                    "A": ascii_uppercase,
+                    "a": ascii_lowercase,
+                    "?": ascii_uppercase + ascii_lowercase,
+                    "*": digits + ascii_uppercase}
+
+
+class PatternGenerator(FormattedGenerator):
+    """Generator to generate k structured strings (IDs, phone numbers, codes) from a pattern.
+
+        A format is a pattern, where every character is either a random character from a class or a literal:
+
+        * ``#`` - a digit.
+        * ``A`` - an uppercase letter.
+        * ``a`` - a lowercase letter.
+        * ``?`` - a letter of any case.
+        * ``*`` - a digit or an uppercase letter.
+        * ``[...]`` - a character from a custom class, e.g. ``[A-F0-9]`` or ``[xyz]``.
+        * ``\\`` - makes the next character a literal, e.g. ``\\#``.
+        * ``{n}`` - after a character or a class, repeats it n times, e.g. ``[0-9a-f]{8}``.
+        * Any other character is a literal.
+
+        Patterns are ASCII only. The whole batch is generated as one (k, width) uint8 matrix of characters,
+        filled with one draw per character class, which is then viewed as fixed width strings, with no per sample Python code.
+
+        Parameters
+        ----------
+        *args
+            Variable length argument list
+        **kwargs
+            Arbitrary keyword arguments.
+
+        See Also
+        --------
+        :class:`makedata.data_generators.BaseGenerators.FormattedGenerator` : All the available functionalities derived from ``FormattedGenerator``.
+
+        Examples
+        --------
+        Generating phone numbers and product codes:
+
+        >>> from makedata.data_generators.formatted_generators.PatternGenerator import PatternGenerator
+        >>> gen = PatternGenerator(default_format="###-###-####", seed=42)
+        >>> gen(2)
+        ('518-091-7795', '633-341-0847')
+        >>> gen(2, format_name="sku")
+        ('ON-XIK7-53', 'CB-P033-75')
+    """
+    formats = {"phone": "###-###-####",
+                "phone_parentheses": "(###) ###-####",
+                "zip_code": "#####",
+                "license_plate": "AAA-####",
+                "sku": "AA-****-##",
+                "hex_id": "[0-9a-f]{16}"}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+    def _compile_format(self, frmt):
+        """Compile a pattern to the literal characters of a sample and the positions of every character class.
+
+            Parameters
+            ----------
+            frmt : str
+                The pattern to compile.
+
+            Returns
+            -------
+            tuple
+                | (width, template, classes) where 'template' is a uint8 array of the literal characters (zeros in random positions),
+                | and 'classes' is a tuple of (alphabet, positions) uint8 and int arrays for every character class in the pattern.
+
+            Raises
+            ------
+            FormatError
+                If the pattern is empty, not ASCII, or malformed (unclosed class or quantifier, empty class, bad range etc.).
+        """
+        if not isinstance(frmt, str) or not frmt or not frmt.isascii():
+            raise FormatError(str(frmt), self)
+
+        # Every token is (is_literal, characters).
+        tokens = []
+        i = 0
+        while i < len(frmt):
+            char = frmt[i]
+            if char == "\\":
+                if i + 1 == len(frmt):
+                    raise FormatError(frmt, self)
+                tokens.append((True, frmt[i + 1]))
+                i += 2
+            elif char == "[":
+                class_end = frmt.find("]", i + 1)
+                if class_end == -1:
+                    raise FormatError(frmt, self)
+                tokens.append((False, self._expand_class(frmt, frmt[i + 1:class_end])))
+                i = class_end + 1
+            elif char in PATTERN_CLASSES:
+                tokens.append((False, PATTERN_CLASSES[char]))
+                i += 1
+            else:
+                tokens.append((True, char))
+                i += 1
+
+            # A quantifier repeats the last token.
+            if i < len(frmt) and frmt[i] == "{":
+                quantifier_end = frmt.find("}", i + 1)
+                if quantifier_end == -1 or not frmt[i + 1:quantifier_end].isdigit():
+                    raise FormatError(frmt, self)
+                repeats = int(frmt[i + 1:quantifier_end])
+                if repeats == 0:
+                    tokens.pop()
+                else:
+                    tokens.extend([tokens[-1]] * (repeats - 1))
+                i = quantifier_end + 1
+
+        if len(tokens) == 0:
+            raise FormatError(frmt, self)
+
+        template = np.zeros(len(tokens), dtype=np.uint8)
+        classes_positions = dict()
+        for position, (is_literal, characters) in enumerate(tokens):
+            if is_literal:
+                template[position] = ord(characters)
+            else:
+                classes_positions.setdefault(characters, []).append(position)
+
+        classes = tuple((np.frombuffer(alphabet.encode("ascii"), dtype=np.uint8), np.array(positions))
+                        for alphabet, positions in classes_positions.items())
+        return len(tokens), template, classes
+
+    def _expand_class(self, frmt, class_body):
+        """Expand the body of a custom class (e.g. 'A-F0-9') to it's characters, in order and without duplicates."""
+        characters = []
+        i = 0
+        while i < len(class_body):
+            if i + 2 < len(class_body) and class_body[i + 1] == "-":
+                if class_body[i] > class_body[i + 2]:
+                    raise FormatError(frmt, self)
+                characters.extend(chr(c) for c in range(ord(class_body[i]), ord(class_body[i + 2]) + 1))
+                i += 3
+            else:
+                characters.append(class_body[i])
+                i += 1
+
+        if not characters:
+            raise FormatError(frmt, self)
+        return "".join(dict.fromkeys(characters))
+
+    @GeneratingFunction
+    def _data_generator(self, k, format_used):
+        """Generate k strings with a pattern.
+
+            Parameters
+            ----------
+            k : int
+                Generate k samples.
+            format_used : str
+                The pattern to generate the strings with.
+        """
+        width, template, classes = self._compiled_format(format_used)
+
+        characters = np.empty((k, width), dtype=np.uint8)
+        characters[:] = template
+        for alphabet, positions in classes:
+            characters[:, positions] = alphabet[self.random_generator.integers(0, len(alphabet), size=(k, len(positions)), dtype=np.uint8)]
+        self._end_sampling()
+
+        return characters.view(f"S{width}").ravel().astype(f"U{width}")
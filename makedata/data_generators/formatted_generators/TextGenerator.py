@@ -0,0 +1,162 @@
+from ..BaseGenerators import FromTextGenerator
+from ..GeneratorDecorators import GeneratingFunction
+from os.path import dirname, join as syspath_join
+import numpy as np
+
+
+# The vocabularies shipped with the library, one directory per locale, with a text file per word class.
+VOCABULARIES_PATH = syspath_join(dirname(dirname(__file__)), "data_sources", "TextGenerator")
+
+
+class TextGenerator(FromTextGenerator):
+    """Generator to generate k sentences or paragraphs from grammar templates.
+
+        A format is a grammar template of word classes, where every word class is a text file in the vocabulary directory,
+        e.g. '{adjectives} {nouns} {verbs}'. A sentence takes it's words from the template's word classes cyclically,
+        so a sentence of 5 words with the template above is adjective-noun-verb-adjective-noun.
+
+        The whole batch is generated at once: all the sentence lengths and word indices are drawn in single calls,
+        and the text is assembled with one join for the batch, which is then sliced to rows.
+
+        Parameters
+        ----------
+        locale : str, optional
+            The locale of the vocabulary to use, from the library's vocabularies.
+        file_path : str, optional
+            A directory of word class text files to use instead of the library's vocabulary of ``locale``.
+        sentence_length : tuple, optional
+            The (minimum, maximum) number of words in a sentence.
+        sentences_per_paragraph : tuple, optional
+            The (minimum, maximum) number of sentences in a paragraph.
+        length_distribution : str, optional
+            | The distribution the lengths are drawn from, within their (minimum, maximum):
+            | 'uniform' - every length is equally likely.
+            | 'poisson' - a poisson distribution around the middle of the range, clipped to the range.
+        *args
+            Variable length argument list
+        **kwargs
+            Arbitrary keyword arguments.
+
+        Raises
+        ------
+        ValueError
+            If a length range or ``length_distribution`` is invalid.
+
+        See Also
+        --------
+        :class:`makedata.data_generators.BaseGenerators.FormattedGenerator` : All the available functionalities derived from ``FormattedGenerator``.
+        :class:`makedata.data_generators.BaseGenerators.FromTextGenerator` : All the available functionalities derived from ``FromTextGenerator``.
+
+        Examples
+        --------
+        Using a ``TextGenerator`` to generate 2 sentences and a paragraph:
+
+        >>> from makedata.data_generators.formatted_generators.TextGenerator import TextGenerator
+        >>> gen = TextGenerator(sentence_length=(3, 6), seed=42)
+        >>> gen(2)
+        ('Polished niche current.', 'Humble abide below howling incident market.')
+        >>> gen(1, format_name="nv", paragraphs=True)
+        ('Motive art creditor suggest digest. Coincidence source abolitionist even rear people. Magnitude come group run concentrate. ...',)
+    """
+    default_format = "{adjectives} {nouns} {verbs}"
+
+    formats = {"adjective_noun_verb": "{adjectives} {nouns} {verbs}",
+                "noun_verb": "{nouns} {verbs}",
+                "adjective_noun": "{adjectives} {nouns}",
+                "noun_verb_adjective_noun": "{nouns} {verbs} {adjectives} {nouns}"}
+
+    formats_symbols = {"anv": "adjective_noun_verb", "nv": "noun_verb",
+                        "an": "adjective_noun", "nvan": "noun_verb_adjective_noun"}
+
+    length_distributions = ("uniform", "poisson")
+
+    def __init__(self, locale="en_US", file_path=None, sentence_length=(4, 12), sentences_per_paragraph=(3, 6), length_distribution="uniform", *args, **kwargs):
+        if file_path is None:
+            file_path = syspath_join(VOCABULARIES_PATH, locale)
+        super().__init__(file_path=file_path, *args, **kwargs)
+        self.locale = locale
+
+        for length_range in (sentence_length, sentences_per_paragraph):
+            if len(length_range) != 2 or length_range[0] < 1 or length_range[0] > length_range[1]:
+                raise ValueError(f"The length range {length_range} is invalid, it has to be (minimum, maximum) where 1<=minimum<=maximum.")
+        if length_distribution not in self.length_distributions:
+            raise ValueError(f"'length_distribution' has to be one of {self.length_distributions}, but is '{length_distribution}'.")
+
+        self.sentence_length = tuple(sentence_length)
+        self.sentences_per_paragraph = tuple(sentences_per_paragraph)
+        self.length_distribution = length_distribution
+
+        # Every loaded word class as arrays of it's words, capitalized words and their lengths.
+        self._vocabularies = dict()
+
+    def _vocabulary(self, key):
+        """The words of a word class as arrays, read once from it's source."""
+        try:
+            return self._vocabularies[key]
+        except KeyError:
+            lines = self.data[key]
+            words = np.array(lines[np.arange(len(lines))], dtype=object)
+            capitalized = np.array([word[:1].upper() + word[1:] for word in words], dtype=object)
+            sizes = np.fromiter((len(word) for word in words), dtype=np.int64, count=len(words))
+            self._vocabularies[key] = (words, capitalized, sizes)
+            return self._vocabularies[key]
+
+    def _draw_lengths(self, k, length_range):
+        """Draw k lengths in ``length_range`` from ``length_distribution``."""
+        low, high = length_range
+        if self.length_distribution == "poisson":
+            return np.clip(self.random_generator.poisson((low + high) / 2, size=k), low, high)
+        return self.random_generator.integers(low, high + 1, size=k)
+
+    @GeneratingFunction
+    def _data_generator(self, k, format_used, paragraphs=False):
+        """Generate k sentences (or paragraphs) with a grammar template.
+
+            Parameters
+            ----------
+            k : int
+                Generate k samples.
+            format_used : str
+                The grammar template of word classes.
+            paragraphs : bool, optional
+                If ``True`` every sample is a paragraph of ``sentences_per_paragraph`` sentences, else a single sentence.
+        """
+        template = self._compiled_format(format_used)
+
+        sentences_per_row = self._draw_lengths(k, self.sentences_per_paragraph) if paragraphs else np.ones(k, dtype=np.int64)
+        sentence_lengths = self._draw_lengths(int(sentences_per_row.sum()), self.sentence_length)
+        sentence_ends = np.cumsum(sentence_lengths)
+        words_count = int(sentence_ends[-1]) if len(sentence_ends) else 0
+
+        # The position of every word in it's sentence, which decides it's word class and capitalization.
+        positions = np.arange(words_count) - np.repeat(sentence_ends - sentence_lengths, sentence_lengths)
+        template_positions = positions % len(template)
+        is_first = positions == 0
+
+        words = np.empty(words_count, dtype=object)
+        word_sizes = np.empty(words_count, dtype=np.int64)
+        for template_position, key in enumerate(template):
+            vocabulary, capitalized, sizes = self._vocabulary(key)
+            in_position = template_positions == template_position
+            chosen = self.random_generator.integers(0, len(vocabulary), size=int(in_position.sum()))
+            words[in_position] = np.where(is_first[in_position], capitalized[chosen], vocabulary[chosen])
+            word_sizes[in_position] = sizes[chosen]
+        self._end_sampling()
+
+        # Separators: a space between words, '. ' between sentences and '.' at the end of a row.
+        row_ends = sentence_ends[np.cumsum(sentences_per_row) - 1] - 1
+        separators = np.full(words_count, " ", dtype=object)
+        separator_sizes = np.ones(words_count, dtype=np.int64)
+        separators[sentence_ends - 1] = ". "
+        separator_sizes[sentence_ends - 1] = 2
+        separators[row_ends] = "."
+        separator_sizes[row_ends] = 1
+
+        tokens = np.empty(2 * words_count, dtype=object)
+        tokens[0::2] = words
+        tokens[1::2] = separators
+        text = "".join(tokens.tolist())
+
+        text_ends = np.cumsum(word_sizes + separator_sizes)[row_ends]
+        text_starts = np.concatenate(([0], text_ends[:-1]))
+        return [text[start:end] for start, end in zip(text_starts.tolist(), text_ends.tolist())]
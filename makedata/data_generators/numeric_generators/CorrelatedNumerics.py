@@ -0,0 +1,238 @@
+from ..BaseGenerators import GeneratorObject, NumericGenerator, DEFAULT_BLOCK_SIZE
+from ..GeneratorDecorators import GeneratingFunction
+import numpy as np
+
+try:
+    from scipy.special import ndtr
+except ImportError:
+    # Without scipy the normal CDF is approximated.
+    ndtr = None
+
+
+def _normal_cdf(z):
+    """The standard normal CDF of every value of z."""
+    if ndtr is not None:
+        return ndtr(z)
+    # Abramowitz and Stegun 7.1.26, erf with an absolute error below 1.5e-7.
+    x = np.abs(z) / np.sqrt(2)
+    t = 1 / (1 + 0.3275911 * x)
+    erf = 1 - ((((1.061405429 * t - 1.453152027) * t + 1.421413741) * t - 0.284496736) * t + 0.254829592) * t * np.exp(-x * x)
+    return 0.5 * (1 + np.sign(z) * erf)
+
+
+def _uniform_of(z):
+    """The uniform [0, 1) values of standard normal values, kept off 0 and 1 so no quantile function gets an infinite value."""
+    return np.clip(_normal_cdf(z), np.finfo(float).tiny, 1 - np.finfo(float).epsneg)
+
+
+# The marginal distributions by name: (quantile function of standard normal values, support bounds of the parameters).
+MARGINALS = {
+    "normal": (lambda z, mean, std: mean + std * z, lambda mean, std: (-np.inf, np.inf)),
+    "lognormal": (lambda z, mean, sigma: np.exp(mean + sigma * z), lambda mean, sigma: (0, np.inf)),
+    "uniform": (lambda z, low, high: low + (high - low) * _uniform_of(z), lambda low, high: (low, high)),
+    "integer": (lambda z, low, high: np.minimum(low + np.floor((high - low) * _uniform_of(z)).astype(np.int64), high - 1),
+                lambda low, high: (low, high)),
+    "exponential": (lambda z, scale: -scale * np.log(_uniform_of(-z)), lambda scale: (0, np.inf)),
+}
+
+
+def _factor_correlation(correlation, dimensions):
+    """A lower triangular (or square) L with L @ L.T equal to the correlation matrix.
+
+        Raises
+        ------
+        ValueError
+            If the matrix is not a symmetric positive semi-definite matrix with a unit diagonal, of a row per marginal.
+    """
+    correlation = np.asarray(correlation, dtype=float)
+    if correlation.shape != (dimensions, dimensions):
+        raise ValueError(f"The correlation matrix has to be {dimensions}x{dimensions}, a row and column per marginal, but is {correlation.shape}.")
+    if not np.allclose(correlation, correlation.T) or not np.allclose(np.diag(correlation), 1) or np.abs(correlation).max() > 1:
+        raise ValueError("The correlation matrix has to be symmetric, with 1 on the diagonal and values in [-1, 1].")
+    try:
+        return np.linalg.cholesky(correlation)
+    except np.linalg.LinAlgError:
+        # A singular matrix (e.g. a correlation of exactly 1) has no Cholesky factor, but can be factored by it's eigen decomposition.
+        eigenvalues, eigenvectors = np.linalg.eigh(correlation)
+        if eigenvalues.min() < -1e-8:
+            raise ValueError("The correlation matrix has to be positive semi-definite.")
+        return eigenvectors * np.sqrt(np.clip(eigenvalues, 0, None))
+
+
+class CorrelatedGenerator(NumericGenerator):
+    """Generator to generate several correlated numeric columns, with a Gaussian copula.
+
+        Every row is drawn as a vector of standard normal values correlated by ``correlation`` (one matrix multiply by it's factor,
+        computed once, for the whole batch), and every value is transformed to it's column's marginal distribution.
+        The generator generates the first column, and ``outputs`` has a generator for every column to put in a ``BaseModel``,
+        the rest of the columns are taken from the same rows, so a model with all of them generates them together.
+
+        .. note::
+            The correlation is of the underlying normal values, the correlation of non normal marginals is a bit weaker (their rank correlation is kept).
+
+        Parameters
+        ----------
+        marginals : list
+            | The distribution of every column, a tuple of a name in ``MARGINALS`` and it's parameters:
+            | ('normal', mean, std), ('lognormal', mean, sigma), ('uniform', low, high), ('integer', low, high) or ('exponential', scale),
+            | or a quantile function that maps an array of uniform values in (0, 1) to the column (e.g. ``scipy.stats.gamma(2).ppf``).
+        correlation : array_like
+            The correlation matrix of the columns, a row and column per marginal.
+        names : list of str, optional
+            The names of the columns, the first is the name of this generator. By default the columns are named after this generator.
+        *args
+            Variable length argument list
+        **kwargs
+            Arbitrary keyword arguments.
+
+        Attributes
+        ----------
+        marginals : tuple
+            The distribution of every column.
+        correlation : list
+            The correlation matrix, as a list of rows.
+
+        Raises
+        ------
+        ValueError
+            If a marginal is unknown, or the correlation matrix is invalid.
+
+        Examples
+        --------
+        Heights and weights, and the price and quantity of orders:
+
+        >>> from makedata.data_generators.numeric_generators.CorrelatedNumerics import CorrelatedGenerator
+        >>> bodyGen = CorrelatedGenerator([("normal", 170, 10), ("lognormal", 4.2, 0.15)], [[1, 0.7], [0.7, 1]], names=["Height", "Weight"])
+        >>> orderGen = CorrelatedGenerator([("uniform", 1, 100), ("integer", 1, 20)], [[1, -0.5], [-0.5, 1]], names=["Price", "Quantity"])
+        >>> BaseModel([*bodyGen.outputs, *orderGen.outputs], seed=42)(2)
+        {0: {'Height': 174.18329965324378, 'Weight': 74.35082952737939, 'Price': 5.903761344830078, 'Quantity': 19},
+        1: {'Height': 170.2878785992514, 'Weight': 59.553599992966895, 'Price': 76.76517940088085, 'Quantity': 3}}
+    """
+    def __init__(self, marginals, correlation, names=None, *args, **kwargs):
+        if not marginals:
+            raise ValueError("A CorrelatedGenerator has to have at least one marginal.")
+        bounds = []
+        for marginal in marginals:
+            if callable(marginal):
+                bounds.append((-np.inf, np.inf))
+            elif marginal[0] in MARGINALS:
+                bounds.append(MARGINALS[marginal[0]][1](*marginal[1:]))
+            else:
+                raise ValueError(f"Unknown marginal {marginal}, it has to be a quantile function or start with one of {tuple(MARGINALS)}.")
+        if names is not None:
+            if len(names) != len(marginals):
+                raise ValueError(f"There has to be a name for every marginal, but there are {len(names)} names for {len(marginals)} marginals.")
+            kwargs["name"] = names[0]
+        super().__init__(min(low for low, _ in bounds), max(high for _, high in bounds), *args, **kwargs)
+
+        self.marginals = tuple(marginals)
+        self.correlation = np.asarray(correlation, dtype=float).tolist()
+        self._factor = _factor_correlation(correlation, len(marginals))
+        # The columns of the last generation, taken by the generators of the other columns, and a counter of the generations.
+        self._columns = None
+        self._generation = 0
+        self._range_blocks = None
+
+        names = names if names is not None else [self.name] + [f"{self.name}_{output}" for output in range(1, len(marginals))]
+        self._outputs = (self,) + tuple(CorrelatedColumnGenerator(self, output, name=name) for output, name in enumerate(names[1:], 1))
+
+    @property
+    def outputs(self):
+        """The generators of all the columns, this generator first."""
+        return self._outputs
+
+    @GeneratingFunction
+    def _data_generator(self, k):
+        """Generate k correlated rows, keep all their columns, and return the first column.
+
+            Parameters
+            ----------
+            k : int
+                Generate k samples.
+        """
+        latent = self.random_generator.standard_normal((k, len(self.marginals))) @ self._factor.T
+        # A quantile function gets the uniform values of it's latent column.
+        columns = [marginal(_uniform_of(latent[:, output])) if callable(marginal) else MARGINALS[marginal[0]][0](latent[:, output], *marginal[1:])
+                    for output, marginal in enumerate(self.marginals)]
+
+        if self._range_blocks is not None:
+            self._range_blocks.append(columns)
+        self._columns = columns
+        self._generation += 1
+        return columns[0]
+
+    def generate_range(self, start, stop, block_size=DEFAULT_BLOCK_SIZE, *args, inputs=None, **kwargs):
+        """Generate the rows in positions [start, stop) of the stream (see ``GeneratorObject.generate_range``), returning the first column.
+
+            The other columns of the rows are kept for the generators of ``outputs``, so the columns are positioned together.
+        """
+        self._range_blocks = []
+        try:
+            generated_data = super().generate_range(start, stop, block_size, *args, inputs=inputs, **kwargs)
+            blocks = self._range_blocks
+        finally:
+            self._range_blocks = None
+        if blocks:
+            first_position = (start // block_size) * block_size
+            self._columns = [np.concatenate([block[output] for block in blocks])[start - first_position:stop - first_position]
+                                for output in range(len(self.marginals))]
+            self._generation += 1
+        return generated_data
+
+    def _take_column(self, output, k, taken_generation):
+        """The column ``output`` of the last generation, if it has k rows and wasn't taken by it's generator yet."""
+        if self._columns is None or taken_generation == self._generation or len(self._columns[output]) != k:
+            raise ValueError(f"The column {output} of '{self.name}' has to be generated right after '{self.name}' generates {k} rows, " \
+                                f"put all of it's outputs in the same model.")
+        return self._columns[output]
+
+
+class CorrelatedColumnGenerator(GeneratorObject):
+    """Generator of one of the columns of a ``CorrelatedGenerator``, other than it's first.
+
+        It takes the ``CorrelatedGenerator`` as an input, so a model generates it after it, and returns it's column of the same rows.
+        Create it with ``CorrelatedGenerator.outputs``.
+
+        Parameters
+        ----------
+        source : CorrelatedGenerator
+            The generator of the rows.
+        output : int
+            The index of the column in the rows.
+        *args
+            Variable length argument list
+        **kwargs
+            Arbitrary keyword arguments.
+
+        Attributes
+        ----------
+        output : int
+            The index of the column in the rows.
+    """
+    def __init__(self, source, output, *args, **kwargs):
+        super().__init__(inputs=[source.name], *args, **kwargs)
+        self._source = source
+        self._taken_generation = None
+        self.output = output
+
+    def _preprocess_data(self, k, inputs=None, *args, **kwargs):
+        """Take the column of the rows the ``CorrelatedGenerator`` generated last.
+
+            Raises
+            ------
+            ValueError
+                If the ``CorrelatedGenerator`` didn't generate k rows since this column was last taken.
+        """
+        return self._data_generator(k)
+
+    @GeneratingFunction
+    def _data_generator(self, k):
+        column = self._source._take_column(self.output, k, self._taken_generation)
+        self._taken_generation = self._source._generation
+        return column
+
+    def generate_range(self, start, stop, block_size=DEFAULT_BLOCK_SIZE, *args, inputs=None, **kwargs):
+        """The column of the rows in positions [start, stop), which the ``CorrelatedGenerator`` generated last."""
+        if stop <= start:
+            return tuple()
+        return self(stop - start)
@@ -0,0 +1,219 @@
+from ..BaseGenerators import NumericGenerator, DEFAULT_BLOCK_SIZE
+from ..GeneratorDecorators import GeneratingFunction
+from ... import Instrumentation
+from copy import copy
+import numpy as np
+
+
+# How many rounds the Feistel network of a 'UniqueIntegerGenerator' permutation has.
+FEISTEL_ROUNDS = 6
+
+# The multipliers of the round function, from the splitmix64 finalizer.
+ROUND_MULTIPLIERS = (np.uint64(0xBF58476D1CE4E5B9), np.uint64(0x94D049BB133111EB))
+
+
+def _feistel(values, keys, half_bits):
+    """Apply a balanced Feistel network over ``2 * half_bits`` bits to every value, a permutation of [0, 2**(2 * half_bits))."""
+    half_mask = np.uint64((1 << half_bits) - 1)
+    shift = np.uint64(half_bits)
+    left = values >> shift
+    right = values & half_mask
+    for key in keys:
+        mixed = (right ^ key) * ROUND_MULTIPLIERS[0]
+        mixed ^= mixed >> np.uint64(31)
+        mixed *= ROUND_MULTIPLIERS[1]
+        mixed ^= mixed >> np.uint64(29)
+        left, right = right, left ^ (mixed & half_mask)
+    return (left << shift) | right
+
+
+class UniqueIntegerGenerator(NumericGenerator):
+    """Generator to generate k unique integers in a given range, without keeping what was generated.
+
+        The n-th sample is the n-th position of [low, high) passed through a permutation of the range,
+        a Feistel network keyed by the seed, with cycle-walking to stay in the range (values outside of it are passed through the network again).
+        Meaning the samples never repeat until the range is exhausted, and generating them takes O(1) memory,
+        regardless of the size of the range or how many samples were generated, unlike ``IntegerGenerator`` with ``BaseModel``'s ``index_attempts``.
+
+        Any position can be generated directly with ``permute`` or ``generate_range``,
+        and ``spawn_shards`` splits the remaining positions between the shards, so shards never generate the same integer.
+
+        .. note::
+            The permutation makes the integers look random, it's not a cryptographic permutation.
+
+        Parameters
+        ----------
+        low : int
+            Minimum value for the generator.
+        high : int
+            The generator generates integers lower than ``high``.
+        *args
+            Variable length argument list
+        **kwargs
+            Arbitrary keyword arguments.
+
+        Attributes
+        ----------
+        position : int
+            How many positions of it's sequence this generator used.
+        offset : int
+            The position in the range of the first position of this generator's sequence (not 0 for shards).
+        stride : int
+            The distance in the range between consecutive positions of this generator's sequence (the number of shards).
+
+        Raises
+        ------
+        ValueError
+            If ``low``>``high``, or the range has more than 2**62 integers.
+
+        See Also
+        --------
+        data_generators.BaseGenerators.NumericGenerator : All the available functionalities derived from ``NumericGenerator``.
+
+        Examples
+        --------
+        Using a ``UniqueIntegerGenerator`` to generate IDs:
+
+        >>> from makedata.data_generators.numeric_generators.UniqueNumerics import UniqueIntegerGenerator
+        >>> gen = UniqueIntegerGenerator(0, 10**9, seed=42)
+        >>> gen(3)
+        (744342655, 13940413, 534746114)
+        >>> gen.permute([1])
+        array([13940413])
+    """
+    def __init__(self, low, high, *args, **kwargs):
+        super().__init__(low, high, *args, **kwargs)
+        if high - low > 2**62:
+            raise ValueError(f"The range [{low}, {high}) is too big, it can have at most 2**62 integers.")
+        self.low = int(low)
+        self.high = int(high)
+
+        # The position is a part of the definition, since it (and not the random generator) decides what is generated next.
+        self.position = 0
+        self.offset = 0
+        self.stride = 1
+
+    def reset_seed(self, seed, bit_generator=None):
+        super().reset_seed(seed, bit_generator)
+        # The permutation is keyed by the seed sequence, so it doesn't depend on the random generator's state.
+        self._keys = self.seed_sequence.generate_state(FEISTEL_ROUNDS, dtype=np.uint64)
+
+    def permute(self, positions):
+        """The integers in the given positions of the permuted range.
+
+            Parameters
+            ----------
+            positions : array_like of ints
+                Positions in [0, high - low).
+
+            Returns
+            -------
+            numpy.ndarray
+                The integers in these positions.
+
+            Raises
+            ------
+            ValueError
+                If a position is outside of the range.
+        """
+        positions = np.asarray(positions, dtype=np.int64)
+        size = self.high - self.low
+        if positions.size and (positions.min() < 0 or positions.max() >= size):
+            raise ValueError(f"The positions have to be in [0, {size}), the range of the generator {self.name} is exhausted.")
+
+        half_bits = (max((size - 1).bit_length(), 1) + 1) // 2
+        permuted = _feistel(positions.astype(np.uint64), self._keys, half_bits)
+
+        # Cycle-walking, the network covers at most 4 times the range, so it takes a few rounds at most.
+        walking = np.flatnonzero(permuted >= size)
+        while walking.size:
+            permuted[walking] = _feistel(permuted[walking], self._keys, half_bits)
+            walking = walking[permuted[walking] >= size]
+
+        return permuted.astype(np.int64) + self.low
+
+    def spawn_shards(self, n):
+        """Create n copies of this ``UniqueIntegerGenerator``, that split the remaining positions of it's sequence between them.
+
+            Shard i takes every n-th of the remaining positions, starting from the i-th one,
+            so the shards use the same permutation, and never generate the same integer as each other.
+
+            Parameters
+            ----------
+            n : int
+                How many shards to create.
+
+            Returns
+            -------
+            list
+                The n shards.
+
+            Examples
+            --------
+            Splitting the IDs between 2 workers:
+
+            >>> from makedata.data_generators.numeric_generators.UniqueNumerics import UniqueIntegerGenerator
+            >>> gen = UniqueIntegerGenerator(0, 10, seed=42)
+            >>> first, second = gen.spawn_shards(2)
+            >>> first(5), second(5)
+            ((8, 5, 4, 1, 3), (6, 9, 0, 7, 2))
+        """
+        shards = []
+        for index in range(n):
+            shard = copy(self)
+            shard.offset = self.offset + self.stride * (self.position + index)
+            shard.stride = self.stride * n
+            shard.position = 0
+            shards.append(shard)
+        return shards
+
+    def generate_range(self, start, stop, block_size=DEFAULT_BLOCK_SIZE, *args, **kwargs):
+        """Generate the samples in positions [start, stop) of this generator's sequence.
+
+            The sequence is position-addressable by itself, so unlike other generators it doesn't use blocks,
+            and the range is the same samples a call would generate at these positions.
+
+            Parameters
+            ----------
+            start : int
+                The position of the first sample.
+            stop : int
+                The position after the last sample.
+            block_size : int, optional
+                Not used, kept for compatibility with ``GeneratorObject.generate_range``.
+
+            Returns
+            -------
+            tuple
+                The ``stop - start`` samples.
+        """
+        if stop <= start:
+            return tuple()
+        positions = self.offset + self.stride * np.arange(start, stop, dtype=np.int64)
+        self.samples_generated += stop - start
+        registry = Instrumentation.active_registry
+        if registry is not None:
+            return tuple(registry.timed_call(self, self.name, stop - start, self.permute, positions))
+        return tuple(self.permute(positions))
+
+    def get_state(self):
+        state = super().get_state()
+        state["position"] = self.position
+        return state
+
+    def set_state(self, state):
+        super().set_state(state)
+        self.position = state["position"]
+
+    @GeneratingFunction
+    def _data_generator(self, k):
+        """Generate the next k unique integers.
+
+            Parameters
+            ----------
+            k : int
+                Generate k samples.
+        """
+        generated_data = self.permute(self.offset + self.stride * np.arange(self.position, self.position + k, dtype=np.int64))
+        self.position += k
+        return generated_data
@@ -4,6 +4,25 @@ import numpy as np
 import json
 from .ModelFormats import ModelFormats
 from collections import OrderedDict
+from numpy.random import SeedSequence
+from ..data_generators.BaseGenerators import DEFAULT_BLOCK_SIZE, run_in_executor, column_tuple
+from ..data_generators.UniquenessTrackers import UniquenessTracker, hash_values
+from os.path import isfile
+from concurrent.futures import ThreadPoolExecutor
+from math import ceil
+import os
+from .. import Instrumentation
+from . import LoadGeneration
+
+
+# The estimated acceptance rate of the constraints is padded by this factor, so a round of rejection sampling rarely falls short.
+CONSTRAINT_MARGIN = 1.1
+
+# The most rows a round of rejection sampling draws, as a multiple of the rows still missing.
+MAX_OVERSAMPLE = 100
+
+# How many rounds of rejection sampling are drawn before giving up on the constraints.
+CONSTRAINT_ROUNDS = 100
 
 
 class BaseModel():
@@ -17,20 +36,53 @@ class BaseModel():
     generators : list of GeneratorObjects
         A list of ``GeneraotrObject`` that the model will use for data generation. For every single data sample generated,
         the model will use every ``GeneratorObject`` in the order they were introduced in the list.
-    seed : int or float or str, optional
-        A random seed to use on all of the generators. If a generator already has a seed, it will overwrite it if ``overwrite_seeds=True``.
+    seed : None or int or array_like[ints] or numpy.random.SeedSequence, optional
+        | A random seed for the model. Every generator is seeded with it's own child of the model's ``numpy.random.SeedSequence``
+        | (spawned in the order of ``generators``), so the columns draw independent streams, and are reproducible from the model's seed.
+        | If a generator already has a seed, it will overwrite it if ``overwrite_seeds=True``.
     overwrite_seeds : bool, optional
         If true, overwrite all of the generators random seeds, else, add a seed to ones that don't have any seed.
         **BE CAREFULL, CHANING A ``GeneratorObject`` SEED IS AN INPLACE ACTION**
     name : str, optional
         The name of the model, if not provided, it will be infered from the number of models existing in the project.
+    bit_generator : str, optional
+        The name of the bit generator to use for the generators seeded by the model (e.g. 'SFC64' or 'Philox'). If not given, every generator keeps it's own.
+    block_size : int, optional
+        How many samples every block of the model's position-addressable stream has (see ``generate_range``).
+    max_workers : int, optional
+        | If bigger than 1, generate independent columns (that don't depend on each other through ``inputs``) concurrently, in a pool of this many threads.
+        | Worth it when the generators spend their time in numpy (which releases the GIL), the data is the same either way.
+    constraints : list of callables, optional
+        | Rules every generated row has to follow, see ``add_constraint``.
+
+    Raises
+    ------
+    ValueError
+        If a generator's ``inputs`` name a column the model doesn't have, or the inputs have a cycle.
 
     Attributes
     ----------
     model_counter : collections.Counter
         A counter used to keep track of how many ``Model`` of each type are created.
+    seed_sequence : numpy.random.SeedSequence or None
+        The seed sequence of the model, the root of the generators seeds. None if no seed was given.
+    rows_generated : int
+        How many rows this model generated, a progress counter saved with it's state.
+    stream_position : int
+        The position after the last row generated from the model's position-addressable stream, where ``append`` continues from.
     gens_dict : collections.OrderedDict
         A dictinoary that is used to access all the generators that exist inside this model.
+    generation_levels : tuple
+        | The names of the generators grouped to levels in dependency order, every generator's inputs are in earlier levels.
+        | Columns are generated level by level, and the generators of a level are independent of each other.
+    max_workers : int or None
+        The number of threads independent columns are generated in.
+    constraints : list of callables
+        The constraints of the rows.
+    acceptance_rate : float
+        The fraction of the rows the constraints (and unique columns) accepted in the last generation, the oversampling of the next generation is based on it.
+    unique_trackers : dict
+        A mapping between the names of the columns that are kept unique across generations and their ``UniquenessTracker``, see ``track_unique``.
     name : str, optional
         The name of a ``Model``.
 
@@ -56,17 +108,24 @@ class BaseModel():
 
     model_counter = Counter()
 
-    def __init__(self, generators, seed=None, overwrite_seeds=False, name=None):
+    def __init__(self, generators, seed=None, overwrite_seeds=False, name=None, bit_generator=None, block_size=DEFAULT_BLOCK_SIZE, max_workers=None,
+                    constraints=None):
         
         self.gens_dict = OrderedDict()
         for gen in generators:
-            if seed is not None:
-                if overwrite_seeds:
-                    gen.reset_seed(seed)
-                else:
-                    if gen.seed is None:
-                        gen.reset_seed(seed)
             self.gens_dict[gen.name] = gen
+        self.generation_levels = self._resolve_generation_levels()
+        self.max_workers = max_workers
+        self.constraints = list(constraints) if constraints is not None else []
+        self.acceptance_rate = 1.0
+        self.unique_trackers = dict()
+
+        self.seed_sequence = None
+        if seed is not None:
+            self._seed_generators(seed, overwrite_seeds, bit_generator)
+        self.rows_generated = 0
+        self.block_size = block_size
+        self.stream_position = 0
 
         my_type = self.__class__.__name__
         if name is not None:
@@ -81,7 +140,83 @@ class BaseModel():
         """Call self.generate_data to generate data."""
         return self.generate_data(*args, **kwargs)
 
-    def generate_data(self, k, return_type=ModelFormats.DICT, split_samples=True, index_key=None, drop_index=True, index_attempts=1, save_path=None):
+    def add_constraint(self, constraint):
+        """Add a rule every generated row has to follow.
+
+            A constraint is a vectorized predicate: it gets a mapping between every generator's name and it's column as a ``numpy.ndarray``,
+            and returns a boolean array, True for the rows that follow the rule. Rows that don't follow all the constraints are dropped,
+            and the model oversamples by the measured acceptance rate, so ``k`` rows that follow them are generated in one or a few rounds.
+
+            .. note::
+                A model with constraints generates with ``generate_data`` (and it's chunked and asynchronous variants),
+                it's rows can't be addressed by position, so ``generate_range`` can't be used.
+
+            Parameters
+            ----------
+            constraint : callable
+                The predicate.
+
+            Examples
+            --------
+            Shifts that end after they start, and admins who are adults:
+
+            >>> shiftModel.add_constraint(lambda columns: columns["End"] > columns["Start"])
+            >>> shiftModel.add_constraint(lambda columns: (columns["Role"] != "admin") | (columns["Age"] >= 18))
+        """
+        self.constraints.append(constraint)
+
+    def track_unique(self, name, tracker=None, **options):
+        """Keep a column unique across all the generations of this model, e.g. the chunks of an export.
+
+            Rows whose value of the column was already generated (in this generation or an earlier one) are rejected like rows that don't follow
+            the constraints, and generated again, so the other columns of a row stay consistent with it. The values are checked against the tracker
+            in vectorized batches, and the tracker keeps their hashes in bounded memory.
+
+            .. note::
+                | Like a model with constraints, a model with unique columns can't use ``generate_range`` (or the ``cache`` of ``generate_data``).
+                | The trackers are not part of the model's state, a tracker is shared by passing it to the models (in the same process).
+
+            Parameters
+            ----------
+            name : str
+                The name of the column's generator.
+            tracker : UniquenessTracker, optional
+                The tracker of the column, if not given a new one is created with ``options``.
+            **options
+                Arguments of the new ``UniquenessTracker`` (e.g. mode='bloom', or spill_dir).
+
+            Returns
+            -------
+            UniquenessTracker
+                The tracker of the column.
+
+            Raises
+            ------
+            ValueError
+                If the model has no generator named ``name``.
+
+            Examples
+            --------
+            Exporting users in chunks, with usernames that are unique across all the chunks:
+
+            >>> userModel.track_unique("Username", spill_dir="/tmp")
+            >>> for chunk in userModel.iter_chunks(10**8, 10**6, return_type=ModelFormats.DF):
+            ...     write_chunk(chunk)
+        """
+        if name not in self.gens_dict:
+            raise ValueError(f"The model '{self.name}' has no generator named '{name}'.")
+        self.unique_trackers[name] = tracker if tracker is not None else UniquenessTracker(**options)
+        return self.unique_trackers[name]
+
+    @property
+    def position_addressable(self):
+        """Whether the rows of this model can be addressed by position (with ``generate_range``).
+
+            False if it has constraints or unique columns, or a generator that can't generate ranges (e.g. an ordered ``DateGenerator``).
+        """
+        return not self.constraints and not self.unique_trackers and all(generator.position_addressable for generator in self.gens_dict.values())
+
+    def generate_data(self, k, return_type=ModelFormats.DICT, split_samples=True, index_key=None, drop_index=True, index_attempts=1, save_path=None, cache=None):
         """Generate k samples from this model.
 
             Parameters
@@ -100,6 +235,13 @@ class BaseModel():
                 How many times to try to generate a unique index/key before raising an exception.
             save_path : str
                 If 'return_type' is about saving data, this is the path to the file you want to save it in.
+            cache : ModelCache, optional
+                A cache of generated data, if the same data was already generated (same model, state and ``k``) it is loaded from the cache instead.
+
+            Raises
+            ------
+            ValueError
+                If a ``cache`` is given to a model with unique columns, their trackers would miss the loaded values.
 
             See Also
             --------
@@ -124,53 +266,716 @@ class BaseModel():
             'Christina Cordrey': {'Age': 43, 'DayOfYear': '09-06-2019'}, 
             'Yaretzi Boone': {'Age': 43, 'DayOfYear': '07-06-2019'}}
         """
-        # TODO add uniqueness to generators
-        generated_data = {name: generator(k) for name, generator in self.gens_dict.items()}
+        if cache is not None and self.unique_trackers:
+            raise ValueError(f"The model '{self.name}' has unique columns, so it's data can't be loaded from a cache.")
 
-        if index_key is not None:
-            attempts_counter = 0
-            while len(set(generated_data[index_key])) != k and attempts_counter < index_attempts:
-                generated_data[index_key] = self.gens_dict[index_key](k)
-            if len(set(generated_data[index_key])) != k:
-                raise IndexError(f"Couldn't create a unique index with 'GeneratorObject' named {index_key}, " \
-                                f"even after {index_attempts}, make sure it can generate enough data (has big enough range, big enough data source etc.)")
-
-        for data_col in generated_data.values():
-            if not isinstance(data_col, tuple):
-                raise TypeError(f"Data generated by 'GeneratorObject' with name '{data_col}' is not of type 'tuple', " \
-                                    "if it is a generotr you wrote, check that the 'GeneratorObject' returns a tuple.")
+        def generate():
+            if cache is not None:
+                return cache.get_or_generate(self, k, index_key=index_key, index_attempts=index_attempts)
+            return self._generate_columns(k, index_key, index_attempts)
+
+        return self._emit(generate, k, return_type, split_samples, index_key, drop_index, save_path)
+
+    def _emit(self, generate, rows, return_type=ModelFormats.DICT, split_samples=True, index_key=None, drop_index=True, save_path=None, append=False, first_index=0):
+        """Generate the columns with ``generate()`` and convert them to ``return_type`` (see ``_format_output``).
+
+            While a ``MetricsRegistry`` is active, the generation and the output are timed as phases of the model's call,
+            and the rows and bytes are counted for the sink: the file in ``save_path``, or the ``return_type``.
+        """
+        registry = Instrumentation.active_registry
+        if registry is None:
+            return self._format_output(generate(), return_type, split_samples, index_key, drop_index, save_path, append, first_index)
+
+        saving = return_type in (ModelFormats.SAVE_CSV, ModelFormats.SAVE_JSON, ModelFormats.SAVE_NDJSON)
+        registry.start_call(self, self.name, "generation")
+        try:
+            generated_data = generate()
+            registry.lap(self, next_phase="output")
+            size_before = os.path.getsize(save_path) if saving and append and save_path is not None and isfile(save_path) else 0
+            output = self._format_output(generated_data, return_type, split_samples, index_key, drop_index, save_path, append, first_index)
+        finally:
+            registry.end_call(self)
+
+        sink = save_path if saving else return_type.name
+        registry.add_count(self.name, "rows", rows)
+        registry.add_count(sink, "rows", rows)
+        if saving:
+            registry.add_count(sink, "bytes", os.path.getsize(save_path) - size_before)
+        elif isinstance(output, str):
+            registry.add_count(sink, "bytes", len(output.encode("utf-8")))
+        return output
+
+    @staticmethod
+    def _format_output(generated_data, return_type=ModelFormats.DICT, split_samples=True, index_key=None, drop_index=True, save_path=None, append=False, first_index=0):
+        """Convert generated columns to ``return_type``, or save them to ``save_path``.
+
+            Parameters
+            ----------
+            generated_data : dict
+                A mapping between every generator's name and it's generated column.
+            append : bool, optional
+                If ``True``, append to the file in ``save_path`` (if it exists) instead of overwriting it. Only CSV and NDJSON files can be appended to.
+            first_index : int, optional
+                The index of the first sample, when no ``index_key`` is used.
 
+            See Also
+            --------
+            generate_data : The description of the rest of the parameters.
+        """
         if return_type == ModelFormats.DICT:
             if split_samples:
-                return BaseModel._invert_dict(generated_data, index_key, drop_index)
+                return BaseModel._invert_dict(generated_data, index_key, drop_index, first_index)
             return generated_data
 
         if return_type == ModelFormats.DF:
-            if index_key is not None:
-                return pd.DataFrame.from_dict(generated_data).set_index(index_key, drop=drop_index)
-            return pd.DataFrame.from_dict(generated_data)
+            return BaseModel._data_frame(generated_data, index_key, drop_index, first_index)
+
+        if return_type in (ModelFormats.JSON, ModelFormats.SAVE_JSON):
+            # JSON has no numpy types, numeric columns are converted to python numbers (of the same value) in one step each.
+            generated_data = BaseModel._native_columns(generated_data)
 
         if return_type == ModelFormats.JSON:
             if split_samples:
-                return json.dumps(BaseModel._invert_dict(generated_data, index_key, drop_index), ensure_ascii=False)
+                return json.dumps(BaseModel._invert_dict(generated_data, index_key, drop_index, first_index), ensure_ascii=False)
             return json.dumps(generated_data, ensure_ascii=False)
-        
+
+        if return_type in (ModelFormats.SAVE_CSV, ModelFormats.SAVE_JSON, ModelFormats.SAVE_NDJSON) and save_path is None:
+            raise ValueError("'save_path' can't be None if you intend to save a file.")
+        if append and return_type == ModelFormats.SAVE_JSON:
+            raise ValueError("A JSON file can't be appended to, use 'ModelFormats.SAVE_NDJSON' or 'ModelFormats.SAVE_CSV'.")
+
         if return_type == ModelFormats.SAVE_CSV:
-            if save_path is None:
-                raise ValueError("'save_path' can't be None if you intend to save a file.")
-            if index_key is not None:
-                pd.DataFrame.from_dict(generated_data).set_index(index_key, drop=drop_index).to_csv(save_path)
-            pd.DataFrame.from_dict(generated_data).to_csv(save_path)
-        
+            data_frame = BaseModel._data_frame(generated_data, index_key, drop_index, first_index)
+            if append:
+                data_frame.to_csv(save_path, mode="a", header=not isfile(save_path))
+            else:
+                data_frame.to_csv(save_path)
+
         if return_type == ModelFormats.SAVE_JSON:
-            if save_path is None:
-                raise ValueError("'save_path' can't be None if you intend to save a file.")
-            if split_samples:
-                json.dump(BaseModel._invert_dict(generated_data, index_key, drop_index), fp=save_path, ensure_ascii=False)
-            json.dump(generated_data, fp=save_path, ensure_ascii=False)
+            with open(save_path, "w", encoding="utf-8") as save_file:
+                if split_samples:
+                    json.dump(BaseModel._invert_dict(generated_data, index_key, drop_index, first_index), fp=save_file, ensure_ascii=False)
+                else:
+                    json.dump(generated_data, fp=save_file, ensure_ascii=False)
+
+        if return_type == ModelFormats.SAVE_NDJSON:
+            # Every sample is a line with all the columns (including the index column), so the file can be appended to.
+            lines = pd.DataFrame.from_dict(generated_data).to_json(orient="records", lines=True, force_ascii=False)
+            if lines and not lines.endswith("\n"):
+                lines += "\n"
+            with open(save_path, "a" if append else "w", encoding="utf-8") as save_file:
+                save_file.write(lines)
+
+    def _generate_columns(self, k, index_key=None, index_attempts=1):
+        """Generate k samples from every generator, as a dictionary of columns.
+
+            Parameters
+            ----------
+            k : int
+                How many samples to generate
+            index_key : str, optional
+                A name of a generator to use as a key/index, it's column is generated again until it's unique.
+            index_attempts : int
+                How many times to try to generate a unique index/key before raising an exception.
+
+            Returns
+            -------
+            dict
+                A mapping between every generator's name and it's generated column.
+
+            Raises
+            ------
+            IndexError
+                If a unique index couldn't be generated in ``index_attempts`` attempts.
+            TypeError
+                If a generator didn't return a tuple.
+        """
+        if self.constraints or self.unique_trackers:
+            columns = self._generate_constrained(k, index_key)
+        else:
+            def generate_column(name, inputs):
+                return self.gens_dict[name](k, inputs=inputs) if inputs is not None else self.gens_dict[name](k)
+
+            columns = self._generate_levels(generate_column, index_key, index_attempts, k)
+        self.rows_generated += k
+
+        # The columns are kept in the order of the generators, not the order they were generated in.
+        generated_data = {name: columns[name] for name in self.gens_dict}
+        for name, data_col in generated_data.items():
+            if not isinstance(data_col, tuple):
+                raise TypeError(f"Data generated by 'GeneratorObject' with name '{name}' is not of type 'tuple', " \
+                                    "if it is a generotr you wrote, check that the 'GeneratorObject' returns a tuple.")
+        return generated_data
+
+    def _generate_constrained(self, k, index_key=None):
+        """Generate k rows that follow all the constraints, by batched rejection sampling.
+
+            Every round draws the rows still missing, divided by the estimated acceptance rate, and keeps the accepted rows.
+            With ``index_key``, rows whose index was already accepted are rejected too, so the index is unique without ``index_attempts``.
+            Rows whose value of a unique column is in it's tracker, or was already accepted, are rejected the same way,
+            and the values of the k accepted rows are added to the trackers.
+
+            Returns
+            -------
+            dict
+                A mapping between every generator's name and it's column, in generation order.
+
+            Raises
+            ------
+            ValueError
+                If a constraint doesn't return a boolean array of a row per sample,
+                or fewer than k rows were accepted in ``CONSTRAINT_ROUNDS`` rounds.
+        """
+        accepted = {name: [] for name in self.gens_dict}
+        accepted_rows = drawn_rows = 0
+        acceptance_rate = self.acceptance_rate
+        index_arrays = []
+        unique_keys = {name: [] for name in self.unique_trackers}
+
+        for _ in range(CONSTRAINT_ROUNDS):
+            shortfall = k - accepted_rows
+            if shortfall <= 0:
+                break
+            n = min(ceil(shortfall * CONSTRAINT_MARGIN / max(acceptance_rate, 1 / MAX_OVERSAMPLE)), shortfall * MAX_OVERSAMPLE)
+
+            def generate_column(name, inputs):
+                return self.gens_dict[name](n, inputs=inputs) if inputs is not None else self.gens_dict[name](n)
+
+            arrays = {name: self._column_array(column) for name, column in self._generate_levels(generate_column).items()}
+            mask = np.ones(n, dtype=bool)
+            for constraint in self.constraints:
+                constraint_mask = np.asarray(constraint(arrays))
+                if constraint_mask.shape != (n,) or constraint_mask.dtype != bool:
+                    raise ValueError(f"The constraint '{getattr(constraint, '__name__', constraint)}' has to return a boolean array of {n} rows, " \
+                                        f"but returned an array of {constraint_mask.dtype} and shape {constraint_mask.shape}.")
+                mask &= constraint_mask
+
+            round_keys = dict()
+            for name, tracker in self.unique_trackers.items():
+                # Like the index, a value is kept once, if it isn't tracked or accepted in an earlier round.
+                round_keys[name] = keys = hash_values(arrays[name])
+                mask &= ~tracker.contains_keys(keys)
+                if unique_keys[name]:
+                    mask &= ~np.isin(keys, np.concatenate(unique_keys[name]))
+                mask = self._first_occurrences(keys, mask)
+
+            if index_key is not None:
+                # Only the first accepted row of every index value is kept, and only if the value wasn't accepted in an earlier round.
+                if index_arrays:
+                    mask &= ~np.isin(arrays[index_key], np.concatenate(index_arrays))
+                mask = self._first_occurrences(arrays[index_key], mask)
+                index_arrays.append(arrays[index_key][mask])
+
+            # The values are recorded once the mask is final, so they are exactly the values of the accepted rows.
+            for name, keys in round_keys.items():
+                unique_keys[name].append(keys[mask])
+
+            for name, array in arrays.items():
+                accepted[name].append(array[mask])
+            accepted_rows += int(mask.sum())
+            drawn_rows += n
+            # An estimate that never reaches 0, so the next round grows when nothing was accepted.
+            acceptance_rate = max(accepted_rows, 1) / drawn_rows
+
+        registry = Instrumentation.active_registry
+        if registry is not None:
+            registry.add_count(self.name, "rejected", drawn_rows - accepted_rows)
+        self.acceptance_rate = min(accepted_rows / drawn_rows, 1.0) if drawn_rows else self.acceptance_rate
+        if accepted_rows < k:
+            raise ValueError(f"Only {accepted_rows} of {k} rows followed the constraints of the model '{self.name}' after {CONSTRAINT_ROUNDS} rounds " \
+                                f"of {drawn_rows} rows, check that the constraints can be met (and the unique columns have enough values).")
+
+        for name, tracker in self.unique_trackers.items():
+            tracker.add_keys(np.concatenate(unique_keys[name])[:k])
+        return {name: self._column_tuple(np.concatenate(parts)[:k]) for name, parts in accepted.items()}
 
     @staticmethod
-    def _invert_dict(orig_dict, index_key=None, drop_index=True):
+    def _first_occurrences(values, mask):
+        """The mask of the first row of every value, among the rows in ``mask``."""
+        rows = np.flatnonzero(mask)
+        first_rows = np.zeros(len(mask), dtype=bool)
+        first_rows[rows[np.unique(values[rows], return_index=True)[1]]] = True
+        return first_rows
+
+    @staticmethod
+    def _column_array(column):
+        """A generated column as a one dimensional ``numpy.ndarray``, of objects if it's values are sequences."""
+        array = np.asarray(column)
+        if array.ndim != 1:
+            array = np.fromiter(column, dtype=object, count=len(column))
+        return array
+
+    def _generate_levels(self, generate_column, index_key=None, index_attempts=1, k=None):
+        """Generate all the columns level by level, passing every generator the arrays of it's input columns.
+
+            Parameters
+            ----------
+            generate_column : callable
+                ``generate_column(name, inputs)`` generates the column of a generator, ``inputs`` is None for independent generators.
+            index_key : str, optional
+                A name of a generator whose column is generated again until it's unique, before the columns that depend on it.
+            index_attempts : int, optional
+                How many times to try to generate a unique index/key.
+            k : int, optional
+                The number of rows, required with ``index_key``.
+
+            Returns
+            -------
+            dict
+                A mapping between every generator's name and it's column, in generation order.
+
+            Raises
+            ------
+            IndexError
+                If a unique index couldn't be generated in ``index_attempts`` attempts.
+        """
+        columns = dict()
+        # Every column is converted to an array once, when the first generator that takes it as an input needs it.
+        arrays = dict()
+
+        def column_inputs(name):
+            generator_inputs = self.gens_dict[name].inputs
+            if not generator_inputs:
+                return None
+            for input_name in generator_inputs:
+                if input_name not in arrays:
+                    arrays[input_name] = np.asarray(columns[input_name])
+            return {input_name: arrays[input_name] for input_name in generator_inputs}
+
+        executor = ThreadPoolExecutor(self.max_workers) if self.max_workers is not None and self.max_workers > 1 else None
+        try:
+            for level in self.generation_levels:
+                level_inputs = [column_inputs(name) for name in level]
+                if executor is not None and len(level) > 1:
+                    level_columns = list(executor.map(generate_column, level, level_inputs))
+                else:
+                    level_columns = [generate_column(name, inputs) for name, inputs in zip(level, level_inputs)]
+                columns.update(zip(level, level_columns))
+
+                # The index is made unique before any column derived from it is generated.
+                if index_key in level:
+                    attempts_counter = 1
+                    while len(set(columns[index_key])) != k and attempts_counter < index_attempts:
+                        columns[index_key] = generate_column(index_key, column_inputs(index_key))
+                        attempts_counter += 1
+                    if len(set(columns[index_key])) != k:
+                        raise IndexError(f"Couldn't create a unique index with 'GeneratorObject' named {index_key}, " \
+                                        f"even after {index_attempts}, make sure it can generate enough data (has big enough range, big enough data source etc.)")
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        return columns
+
+    def _resolve_generation_levels(self):
+        """Group the generators to levels in dependency order by their ``inputs`` (a topological sort of the columns DAG).
+
+            Returns
+            -------
+            tuple
+                A tuple of levels, every level a tuple of generators names in the order of the model.
+
+            Raises
+            ------
+            ValueError
+                If an input is not a generator of this model, or the inputs have a cycle.
+        """
+        for name, generator in self.gens_dict.items():
+            unknown = [input_name for input_name in generator.inputs if input_name not in self.gens_dict]
+            if unknown:
+                raise ValueError(f"The inputs {unknown} of the generator '{name}' are not generators of the model.")
+
+        levels = []
+        placed = set()
+        remaining = list(self.gens_dict)
+        while remaining:
+            level = tuple(name for name in remaining if all(input_name in placed for input_name in self.gens_dict[name].inputs))
+            if not level:
+                raise ValueError(f"The inputs of the generators {remaining} have a cycle.")
+            levels.append(level)
+            placed.update(level)
+            remaining = [name for name in remaining if name not in placed]
+        return tuple(levels)
+
+    def generate_range(self, start, stop, return_type=ModelFormats.DICT, split_samples=True, index_key=None, drop_index=True, save_path=None, append=False):
+        """Generate the rows in positions [start, stop) of this model's position-addressable stream.
+
+            Every generator generates it's column with ``GeneratorObject.generate_range``, so any range of rows can be generated
+            without generating the rows before it, and the rows of [k, k+n) are exactly the rows a single [0, k+n) call generates.
+            Rows are numbered by their position in the stream.
+
+            Parameters
+            ----------
+            start : int
+                The position of the first row.
+            stop : int
+                The position after the last row.
+            append : bool, optional
+                If ``True``, append to the file in ``save_path`` instead of overwriting it.
+
+            See Also
+            --------
+            generate_data : The description of the rest of the parameters.
+            append : Append the next rows of the stream to a file.
+
+            Raises
+            ------
+            ValueError
+                If the model has constraints, unique columns or ordered generators.
+        """
+        if not self.position_addressable:
+            raise ValueError(f"The model '{self.name}' has constraints, unique columns or ordered generators, so it's rows can't be addressed by position, use 'generate_data'.")
+
+        def generate_column(name, inputs):
+            return self.gens_dict[name].generate_range(start, stop, self.block_size, inputs=inputs)
+
+        def generate():
+            columns = self._generate_levels(generate_column)
+            self.rows_generated += max(stop - start, 0)
+            self.stream_position = max(stop, start)
+            return {name: columns[name] for name in self.gens_dict}
+
+        return self._emit(generate, max(stop - start, 0), return_type, split_samples, index_key, drop_index, save_path, append, first_index=start)
+
+    def append(self, n, save_path, return_type=ModelFormats.SAVE_CSV, index_key=None, drop_index=True, start=None):
+        """Append the next n rows of this model's position-addressable stream to a CSV or NDJSON file, in O(n).
+
+            Parameters
+            ----------
+            n : int
+                How many rows to append.
+            save_path : str
+                The path of the file to append to, it is created if it doesn't exist.
+            return_type : ModelFormats, optional
+                The format of the file, ``ModelFormats.SAVE_CSV`` or ``ModelFormats.SAVE_NDJSON``.
+            index_key : str, optional
+                A name of a generator to use as a key/index.
+            drop_index : bool, optional
+                If ``True``,  remove ``index_key`` from the data sample.
+            start : int, optional
+                The position of the first row to append. If not given, continue from ``stream_position``
+                (restored with the model's state, so an export can be continued in another process with ``load_checkpoint``).
+
+            Examples
+            --------
+            Growing a fixture file from 1000 to 1500 rows, producing the same file as generating 1500 rows at once:
+
+            >>> personModel.generate_range(0, 1000, return_type=ModelFormats.SAVE_CSV, save_path="people.csv")
+            >>> personModel.append(500, "people.csv")
+        """
+        if return_type not in (ModelFormats.SAVE_CSV, ModelFormats.SAVE_NDJSON):
+            raise ValueError(f"Can only append to 'ModelFormats.SAVE_CSV' or 'ModelFormats.SAVE_NDJSON' files, not '{return_type}'.")
+        start = self.stream_position if start is None else start
+        self.generate_range(start, start + n, return_type, index_key=index_key, drop_index=drop_index, save_path=save_path, append=True)
+
+    def iter_chunks(self, k, chunk_size, checkpoint_path=None, checkpoint_every=1, **kwargs):
+        """Generate k samples in chunks of ``chunk_size``, optionally checkpointing the progress to resume after a crash.
+
+            With ``checkpoint_path``, the state of the model and the export progress are saved every ``checkpoint_every`` chunks,
+            and if the checkpoint file already exists when starting, the model is restored from it and the export continues from the saved chunk.
+            A resumed export yields exactly the chunks the uninterrupted export would have yielded.
+
+            .. note::
+                A checkpoint is saved when the next chunk is requested (or the export ends), so write each chunk out before asking for the next one.
+                When resuming, discard any output written after the last checkpoint (``rows_done`` rows were written by then).
+
+            Parameters
+            ----------
+            k : int
+                How many samples to generate in total.
+            chunk_size : int
+                How many samples to generate in every chunk.
+            checkpoint_path : str, optional
+                The path of the checkpoint file (JSON).
+            checkpoint_every : int, optional
+                Save a checkpoint every ``checkpoint_every`` chunks.
+            **kwargs
+                Arguments passed to ``generate_data`` for every chunk.
+
+            Yields
+            ------
+            The result of ``generate_data`` for every chunk.
+
+            Raises
+            ------
+            ValueError
+                If the existing checkpoint is of an export with a different ``k`` or ``chunk_size``.
+
+            Examples
+            --------
+            Exporting a model to a csv file and resuming it if the process died:
+
+            >>> for chunk in personModel.iter_chunks(10**8, 10**5, checkpoint_path="people.checkpoint.json", return_type=ModelFormats.DF):
+            ...     chunk.to_csv("people.csv", mode="a", header=False)
+        """
+        if chunk_size < 1:
+            raise ValueError(f"'chunk_size' has to be a positive integer, but is {chunk_size}.")
+
+        rows_done = 0
+        if checkpoint_path is not None and isfile(checkpoint_path):
+            checkpoint = self.load_checkpoint(checkpoint_path)
+            if checkpoint["k"] != k or checkpoint["chunk_size"] != chunk_size:
+                raise ValueError(f"The checkpoint '{checkpoint_path}' is of an export with k={checkpoint['k']} and chunk_size={checkpoint['chunk_size']}, " \
+                                    f"not k={k} and chunk_size={chunk_size}.")
+            rows_done = checkpoint["rows_done"]
+
+        chunks_done = 0
+        while rows_done < k:
+            current_size = min(chunk_size, k - rows_done)
+            yield self.generate_data(current_size, **kwargs)
+            rows_done += current_size
+            chunks_done += 1
+            if checkpoint_path is not None and (chunks_done % checkpoint_every == 0 or rows_done == k):
+                self.save_checkpoint(checkpoint_path, k=k, chunk_size=chunk_size, rows_done=rows_done)
+
+    async def agenerate(self, k, return_type=ModelFormats.DICT, split_samples=True, index_key=None, drop_index=True, index_attempts=1, save_path=None,
+                        chunk_size=None, executor=None):
+        """Generate k samples in an executor, the ``asyncio`` counterpart of ``generate_data``.
+
+            The event loop keeps running while the data is generated. Without ``chunk_size`` the data is generated in a single step,
+            exactly what ``generate_data`` would generate. With ``chunk_size`` the columns are generated in steps of at most ``chunk_size`` rows,
+            so a cancellation takes effect after the current step, and the data is the chunks ``iter_chunks(k, chunk_size)`` would generate, joined.
+
+            .. note::
+                Don't generate from the same model in several tasks at once, the steps of the tasks would interleave.
+
+            Parameters
+            ----------
+            chunk_size : int, optional
+                The maximum number of rows generated in a single step.
+            executor : concurrent.futures.Executor, optional
+                The executor to generate in, if not given the event loop's default executor is used.
+
+            Raises
+            ------
+            IndexError
+                If ``index_key`` is used, and it's column is not unique in all the chunks together.
+
+            See Also
+            --------
+            generate_data : The description of the rest of the parameters.
+
+            Examples
+            --------
+            Answering a request of a mock service:
+
+            >>> async def handle_people(request):
+            ...     people = await personModel.agenerate(int(request.query["count"]), return_type=ModelFormats.JSON, chunk_size=10**4)
+            ...     return web.Response(text=people, content_type="application/json")
+        """
+        if chunk_size is None:
+            return await run_in_executor(executor, self.generate_data, k, return_type, split_samples, index_key, drop_index, index_attempts, save_path)
+        if chunk_size < 1:
+            raise ValueError(f"'chunk_size' has to be a positive integer, but is {chunk_size}.")
+
+        columns = {name: [] for name in self.gens_dict}
+        for chunk_start in range(0, k, chunk_size):
+            chunk_data = await run_in_executor(executor, self._generate_columns, min(chunk_size, k - chunk_start), index_key, index_attempts)
+            for name, column in columns.items():
+                column.extend(chunk_data[name])
+        generated_data = {name: tuple(column) for name, column in columns.items()}
+
+        if index_key is not None and len(set(generated_data[index_key])) != k:
+            raise IndexError(f"The index '{index_key}' is not unique across the chunks, use a generator of unique values (e.g. 'UniqueIntegerGenerator').")
+        return await run_in_executor(executor, self._format_output, generated_data, return_type, split_samples, index_key, drop_index, save_path)
+
+    async def aiter_chunks(self, k, chunk_size, checkpoint_path=None, checkpoint_every=1, executor=None, **kwargs):
+        """Generate k samples in chunks of ``chunk_size`` in an executor, the ``asyncio`` counterpart of ``iter_chunks``.
+
+            Every chunk is generated in the executor, and the event loop runs between the chunks.
+            The chunks (and the checkpoints) are the ones ``iter_chunks`` generates with the same arguments.
+
+            Parameters
+            ----------
+            executor : concurrent.futures.Executor, optional
+                The executor to generate in, if not given the event loop's default executor is used.
+
+            Yields
+            ------
+            The result of ``generate_data`` for every chunk.
+
+            See Also
+            --------
+            iter_chunks : The description of the rest of the parameters.
+
+            Examples
+            --------
+            Streaming a big response in chunks:
+
+            >>> async for chunk in personModel.aiter_chunks(10**6, 10**4, return_type=ModelFormats.JSON):
+            ...     await response.write(chunk.encode("utf-8"))
+        """
+        chunks = self.iter_chunks(k, chunk_size, checkpoint_path, checkpoint_every, **kwargs)
+        # 'next' is given a default, since StopIteration can't be raised through a future.
+        exhausted = object()
+        try:
+            while True:
+                chunk = await run_in_executor(executor, next, chunks, exhausted)
+                if chunk is exhausted:
+                    break
+                yield chunk
+        finally:
+            chunks.close()
+
+    def stream(self, rate, sink, duration=None, interval=0.01, batch_size=None, batches_ahead=4, catch_up=True):
+        """Emit rows of this model's position-addressable stream to a sink at a target rate, for load tests.
+
+            Rows are generated ahead of the schedule in vectorized micro-batches, and emitted on a timer every ``interval`` seconds.
+            The stream continues from ``stream_position``, so the emitted rows are the rows ``generate_range`` generates in these positions
+            (or, with constraints, unique columns or ordered generators, the next rows ``generate_data`` generates).
+            Once the stream ends (or is interrupted), ``stream_position`` is after the last emitted row.
+
+            Parameters
+            ----------
+            rate : float or RateProfile
+                The target rate in rows per second, or a ``RateProfile`` of stages of constant and ramping rates.
+            sink : str or file object or callable
+                | A path of a file, 'tcp://host:port' or 'unix://path' of a local socket, or a text file object, written NDJSON lines,
+                | or a callable called with the list of rows (as dictionaries) of every tick.
+            duration : float, optional
+                How many seconds to stream a constant ``rate`` for, required if ``rate`` is a number.
+            interval : float, optional
+                The seconds between ticks.
+            batch_size : int, optional
+                How many rows every micro-batch has, by default a quarter of a second of rows at the peak rate.
+            batches_ahead : int, optional
+                | How many micro-batches can be generated ahead of the emission.
+                | When the sink blocks (backpressure), the generation waits for room, so memory stays bounded.
+            catch_up : bool, optional
+                If ``True``, the rows delayed by backpressure are emitted as soon as the sink unblocks, otherwise the schedule is pushed back by the stall.
+
+            Returns
+            -------
+            StreamReport
+                The achieved rate compared to the target, and the jitter of the ticks.
+
+            Raises
+            ------
+            ValueError
+                If ``rate`` is a number and ``duration`` is not given, or the sink is invalid.
+
+            See Also
+            --------
+            makedata.models.LoadGeneration.RateProfile : Rate profiles with ramps.
+
+            Examples
+            --------
+            Sending 2000 people per second for 5 minutes, after a minute of warm-up, to a service listening on a local socket:
+
+            >>> from makedata.models.LoadGeneration import RateProfile
+            >>> report = personModel.stream(RateProfile([(60, 0, 2000), (300, 2000)]), "tcp://127.0.0.1:9000")
+            >>> print(report)
+            660000 rows in 360.00s, 1,833.3 rows/sec (target 1,833.3), jitter mean 0.08ms std 0.05ms p99 0.31ms max 1.12ms, max lag 0 rows, 0 underruns, stalled 0.00s
+        """
+        if not isinstance(rate, LoadGeneration.RateProfile):
+            if duration is None:
+                raise ValueError("'duration' has to be given with a constant 'rate'.")
+            rate = LoadGeneration.RateProfile.constant(rate, duration)
+        return LoadGeneration.stream(self, rate, sink, interval, batch_size, batches_ahead, catch_up)
+
+    def get_state(self):
+        """The state of this model: the states of all of it's generators, it's progress counters and the acceptance rate of it's constraints.
+
+            Returns
+            -------
+            dict
+                A JSON serializable state, restore it with ``set_state``.
+        """
+        return {"name": self.name,
+                "rows_generated": self.rows_generated,
+                "stream_position": self.stream_position,
+                "acceptance_rate": self.acceptance_rate,
+                "generators": {name: generator.get_state() for name, generator in self.gens_dict.items()}}
+
+    def set_state(self, state):
+        """Restore a state taken with ``get_state``.
+
+            Parameters
+            ----------
+            state : dict
+                A state returned from ``get_state``.
+
+            Raises
+            ------
+            KeyError
+                If a generator of this model has no state in ``state``.
+        """
+        for name, generator in self.gens_dict.items():
+            try:
+                generator_state = state["generators"][name]
+            except KeyError:
+                raise KeyError(f"The state has no state for the 'GeneratorObject' named '{name}'.")
+            generator.set_state(generator_state)
+        self.rows_generated = state["rows_generated"]
+        self.stream_position = state["stream_position"]
+        # The acceptance rate decides how many rows the next generation draws, states saved before constraints existed have none.
+        self.acceptance_rate = state.get("acceptance_rate", 1.0)
+
+    def save_checkpoint(self, path, **progress):
+        """Save the state of this model to a JSON file.
+
+            The file is replaced atomically, so a crash while saving never leaves a broken checkpoint.
+
+            Parameters
+            ----------
+            path : str
+                The path of the checkpoint file.
+            **progress
+                Any JSON serializable progress information to save with the state.
+        """
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w") as checkpoint_file:
+            json.dump({"model": self.get_state(), **progress}, checkpoint_file)
+        os.replace(temp_path, path)
+
+    def load_checkpoint(self, path):
+        """Restore the state of this model from a checkpoint file saved with ``save_checkpoint``.
+
+            Parameters
+            ----------
+            path : str
+                The path of the checkpoint file.
+
+            Returns
+            -------
+            dict
+                The checkpoint, including the progress information saved with it.
+        """
+        with open(path, "r") as checkpoint_file:
+            checkpoint = json.load(checkpoint_file)
+        self.set_state(checkpoint["model"])
+        return checkpoint
+
+    @staticmethod
+    def _data_frame(generated_data, index_key=None, drop_index=True, first_index=0):
+        """Create a pandas DataFrame from generated columns, indexed by ``index_key`` or by position starting from ``first_index``."""
+        data_frame = pd.DataFrame.from_dict(generated_data)
+        if index_key is not None:
+            return data_frame.set_index(index_key, drop=drop_index)
+        if first_index:
+            data_frame.index = pd.RangeIndex(first_index, first_index + len(data_frame))
+        return data_frame
+
+    @staticmethod
+    def _native_columns(generated_data):
+        """The generated columns, with the columns of numpy scalars converted to python numbers."""
+        native_data = dict()
+        for name, column in generated_data.items():
+            if column and isinstance(column[0], np.generic):
+                array = np.asarray(column)
+                # A float32 becomes the python float of it's shortest representation, 0.1 and not 0.10000000149011612.
+                if array.dtype.kind == "f" and array.dtype.itemsize < 8:
+                    array = array.astype(str).astype(np.float64)
+                column = tuple(array.tolist())
+            native_data[name] = column
+        return native_data
+
+    @staticmethod
+    def _column_tuple(array):
+        """A column array as a tuple, see ``column_tuple``."""
+        return column_tuple(array)
+
+    @staticmethod
+    def _invert_dict(orig_dict, index_key=None, drop_index=True, first_index=0):
         """Split a column based model to individual samples (similar to a pandas DataFrame).
 
             Parameters
@@ -181,6 +986,8 @@ class BaseModel():
                 A name of a generator to use as a key/index. The ``name`` attribute of the ``GeneratorObject`` will be used.
             drop_index : bool, optional
                 If ``True``,  remove ``index_key`` column from the data sample, else, keep it as index as data.
+            first_index : int, optional
+                The index of the first sample, when no ``index_key`` is used.
         """
         samples_generator = zip(*orig_dict.values())
         keys = orig_dict.keys()
@@ -188,7 +995,7 @@ class BaseModel():
         if index_key is None:
             index_check_function = lambda k: True
             return_dict = {index: {key: value for key, value in zip(keys, sample_values) if index_check_function(key)} 
-                        for index, sample_values in enumerate(samples_generator)}
+                        for index, sample_values in enumerate(samples_generator, first_index)}
         else:
             index_check_function = lambda k: k != index_key
             return_dict = {index: {key: value for key, value in zip(keys, sample_values) if index_check_function(key)} 
@@ -197,13 +1004,37 @@ class BaseModel():
         return return_dict
 
     
-    def reset_seeds(self, seed):
+    def _seed_generators(self, seed, overwrite_seeds=True, bit_generator=None):
+        """Seed the generators from a ``numpy.random.SeedSequence`` hierarchy (model -> generator).
+
+            Every generator gets a child of the model's seed sequence by it's position in the model,
+            the children are spawned even for generators that keep their own seed, so a generator's seed never depends on the others.
+
+            Parameters
+            ----------
+            seed : None or int or array_like[ints] or numpy.random.SeedSequence
+                The seed of the model.
+            overwrite_seeds : bool, optional
+                If true, overwrite all of the generators random seeds, else, only seed the ones that don't have any seed.
+            bit_generator : str, optional
+                The name of the bit generator to use for the seeded generators.
+        """
+        self.seed_sequence = seed if isinstance(seed, SeedSequence) else SeedSequence(seed)
+        for generator, generator_seed in zip(self.gens_dict.values(), self.seed_sequence.spawn(len(self.gens_dict))):
+            if overwrite_seeds or generator.seed is None:
+                generator.reset_seed(generator_seed, bit_generator)
+
+    def reset_seeds(self, seed, bit_generator=None):
         """Reset the seed for **all** (overwrites existing ones) of this models list of ``GeneratorObject``.
 
+            Every generator is seeded with it's own child of ``seed``'s ``numpy.random.SeedSequence``.
+
             Parameters
             ----------
-            seed : int or float or str, optional
-                A random seed to use on **all** of the generators.
+            seed : None or int or array_like[ints] or numpy.random.SeedSequence
+                A random seed for the model.
+            bit_generator : str, optional
+                The name of the bit generator to use for the generators, if not given every generator keeps it's own.
 
             See Also
             --------
@@ -234,5 +1065,4 @@ class BaseModel():
             3: {'Full Name': 'Amina Freel', 'Age': 23, 'Birthday': '25-12-1992'}, 
             4: {'Full Name': 'Adrianna Maulden', 'Age': 26, 'Birthday': '19-02-1994'}}
         """
-        for generator in self.gens_dict.values():
-            generator.reset_seed(seed)
+        self._seed_generators(seed, bit_generator=bit_generator)
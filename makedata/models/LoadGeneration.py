@@ -0,0 +1,343 @@
+from collections import deque
+from math import ceil, floor
+from queue import Queue, Empty, Full
+import socket
+import threading
+import time
+import numpy as np
+import pandas as pd
+
+
+# How long (in seconds) before a tick the pacer stops sleeping and spins, since a sleep can overshoot by about a scheduler quantum.
+SPIN_SECONDS = 0.001
+
+# How many seconds of rows (at the peak rate of the profile) every pre-generated micro-batch has, by default.
+BATCH_SECONDS = 0.25
+
+# How long (in seconds) the generating thread waits for room in the buffer before checking if the stream was stopped.
+PUT_TIMEOUT = 0.1
+
+
+class RateProfile():
+    """A target rate (rows per second) over time, made of consecutive stages of constant or linearly changing rate.
+
+        Parameters
+        ----------
+        stages : list of tuples
+            | Every stage is ``(duration, rate)`` for a constant rate, or ``(duration, start_rate, end_rate)`` for a linear ramp,
+            | where ``duration`` is in seconds and the rates are in rows per second.
+
+        Raises
+        ------
+        ValueError
+            If there are no stages, a duration is not positive or a rate is negative.
+
+        Attributes
+        ----------
+        stages : tuple
+            The stages, as ``(duration, start_rate, end_rate)``.
+        duration : float
+            The duration of all the stages together, in seconds.
+
+        Examples
+        --------
+        Warming up from 100 to 5000 rows per second in a minute, holding for 10 minutes, and cooling down:
+
+        >>> profile = RateProfile([(60, 100, 5000), (600, 5000), (30, 5000, 0)])
+        >>> profile.rows_by(60)
+        153000
+    """
+    def __init__(self, stages):
+        if not stages:
+            raise ValueError("A rate profile has to have at least one stage.")
+        self.stages = []
+        for stage in stages:
+            if len(stage) not in (2, 3):
+                raise ValueError(f"A stage has to be (duration, rate) or (duration, start_rate, end_rate), but is {stage}.")
+            duration, start_rate, end_rate = stage if len(stage) == 3 else (stage[0], stage[1], stage[1])
+            if duration <= 0 or start_rate < 0 or end_rate < 0:
+                raise ValueError(f"A stage has to have a positive duration and non negative rates, but is {stage}.")
+            self.stages.append((duration, start_rate, end_rate))
+        self.stages = tuple(self.stages)
+        self.duration = sum(stage[0] for stage in self.stages)
+
+    @classmethod
+    def constant(cls, rate, duration):
+        """A profile of a constant ``rate`` for ``duration`` seconds."""
+        return cls([(duration, rate)])
+
+    @classmethod
+    def ramp(cls, start_rate, end_rate, duration):
+        """A profile of a rate changing linearly from ``start_rate`` to ``end_rate`` in ``duration`` seconds."""
+        return cls([(duration, start_rate, end_rate)])
+
+    @property
+    def peak_rate(self):
+        """The highest rate of the profile."""
+        return max(max(stage[1:]) for stage in self.stages)
+
+    @property
+    def total_rows(self):
+        """How many rows the profile emits in all of it's duration."""
+        return self.rows_by(self.duration)
+
+    def rate_at(self, seconds):
+        """The target rate ``seconds`` after the start, 0 after the profile ended."""
+        for duration, start_rate, end_rate in self.stages:
+            if seconds < duration:
+                return start_rate + (end_rate - start_rate) * seconds / duration
+            seconds -= duration
+        return 0
+
+    def rows_by(self, seconds):
+        """How many rows are due in the first ``seconds`` seconds (the integral of the rate, rounded down)."""
+        rows = 0.0
+        for duration, start_rate, end_rate in self.stages:
+            elapsed = min(max(seconds, 0), duration)
+            rows += start_rate * elapsed + (end_rate - start_rate) * elapsed**2 / (2 * duration)
+            seconds -= duration
+            if seconds <= 0:
+                break
+        # A tiny tolerance, so a whole number of rows isn't lost to a floating point error.
+        return floor(rows + 1e-9)
+
+
+class StreamReport():
+    """The achieved pacing of a ``BaseModel.stream``, compared to it's target.
+
+        Attributes
+        ----------
+        rows : int
+            How many rows were emitted.
+        target_rows : int
+            How many rows the profile has.
+        elapsed : float
+            The seconds from the start to the last emission.
+        target_rate : float
+            The mean rate of the profile, in rows per second.
+        achieved_rate : float
+            The mean rate the rows were emitted in.
+        ticks : int
+            How many times rows were emitted.
+        jitter_mean, jitter_std, jitter_p99, jitter_max : float
+            The lateness (in seconds) of the ticks, the time from when a tick was scheduled to when it's rows were emitted.
+        max_lag : int
+            The most rows that were overdue by more than a tick, when the sink applied backpressure.
+        underruns : int
+            How many ticks waited for rows to be generated, if it's not 0 the model can't keep up with the profile.
+        stalled : float
+            How many seconds the schedule was pushed back after the sink blocked, when not catching up.
+    """
+    def __init__(self, rows, target_rows, elapsed, duration, lateness, max_lag, underruns, stalled):
+        self.rows = rows
+        self.target_rows = target_rows
+        self.elapsed = elapsed
+        self.target_rate = target_rows / duration
+        self.achieved_rate = rows / elapsed if elapsed > 0 else 0.0
+        self.ticks = len(lateness)
+        lateness = np.asarray(lateness) if lateness else np.zeros(1)
+        self.jitter_mean = float(lateness.mean())
+        self.jitter_std = float(lateness.std())
+        self.jitter_p99 = float(np.percentile(lateness, 99))
+        self.jitter_max = float(lateness.max())
+        self.max_lag = max_lag
+        self.underruns = underruns
+        self.stalled = stalled
+
+    def as_dict(self):
+        """The report as a JSON serializable dictionary."""
+        return dict(vars(self))
+
+    def __str__(self):
+        return f"{self.rows} rows in {self.elapsed:.2f}s, {self.achieved_rate:,.1f} rows/sec (target {self.target_rate:,.1f}), " \
+                f"jitter mean {self.jitter_mean * 1000:.2f}ms std {self.jitter_std * 1000:.2f}ms p99 {self.jitter_p99 * 1000:.2f}ms " \
+                f"max {self.jitter_max * 1000:.2f}ms, max lag {self.max_lag} rows, {self.underruns} underruns, stalled {self.stalled:.2f}s"
+
+
+def _open_sink(sink):
+    """Turn a sink to a function that emits a list of rows, and a function that closes it.
+
+        A callable gets the rows as dictionaries, any other sink is written the rows as NDJSON lines.
+    """
+    if callable(sink) and not hasattr(sink, "write"):
+        return sink, lambda: None, False
+
+    if hasattr(sink, "write"):
+        def write(lines):
+            sink.write("".join(lines))
+            sink.flush()
+        return write, lambda: None, True
+
+    if not isinstance(sink, str):
+        raise ValueError(f"A sink has to be a path, 'tcp://host:port', 'unix://path', a text file or a callable, but is '{type(sink).__name__}'.")
+
+    if sink.startswith(("tcp://", "unix://")):
+        if sink.startswith("tcp://"):
+            host, _, port = sink[len("tcp://"):].rpartition(":")
+            connection = socket.create_connection((host, int(port)))
+        else:
+            connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            connection.connect(sink[len("unix://"):])
+        # 'sendall' blocks while the consumer's receive buffer is full, which is the backpressure the pacer measures.
+        return lambda lines: connection.sendall("".join(lines).encode("utf-8")), connection.close, True
+
+    save_file = open(sink, "w", encoding="utf-8")
+    def write(lines):
+        save_file.write("".join(lines))
+        save_file.flush()
+    return write, save_file.close, True
+
+
+def _render_batch(columns, as_lines):
+    """Split a batch of generated columns to rows, NDJSON lines or dictionaries."""
+    if as_lines:
+        lines = pd.DataFrame.from_dict(columns).to_json(orient="records", lines=True, force_ascii=False)
+        return [line + "\n" for line in lines.splitlines()]
+    names = list(columns)
+    return [dict(zip(names, row)) for row in zip(*columns.values())]
+
+
+def _produce(model, start, stop, batch_size, as_lines, batches, stopped):
+    """Generate the rows [start, stop) of a model's stream in micro-batches, into a bounded queue (run in a thread).
+
+        A model that isn't position-addressable (has constraints, unique columns or ordered generators) generates it's next rows instead.
+    """
+    try:
+        for batch_start in range(start, stop, batch_size):
+            batch_stop = min(batch_start + batch_size, stop)
+            if model.position_addressable:
+                columns = model.generate_range(batch_start, batch_stop, split_samples=False)
+            else:
+                columns = model._generate_columns(batch_stop - batch_start)
+            batch = _render_batch(columns, as_lines)
+            while not stopped.is_set():
+                try:
+                    batches.put(batch, timeout=PUT_TIMEOUT)
+                    break
+                except Full:
+                    continue
+            if stopped.is_set():
+                return
+    except BaseException as error:
+        batches.put(error)
+
+
+def _sleep_until(deadline):
+    """Sleep until ``deadline`` (a ``time.perf_counter`` time), spinning for the last ``SPIN_SECONDS``."""
+    remaining = deadline - time.perf_counter()
+    if remaining > SPIN_SECONDS:
+        time.sleep(remaining - SPIN_SECONDS)
+    while time.perf_counter() < deadline:
+        pass
+
+
+def stream(model, profile, sink, interval=0.01, batch_size=None, batches_ahead=4, catch_up=True, start=None):
+    """Emit the rows of a model's position-addressable stream to a sink, paced by a rate profile.
+
+        The rows are generated ahead of the schedule in vectorized micro-batches (with ``BaseModel.generate_range``) by a thread,
+        into a buffer of ``batches_ahead`` batches. Every ``interval`` seconds the rows due by then are emitted,
+        so the emitted rows are exactly the rows ``generate_range(start, start + profile.total_rows)`` generates, whatever the pacing was.
+        A model with constraints, unique columns or ordered generators can't address it's rows by position, it's batches are the next rows ``generate_data`` generates.
+
+        Emitting blocks while the sink applies backpressure (a full socket buffer, a slow callback), and the generation waits while the buffer is full,
+        so memory stays bounded. Rows that became due while the sink was blocked are emitted at the next tick if ``catch_up``,
+        otherwise the schedule is pushed back by the stall, and the rows are emitted at the profile's rate from there.
+
+        Parameters
+        ----------
+        model : BaseModel
+            The model to generate with.
+        profile : RateProfile
+            The target rate over time.
+        sink : str or file object or callable
+            | A path of a file to write NDJSON lines to, 'tcp://host:port' or 'unix://path' of a socket to send NDJSON lines to,
+            | a text file object to write NDJSON lines to, or a callable called with a list of the rows (as dictionaries) of every tick.
+        interval : float, optional
+            The seconds between ticks.
+        batch_size : int, optional
+            How many rows every micro-batch has, by default ``BATCH_SECONDS`` seconds of rows at the peak rate.
+        batches_ahead : int, optional
+            How many micro-batches can be generated ahead of the emission.
+        catch_up : bool, optional
+            Whether to emit the rows delayed by backpressure as soon as possible, or to push the schedule back.
+        start : int, optional
+            The position of the first row, by default the model's ``stream_position``.
+
+        Returns
+        -------
+        StreamReport
+            The achieved rate and jitter.
+    """
+    if interval <= 0 or batches_ahead < 1 or (batch_size is not None and batch_size < 1):
+        raise ValueError("'interval', 'batch_size' and 'batches_ahead' have to be positive.")
+
+    start = model.stream_position if start is None else start
+    total_rows = profile.total_rows
+    if batch_size is None:
+        batch_size = max(1, ceil(profile.peak_rate * BATCH_SECONDS))
+
+    emit, close, as_lines = _open_sink(sink)
+    batches = Queue(maxsize=batches_ahead)
+    stopped = threading.Event()
+    producer = threading.Thread(target=_produce, args=(model, start, start + total_rows, batch_size, as_lines, batches, stopped),
+                                name=f"{model.name}-stream", daemon=True)
+
+    buffered = deque()
+    emitted = underruns = max_lag = 0
+    lateness = []
+    shifted = 0.0
+    producer.start()
+    try:
+        # The clock starts once the first micro-batch is ready.
+        if total_rows > 0:
+            first_batch = batches.get()
+            if isinstance(first_batch, BaseException):
+                raise first_batch
+            buffered.extend(first_batch)
+        started = time.perf_counter()
+        next_offset = min(interval, profile.duration)
+        while emitted < total_rows:
+            scheduled = started + shifted + next_offset
+            _sleep_until(scheduled)
+            now = time.perf_counter()
+            if not catch_up and now - scheduled > interval:
+                # The sink blocked for more than a tick, the schedule continues from now.
+                shifted += now - scheduled
+                scheduled = now
+
+            # Every row due by now is emitted, including the rows of ticks missed while the sink blocked.
+            offset = min(now - started - shifted, profile.duration)
+            next_offset = min((floor(offset / interval) + 1) * interval, profile.duration)
+            due = profile.rows_by(offset) - emitted
+            if due <= 0:
+                continue
+            max_lag = max(max_lag, profile.rows_by(scheduled - started - shifted - interval) - emitted)
+
+            while len(buffered) < due:
+                try:
+                    batch = batches.get_nowait()
+                except Empty:
+                    underruns += 1
+                    batch = batches.get()
+                if isinstance(batch, BaseException):
+                    raise batch
+                buffered.extend(batch)
+            rows = [buffered.popleft() for _ in range(due)]
+
+            lateness.append(time.perf_counter() - scheduled)
+            emit(rows)
+            emitted += due
+        elapsed = time.perf_counter() - started
+    finally:
+        stopped.set()
+        # Unblock the generating thread, in case it's waiting for room in the buffer.
+        while producer.is_alive():
+            try:
+                batches.get(timeout=PUT_TIMEOUT)
+            except Empty:
+                pass
+        # The producer generates ahead of the emission, the stream continues after the last emitted row.
+        model.stream_position = start + emitted
+        close()
+
+    return StreamReport(emitted, total_rows, elapsed, profile.duration, lateness, max_lag, underruns, shifted)
@@ -0,0 +1,209 @@
+from hashlib import sha256
+from os.path import isdir, isfile, join as syspath_join
+import json
+import os
+import shutil
+import numpy as np
+from ..data_generators.BaseGenerators import stable_value
+
+
+# The version of the cache entries layout, part of every key so a layout change never loads old entries.
+CACHE_LAYOUT_VERSION = 1
+
+
+class ModelCache():
+    """An opt-in on-disk cache of data generated by a ``BaseModel``, addressed by the content that decides the data.
+
+        The key of an entry is a hash of the model's definition (the generators classes, parameters, formats and the hashes of their source files),
+        the state of the generators random generators (which is decided by the seed, and by what was already generated), ``k`` and the index options.
+        The model's constraints are a part of the key by their code and the values bound to them (see ``stable_value``), so a changed constraint never loads
+        the rows of the old one.
+        The output format is not a part of the key, the generated columns are stored, and any ``return_type`` is built from them on a hit.
+
+        Every column is stored as a .npy file, so numeric and string columns are loaded as memory-maps.
+        On a hit the generators are restored to the state they would have after generating the data, so the next calls generate the same data as without the cache.
+
+        Parameters
+        ----------
+        cache_dir : str
+            The directory of the cache, created if it doesn't exist.
+        max_size : int, optional
+            The maximum size of the cache in bytes, the least recently used entries are evicted when it's exceeded. If not given, the size is not bounded.
+
+        Attributes
+        ----------
+        cache_dir : str
+            The directory of the cache.
+        max_size : int or None
+            The maximum size of the cache in bytes.
+        hits : int
+            How many generations were loaded from the cache.
+        misses : int
+            How many generations were not found in the cache.
+        evictions : int
+            How many entries were evicted.
+
+        Examples
+        --------
+        Caching a fixture in a test suite:
+
+        >>> from makedata.models.ModelCache import ModelCache
+        >>> cache = ModelCache(".makedata_cache", max_size=2**30)
+        >>> personModel = BaseModel([nameGen, ageGen, birthdayGen], seed=42)
+        >>> people = personModel(10**6, return_type=ModelFormats.DF, cache=cache)
+        >>> cache.stats()
+        {'hits': 0, 'misses': 1, 'evictions': 0, 'entries': 1, 'size': 52000128}
+    """
+    def __init__(self, cache_dir, max_size=None):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key(self, model, k, index_key=None, index_attempts=1):
+        """The key of the data ``model`` would generate now with the given arguments.
+
+            Returns
+            -------
+            str
+                A sha256 hex digest.
+        """
+        content = {"layout": CACHE_LAYOUT_VERSION,
+                    "generators": [generator.get_definition() for generator in model.gens_dict.values()],
+                    "random_states": [(generator.bit_generator, generator.get_state()["random_state"]) for generator in model.gens_dict.values()],
+                    "constraints": [stable_value(constraint) for constraint in model.constraints],
+                    "acceptance_rate": model.acceptance_rate,
+                    "k": k,
+                    "index_key": index_key,
+                    "index_attempts": index_attempts}
+        return sha256(json.dumps(content, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def get_or_generate(self, model, k, index_key=None, index_attempts=1):
+        """Load the columns ``model`` would generate from the cache, or generate and store them.
+
+            Parameters
+            ----------
+            model : BaseModel
+                The model to generate data with.
+            k : int
+                How many samples to generate.
+            index_key : str, optional
+                A name of a generator to use as a key/index.
+            index_attempts : int, optional
+                How many times to try to generate a unique index/key.
+
+            Returns
+            -------
+            dict
+                A mapping between every generator's name and it's column, like ``BaseModel._generate_columns``.
+        """
+        key = self.key(model, k, index_key, index_attempts)
+        entry_path = syspath_join(self.cache_dir, key)
+
+        if isfile(syspath_join(entry_path, "meta.json")):
+            self.hits += 1
+            return self._load(model, entry_path)
+
+        self.misses += 1
+        samples_before = {name: generator.samples_generated for name, generator in model.gens_dict.items()}
+        generated_data = model._generate_columns(k, index_key, index_attempts)
+        samples_added = {name: generator.samples_generated - samples_before[name] for name, generator in model.gens_dict.items()}
+        self._store(model, entry_path, generated_data, k, samples_added)
+        self._evict()
+        return generated_data
+
+    def _store(self, model, entry_path, generated_data, k, samples_added):
+        """Write the columns, the model state after generating them and how much the progress counters advanced as a new entry."""
+        temp_path = f"{entry_path}.{os.getpid()}.tmp"
+        os.makedirs(temp_path, exist_ok=True)
+
+        columns = []
+        for column_index, (name, column) in enumerate(generated_data.items()):
+            column_array = np.asarray(column)
+            file_name = f"{column_index}.npy"
+            # Columns of python objects (e.g. datetime) can't be memory-mapped, they are pickled.
+            pickled = column_array.dtype == object
+            np.save(syspath_join(temp_path, file_name), column_array, allow_pickle=pickled)
+            columns.append({"name": name, "file": file_name, "pickled": bool(pickled)})
+
+        with open(syspath_join(temp_path, "meta.json"), "w") as meta_file:
+            json.dump({"columns": columns, "state": model.get_state(), "k": k, "samples_added": samples_added}, meta_file)
+
+        # Another process might have stored the same entry meanwhile, in which case it's kept.
+        try:
+            os.rename(temp_path, entry_path)
+        except OSError:
+            shutil.rmtree(temp_path, ignore_errors=True)
+
+    def _load(self, model, entry_path):
+        """Read the columns of an entry, and restore the model to the state it had after generating them."""
+        with open(syspath_join(entry_path, "meta.json"), "r") as meta_file:
+            meta = json.load(meta_file)
+
+        generated_data = dict()
+        for column in meta["columns"]:
+            column_path = syspath_join(entry_path, column["file"])
+            if column["pickled"]:
+                column_array = np.load(column_path, allow_pickle=True)
+            else:
+                column_array = np.load(column_path, mmap_mode="r")
+            # Numeric columns are loaded with their dtype, like they were generated.
+            generated_data[column["name"]] = model._column_tuple(column_array)
+
+        # The progress counters continue from where the model is, as if the data was generated.
+        rows_generated = model.rows_generated + meta["k"]
+        samples_generated = {name: generator.samples_generated + meta["samples_added"][name] for name, generator in model.gens_dict.items()}
+        model.set_state(meta["state"])
+        model.rows_generated = rows_generated
+        for name, generator in model.gens_dict.items():
+            generator.samples_generated = samples_generated[name]
+
+        # Touch the entry to mark it as recently used.
+        os.utime(entry_path)
+        return generated_data
+
+    def _entries(self):
+        """The (path, size, last used time) of every entry."""
+        entries = []
+        for entry_name in os.listdir(self.cache_dir):
+            entry_path = syspath_join(self.cache_dir, entry_name)
+            if not isdir(entry_path) or entry_name.endswith(".tmp"):
+                continue
+            size = sum(os.path.getsize(syspath_join(entry_path, f)) for f in os.listdir(entry_path))
+            entries.append((entry_path, size, os.path.getmtime(entry_path)))
+        return entries
+
+    def _evict(self):
+        """Remove the least recently used entries until the cache fits in ``max_size``."""
+        if self.max_size is None:
+            return
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        total_size = sum(entry[1] for entry in entries)
+        for entry_path, size, _ in entries:
+            if total_size <= self.max_size:
+                break
+            shutil.rmtree(entry_path, ignore_errors=True)
+            total_size -= size
+            self.evictions += 1
+
+    def clear(self):
+        """Remove all the entries of the cache."""
+        for entry_path, _, _ in self._entries():
+            shutil.rmtree(entry_path, ignore_errors=True)
+
+    def stats(self):
+        """The hit/miss statistics of this cache object, and the current entries count and size (in bytes) of the cache directory.
+
+            Returns
+            -------
+            dict
+                The statistics.
+        """
+        entries = self._entries()
+        return {"hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(entries),
+                "size": sum(entry[1] for entry in entries)}
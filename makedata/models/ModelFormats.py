@@ -6,4 +6,5 @@ class ModelFormats(Enum):
     JSON = "json"
     SAVE = "save"
     SAVE_CSV = "save_json"
-    SAVE_JSON = "save_csv"
\ No newline at end of file
+    SAVE_JSON = "save_csv"
+    SAVE_NDJSON = "save_ndjson"
\ No newline at end of file
@@ -0,0 +1,299 @@
+from copy import copy, deepcopy
+from functools import lru_cache
+from hashlib import sha256
+from importlib import import_module
+from os.path import splitext
+import json
+from .BaseModels import BaseModel
+from ..data_generators.BaseGenerators import FormattedGenerator, FileSourceGenerator, FromTextGenerator, stable_value
+from ..data_generators.numeric_generators.PrimitveNumerics import IntegerGenerator, FloatGenerator
+from ..data_generators.numeric_generators.UniqueNumerics import UniqueIntegerGenerator
+from ..data_generators.numeric_generators.CorrelatedNumerics import CorrelatedGenerator
+from ..data_generators.formatted_generators.NameGenerator import NameGenerator
+from ..data_generators.formatted_generators.DateGenerator import DateGenerator
+from ..data_generators.formatted_generators.TextGenerator import TextGenerator
+from ..data_generators.formatted_generators.PatternGenerator import PatternGenerator
+from ..data_generators.formatted_generators.FormattedNumberGenerator import FormattedNumberGenerator
+from ..data_generators.derived_generators.DerivedGenerator import DerivedGenerator
+
+try:
+    import tomllib
+except ImportError:
+    # Before python 3.11 TOML specs need the 'tomli' package.
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+
+# The generators a spec can use by their class name, any other generator is given as 'module:ClassName'.
+GENERATOR_TYPES = {generator_type.__name__: generator_type for generator_type in
+                    (IntegerGenerator, FloatGenerator, UniqueIntegerGenerator, CorrelatedGenerator, NameGenerator, DateGenerator,
+                    TextGenerator, PatternGenerator, FormattedNumberGenerator, DerivedGenerator)}
+
+# The keys of a generator's entry in a spec that are not arguments of it's constructor.
+GENERATOR_SPEC_KEYS = frozenset(("type", "formats"))
+
+# How many compiled plans are kept, by their spec.
+PLAN_CACHE_SIZE = 32
+
+
+def _import_object(path):
+    """Import the object of a 'module:attribute' path."""
+    module_name, separator, attribute_path = path.partition(":")
+    if not separator or not module_name or not attribute_path:
+        raise ValueError(f"The import path '{path}' has to be 'module:attribute'.")
+    imported = import_module(module_name)
+    for attribute in attribute_path.split("."):
+        imported = getattr(imported, attribute)
+    return imported
+
+
+def _resolve_value(value):
+    """Replace every {"import": "module:attribute"} in a spec value with the imported object (e.g. the function of a ``DerivedGenerator``)."""
+    if isinstance(value, dict):
+        if set(value) == {"import"}:
+            return _import_object(value["import"])
+        return {key: _resolve_value(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_resolve_value(item) for item in value]
+    return value
+
+
+def load_spec(path):
+    """Read a model spec from a .json or .toml file.
+
+        Parameters
+        ----------
+        path : str
+            The path of the spec file.
+
+        Returns
+        -------
+        dict
+            The spec.
+
+        Raises
+        ------
+        ValueError
+            If the file is not a .json or .toml file, or TOML can't be read (before python 3.11, without the 'tomli' package).
+    """
+    extension = splitext(path)[1].lower()
+    if extension == ".json":
+        with open(path, "r", encoding="utf-8") as spec_file:
+            return json.load(spec_file)
+    if extension == ".toml":
+        if tomllib is None:
+            raise ValueError("Reading a TOML spec needs python 3.11 or the 'tomli' package.")
+        with open(path, "rb") as spec_file:
+            return tomllib.load(spec_file)
+    raise ValueError(f"A spec file has to be a .json or .toml file, but '{path}' is not.")
+
+
+def _build_generator(generator_spec):
+    """Create the generator of one entry of a spec's 'generators'."""
+    if "type" not in generator_spec:
+        raise ValueError(f"The generator spec {generator_spec} has no 'type'.")
+    generator_type = generator_spec["type"]
+    if ":" in generator_type:
+        generator_class = _import_object(generator_type)
+    elif generator_type in GENERATOR_TYPES:
+        generator_class = GENERATOR_TYPES[generator_type]
+    else:
+        raise ValueError(f"Unknown generator type '{generator_type}', it has to be one of {tuple(GENERATOR_TYPES)} or 'module:ClassName'.")
+
+    parameters = {key: _resolve_value(value) for key, value in generator_spec.items() if key not in GENERATOR_SPEC_KEYS}
+    try:
+        generator = generator_class(**parameters)
+    except TypeError as error:
+        raise ValueError(f"Invalid parameters for the generator '{generator_spec.get('name', generator_type)}': {error}")
+
+    for format_name, frmt in generator_spec.get("formats", dict()).items():
+        generator.add_format(format_name, frmt)
+    return generator
+
+
+def _build_plan(spec):
+    """Compile a spec to a ``GenerationPlan``."""
+    if not spec.get("generators"):
+        raise ValueError("A model spec has to have at least one generator in 'generators'.")
+    model_parameters = {key: _resolve_value(value) for key, value in spec.items() if key not in ("generators", "index_key")}
+    generators = []
+    for generator_spec in spec["generators"]:
+        generator = _build_generator(generator_spec)
+        # A generator of several columns (a 'CorrelatedGenerator') adds the generators of all of them.
+        generators.extend(generator.outputs if isinstance(generator, CorrelatedGenerator) else [generator])
+    try:
+        model = BaseModel(generators, **model_parameters)
+    except TypeError as error:
+        raise ValueError(f"Invalid parameters for the model: {error}")
+
+    index_key = spec.get("index_key")
+    if index_key is not None and index_key not in model.gens_dict:
+        raise ValueError(f"The 'index_key' '{index_key}' is not a generator of the model.")
+    return GenerationPlan(model, index_key)
+
+
+@lru_cache(maxsize=PLAN_CACHE_SIZE)
+def _compile_spec_text(spec_text):
+    return _build_plan(json.loads(spec_text))
+
+
+def compile_spec(spec):
+    """Compile a model spec to a ``GenerationPlan``, plans are cached by their spec so every spec is compiled once per process.
+
+        A spec is a mapping (or a .json/.toml file of one) with a list of ``generators`` and the arguments of the ``BaseModel``
+        (``seed``, ``name``, ``bit_generator``, ``block_size``, ``max_workers``, ``constraints``...), and an optional ``index_key``.
+        Every generator is a mapping of it's ``type`` (a name in ``GENERATOR_TYPES`` or 'module:ClassName'), the arguments of it's constructor,
+        and optional extra ``formats`` ({name: format}). A value {"import": "module:attribute"} is replaced with the imported object.
+
+        Parameters
+        ----------
+        spec : dict or str
+            The spec, or the path of a spec file.
+
+        Returns
+        -------
+        GenerationPlan
+            The compiled plan.
+
+        Raises
+        ------
+        ValueError
+            If the spec is invalid.
+
+        Examples
+        --------
+        A spec file, people.toml:
+
+        | name = "people"
+        | seed = 42
+        | index_key = "id"
+        |
+        | [[generators]]
+        | type = "UniqueIntegerGenerator"
+        | name = "id"
+        | low = 0
+        | high = 1_000_000_000
+        |
+        | [[generators]]
+        | type = "NameGenerator"
+        | name = "name"
+        | locale = "en_INTER"
+        | default_format_name = "ffl"
+
+        >>> from makedata.models.ModelSpecs import compile_spec
+        >>> plan = compile_spec("people.toml")
+        >>> plan.model()(2, index_key=plan.index_key)
+        {173943788: {'name': 'Eva Cloth'}, 525697566: {'name': 'Antonella Barron'}}
+    """
+    if isinstance(spec, str):
+        spec = load_spec(spec)
+    # TOML dates and times are passed to the generators as their ISO strings.
+    return _compile_spec_text(json.dumps(spec, sort_keys=True, default=str))
+
+
+class GenerationPlan():
+    """A compiled model spec: a model with it's sources loaded and it's formats compiled, that creates ready models.
+
+        A plan never generates by itself, so it never changes (``share_data`` is called on a ``copy`` of the plan). Every model it creates is a copy of it's model,
+        with the same seeds and state, sharing the (read only) loaded sources instead of copying them.
+        A plan is picklable, after ``share_data`` it's sources are pickled as the names of their shared memory blocks,
+        so a worker process receives a compact plan and starts generating without reading any source.
+
+        Parameters
+        ----------
+        model : BaseModel
+            The model of the plan, the plan takes ownership of it.
+        index_key : str, optional
+            The name of the generator the models of the plan use as their index.
+
+        See Also
+        --------
+        compile_spec : Compiles a spec to a ``GenerationPlan``.
+    """
+    def __init__(self, model, index_key=None):
+        self._model = model
+        self._index_key = index_key
+
+        for generator in model.gens_dict.values():
+            if isinstance(generator, FormattedGenerator):
+                templates = list(generator.formats.values())
+                if generator.has_default:
+                    templates.append(generator.default_format)
+                for template in templates:
+                    generator._compiled_format(template)
+            if isinstance(generator, FileSourceGenerator):
+                generator._load_keys(generator._formats_keys())
+
+        content = {"generators": [generator.get_definition() for generator in model.gens_dict.values()],
+                    "random_states": [(generator.bit_generator, generator.get_state()["random_state"]) for generator in model.gens_dict.values()],
+                    "constraints": [stable_value(constraint) for constraint in model.constraints],
+                    "index_key": index_key}
+        self._digest = sha256(json.dumps(content, sort_keys=True).encode("utf-8")).hexdigest()
+
+    @property
+    def name(self):
+        """The name of the models of the plan."""
+        return self._model.name
+
+    @property
+    def index_key(self):
+        """The name of the generator used as the index, or None."""
+        return self._index_key
+
+    @property
+    def digest(self):
+        """A sha256 hex digest of what the plan generates: the generators definitions (with the hashes of their sources), seeds and constraints."""
+        return self._digest
+
+    def model(self):
+        """Create a new model from the plan, ready to generate.
+
+            Returns
+            -------
+            BaseModel
+                A copy of the plan's model, the copies of a plan generate the same data.
+        """
+        # The loaded sources are put in the copy's memo, so the copy shares them.
+        memo = dict()
+        for generator in self._model.gens_dict.values():
+            if isinstance(generator, FileSourceGenerator):
+                for pool in generator.data.values():
+                    memo[id(pool)] = pool
+        return deepcopy(self._model, memo)
+
+    def copy(self):
+        """Create a new plan from the plan, with a copy of it's model (see ``model``).
+
+            The plans returned by ``compile_spec`` are cached and shared by the whole process,
+            so they are copied before ``share_data``, which changes the sources of the plan.
+
+            Returns
+            -------
+            GenerationPlan
+                A plan with the same digest and index key, sharing the loaded sources of the plan.
+        """
+        plan = copy(self)
+        plan._model = self.model()
+        return plan
+
+    def share_data(self):
+        """Publish the loaded sources of the plan into shared memory, so pickling the plan doesn't pickle them.
+
+            Sources of ``FromTextGenerator`` are memory-mapped files that are already cheap to pickle, so they are kept as is.
+
+            .. warning::
+                The plan owns the published pools, call ``unshare_data`` once the workers are done with them.
+                Call it on a ``copy`` of a plan returned by ``compile_spec``, never on the cached plan itself.
+        """
+        for generator in self._model.gens_dict.values():
+            if isinstance(generator, FileSourceGenerator) and not isinstance(generator, FromTextGenerator):
+                generator.share_data()
+
+    def unshare_data(self):
+        """Destroy the shared pools published by ``share_data``, the sources are loaded again."""
+        for generator in self._model.gens_dict.values():
+            if isinstance(generator, FileSourceGenerator) and not isinstance(generator, FromTextGenerator):
+                generator.unshare_data()
+                generator._load_keys(generator._formats_keys())
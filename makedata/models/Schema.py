@@ -0,0 +1,334 @@
+from copy import copy
+from os.path import join as syspath_join
+from numpy.random import SeedSequence
+import os
+import numpy as np
+from .ModelFormats import ModelFormats
+from ..data_generators.BaseGenerators import GeneratorObject
+from ..data_generators.GeneratorDecorators import GeneratingFunction
+from ..data_generators.numeric_generators.UniqueNumerics import UniqueIntegerGenerator
+
+
+# The spawn key branch used to derive the permutation that scatters the popular keys of a skewed 'ForeignKeyGenerator'.
+SCATTER_STREAM_KEY = 0x5CA7
+
+# The file extension of every file format a 'Schema' can export to.
+EXPORT_EXTENSIONS = {ModelFormats.SAVE_CSV: "csv", ModelFormats.SAVE_NDJSON: "ndjson"}
+
+
+class KeyIndex():
+    """The keys of the first ``rows`` rows of a model's key column, in a compact form that can be sampled by position.
+
+        The keys are the ones the model's position-addressable stream (``BaseModel.generate_range``) has in these positions.
+        A ``UniqueIntegerGenerator`` key column computes any key from it's position, so it's index takes O(1) memory,
+        any other key column is generated once, alone (without the rest of the model), and kept as an array.
+
+        Parameters
+        ----------
+        generator : GeneratorObject
+            The generator of the key column, it's not changed.
+        rows : int
+            The number of rows of the table.
+        block_size : int
+            The block size of the model's position-addressable stream.
+
+        Raises
+        ------
+        ValueError
+            If the key column depends on other columns, or the keys of the rows are not unique.
+    """
+    def __init__(self, generator, rows, block_size):
+        if generator.inputs:
+            raise ValueError(f"The key column '{generator.name}' can't depend on other columns.")
+        self.rows = rows
+        # A copy, so building the index never changes the generator's state.
+        self._generator = copy(generator)
+        self._keys = None
+
+        if not isinstance(generator, UniqueIntegerGenerator):
+            self._keys = np.asarray(self._generator.generate_range(0, rows, block_size))
+            if len(np.unique(self._keys)) != rows:
+                raise ValueError(f"The keys of the column '{generator.name}' are not unique in the first {rows} rows, they can't be referenced.")
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, positions):
+        """The keys in the given positions (array_like of ints in [0, rows))."""
+        if self._keys is not None:
+            return self._keys[positions]
+        return self._generator.permute(self._generator.offset + self._generator.stride * np.asarray(positions, dtype=np.int64))
+
+
+class ForeignKeyGenerator(GeneratorObject):
+    """Generator to generate references to the rows of another table, by sampling the keys of it's index column.
+
+        The parent table is the first ``parent_rows`` rows of the parent model's position-addressable stream,
+        which is what ``Schema`` exports (and what ``BaseModel.generate_range(0, parent_rows)`` generates),
+        so every generated key exists in the parent table, without generating it.
+
+        Parameters
+        ----------
+        parent : BaseModel
+            The model of the referenced table.
+        key : str
+            The name of the index column of ``parent``.
+        parent_rows : int
+            The number of rows of the referenced table.
+        skew : float, optional
+            | 0 to reference all the rows uniformly, else the exponent of a power-law (zipf-like) fan-out,
+            | where a few rows are referenced by many rows, e.g. 1.1 for users and their orders.
+            | The popular rows are scattered across the parent table by a seeded permutation.
+        *args
+            Variable length argument list
+        **kwargs
+            Arbitrary keyword arguments.
+
+        Attributes
+        ----------
+        key : str
+            The name of the index column of the parent model.
+        parent_name : str
+            The name of the parent model.
+        parent_rows : int
+            The number of rows of the referenced table.
+        skew : float
+            The exponent of the fan-out.
+
+        Raises
+        ------
+        ValueError
+            If ``parent_rows`` is not positive, ``skew`` is negative, or ``key`` is not a generator of ``parent``.
+
+        See Also
+        --------
+        :class:`makedata.models.Schema.Schema` : Creates foreign keys between the tables of a schema.
+    """
+    def __init__(self, parent, key, parent_rows, skew=0.0, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if key not in parent.gens_dict:
+            raise ValueError(f"'{key}' is not a generator of the model '{parent.name}'.")
+        if parent_rows < 1:
+            raise ValueError(f"'parent_rows' has to be a positive integer, but is {parent_rows}.")
+        if skew < 0:
+            raise ValueError(f"'skew' can't be negative, but is {skew}.")
+
+        self._parent = parent
+        self.key = key
+        self.parent_name = parent.name
+        self.parent_rows = parent_rows
+        self.skew = skew
+        self._key_index = None
+
+    def reset_seed(self, seed, bit_generator=None):
+        super().reset_seed(seed, bit_generator)
+        self._scatter = None
+
+    @property
+    def key_index(self):
+        """The ``KeyIndex`` of the parent table, built on first use."""
+        if self._key_index is None:
+            self._key_index = KeyIndex(self._parent.gens_dict[self.key], self.parent_rows, self._parent.block_size)
+        return self._key_index
+
+    def _scatter_positions(self, ranks):
+        """Map popularity ranks to positions in the parent table, with a permutation derived from ``seed_sequence``."""
+        if self._scatter is None:
+            scatter_seed = SeedSequence(self.seed_sequence.entropy, spawn_key=tuple(self.seed_sequence.spawn_key) + (SCATTER_STREAM_KEY,))
+            self._scatter = UniqueIntegerGenerator(0, self.parent_rows, seed=scatter_seed, name=f"{self.name}Scatter")
+        return self._scatter.permute(ranks)
+
+    def get_definition(self):
+        definition = super().get_definition()
+        # The keys depend on the parent's key column, and it's seed.
+        key_generator = self._parent.gens_dict[self.key]
+        definition["parent_key"] = {**key_generator.get_definition(),
+                                    "entropy": str(key_generator.seed_sequence.entropy),
+                                    "spawn_key": list(key_generator.seed_sequence.spawn_key)}
+        return definition
+
+    def _preprocess_data(self, k, *args, **kwargs):
+        """Call the generator function."""
+        return self._data_generator(k)
+
+    @GeneratingFunction
+    def _data_generator(self, k):
+        """Generate k references to the parent table.
+
+            Parameters
+            ----------
+            k : int
+                Generate k samples.
+        """
+        n = self.parent_rows
+        if self.skew == 0:
+            return self.key_index[self.random_generator.integers(0, n, size=k)]
+
+        # The inverse CDF of a continuous power-law over [0, n), floored to ranks.
+        uniform = self.random_generator.random(size=k)
+        if self.skew == 1:
+            ranks = np.expm1(uniform * np.log1p(n))
+        else:
+            exponent = 1 - self.skew
+            ranks = (((n + 1) ** exponent - 1) * uniform + 1) ** (1 / exponent) - 1
+        ranks = np.minimum(ranks.astype(np.int64), n - 1)
+        return self.key_index[self._scatter_positions(ranks)]
+
+
+class Schema():
+    """A set of related tables, where the columns of a table can reference the rows of the tables added before it.
+
+        Every table is a model and a number of rows. It's rows are the first ``rows`` rows of the model's position-addressable stream,
+        so they are generated in chunks (never materializing a table), and a ``ForeignKeyGenerator`` created with ``foreign_key``
+        samples keys that exist in the referenced table, without generating it.
+
+        Parameters
+        ----------
+        name : str, optional
+            The name of the schema.
+
+        Attributes
+        ----------
+        tables : dict
+            A mapping between every table's name and it's (model, rows, index_key), in the order they were added.
+        name : str or None
+            The name of the schema.
+
+        Examples
+        --------
+        Users and their orders, where a few users make most of the orders:
+
+        >>> from makedata.models.Schema import Schema
+        >>> schema = Schema()
+        >>> users = BaseModel([UniqueIntegerGenerator(0, 10**9, name="user_id"), NameGenerator(locale="en_INTER", default_format_name="ffl", name="name")], seed=1)
+        >>> schema.add_table("users", users, rows=10**5, index_key="user_id")
+        >>> orders = BaseModel([UniqueIntegerGenerator(0, 10**12, name="order_id"), schema.foreign_key("users", skew=1.1, name="user_id"),
+        ...                     FormattedNumberGenerator(1, 500, default_format_name="dollars", name="amount")], seed=2)
+        >>> schema.add_table("orders", orders, rows=10**6, index_key="order_id")
+        >>> schema.export("shop", chunk_size=10**5)
+    """
+    def __init__(self, name=None):
+        self.name = name
+        self.tables = dict()
+
+    def add_table(self, name, model, rows, index_key=None):
+        """Add a table to the schema.
+
+            Parameters
+            ----------
+            name : str
+                The name of the table, also the name of it's exported file.
+            model : BaseModel
+                The model that generates the table's rows.
+            rows : int
+                The number of rows of the table.
+            index_key : str, optional
+                The name of the generator of the table's key column, required for the table to be referenced.
+
+            Raises
+            ------
+            ValueError
+                If the name is already used, ``rows`` is negative, ``index_key`` is not a generator of ``model``,
+                or the model isn't position-addressable (has constraints, unique columns or ordered generators), tables are exported and referenced by position.
+        """
+        if name in self.tables:
+            raise ValueError(f"The schema already has a table named '{name}'.")
+        if rows < 0:
+            raise ValueError(f"'rows' can't be negative, but is {rows}.")
+        if index_key is not None and index_key not in model.gens_dict:
+            raise ValueError(f"'{index_key}' is not a generator of the model '{model.name}'.")
+        if not model.position_addressable:
+            raise ValueError(f"The model '{model.name}' has constraints, unique columns or ordered generators, so it's rows can't be addressed by position, " \
+                                "and it can't be a table of a schema.")
+        self.tables[name] = (model, rows, index_key)
+
+    def foreign_key(self, table, skew=0.0, *args, **kwargs):
+        """Create a generator of references to the rows of a table of this schema.
+
+            Parameters
+            ----------
+            table : str
+                The name of the referenced table.
+            skew : float, optional
+                The exponent of the fan-out, 0 for uniform (see ``ForeignKeyGenerator``).
+            *args
+                Variable length argument list, passed to the ``ForeignKeyGenerator``.
+            **kwargs
+                Arbitrary keyword arguments, passed to the ``ForeignKeyGenerator`` (e.g. ``name``).
+
+            Returns
+            -------
+            ForeignKeyGenerator
+                The generator, to add to the model of the referencing table.
+
+            Raises
+            ------
+            ValueError
+                If the table doesn't exist or has no ``index_key``.
+        """
+        if table not in self.tables:
+            raise ValueError(f"The schema has no table named '{table}', a table has to be added before it's referenced.")
+        model, rows, index_key = self.tables[table]
+        if index_key is None:
+            raise ValueError(f"The table '{table}' has no 'index_key', so it can't be referenced.")
+        return ForeignKeyGenerator(model, index_key, rows, skew, *args, **kwargs)
+
+    def iter_table(self, table, chunk_size, **kwargs):
+        """Generate the rows of a table in chunks.
+
+            Parameters
+            ----------
+            table : str
+                The name of the table.
+            chunk_size : int
+                How many rows to generate in every chunk.
+            **kwargs
+                Arguments passed to ``BaseModel.generate_range`` for every chunk (e.g. ``return_type``).
+
+            Yields
+            ------
+            The result of ``BaseModel.generate_range`` for every chunk.
+        """
+        if chunk_size < 1:
+            raise ValueError(f"'chunk_size' has to be a positive integer, but is {chunk_size}.")
+        model, rows, index_key = self.tables[table]
+        kwargs.setdefault("index_key", index_key)
+        for start in range(0, rows, chunk_size):
+            yield model.generate_range(start, min(start + chunk_size, rows), **kwargs)
+
+    def export(self, directory, return_type=ModelFormats.SAVE_CSV, chunk_size=10**5):
+        """Export every table to a file in ``directory``, named after the table, in chunks.
+
+            Parameters
+            ----------
+            directory : str
+                The directory to export to, created if it doesn't exist.
+            return_type : ModelFormats, optional
+                The format of the files, ``ModelFormats.SAVE_CSV`` or ``ModelFormats.SAVE_NDJSON``.
+            chunk_size : int, optional
+                How many rows to generate and write at a time.
+
+            Returns
+            -------
+            dict
+                A mapping between every table's name and the path of it's file.
+
+            Raises
+            ------
+            ValueError
+                If ``return_type`` is not a format that can be written in chunks.
+        """
+        if return_type not in EXPORT_EXTENSIONS:
+            raise ValueError(f"A schema can only be exported to {tuple(EXPORT_EXTENSIONS)}, not '{return_type}'.")
+        os.makedirs(directory, exist_ok=True)
+
+        paths = dict()
+        for table, (model, rows, index_key) in self.tables.items():
+            path = syspath_join(directory, f"{table}.{EXPORT_EXTENSIONS[return_type]}")
+            # The first chunk overwrites an existing file, the rest are appended to it.
+            if os.path.isfile(path):
+                os.remove(path)
+            for _ in self.iter_table(table, chunk_size, return_type=return_type, save_path=path, append=True):
+                pass
+            paths[table] = path
+        return paths
@@ -12,6 +12,10 @@ setuptools.setup(
     long_description_content_type="text/markdown",
     url="https://github.com/soikode/MakeData",
     packages=setuptools.find_packages(),
+    package_data={"makedata": ["data_generators/data_sources/*/*.json", "data_generators/data_sources/*/*/*.txt"]},
+    entry_points={
+        "console_scripts": ["makedata=makedata.CommandLine:main"],
+    },
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
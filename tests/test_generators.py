@@ -1,7 +1,21 @@
+from collections import Counter
+import json
+import os
+import pickle
 import pytest
+import numpy as np
+from makedata.data_generators.GeneratorExceptions import FormatError, FormatNotFoundError
 from makedata.data_generators.BaseGenerators import *
+from makedata.data_generators.TextSources import LineIndexedFile
 from makedata.data_generators.numeric_generators.PrimitveNumerics import *
+from makedata.data_generators.numeric_generators.UniqueNumerics import UniqueIntegerGenerator
+from makedata.data_generators.numeric_generators.CorrelatedNumerics import CorrelatedGenerator
+from makedata.data_generators.UniquenessTrackers import UniquenessTracker, hash_values
 from makedata.data_generators.formatted_generators.NameGenerator import NameGenerator
+from makedata.data_generators.formatted_generators.TextGenerator import TextGenerator
+from makedata.data_generators.formatted_generators.PatternGenerator import PatternGenerator
+from makedata.data_generators.formatted_generators.FormattedNumberGenerator import FormattedNumberGenerator
+from makedata.data_generators.formatted_generators.DateGenerator import DateGenerator
 
 class TestBaseGenerator:
     def test_generator_name_generation(self):
@@ -18,6 +32,29 @@ class TestBaseGenerator:
         gen2 = IntegerGenerator(0, 100, seed=20)
         assert gen(5) == gen2(5) == (89, 28, 26, 46, 89)
 
+class TestFormattedGenerator:
+    def test_add_and_remove_format(self):
+        gen = NameGenerator(locale="en_INTER", seed=42)
+        gen.add_format("male_first_and_init_last", "{male_first_names} {last_names[0]}.", symbol="mfil")
+        assert gen.get_format("mfil") == gen.get_format("male_first_and_init_last") == "{male_first_names} {last_names[0]}."
+        assert ("male_first_and_init_last", "mfil") in gen.formats_names
+        gen.remove_format("mfil")
+        assert "male_first_and_init_last" not in gen.formats and "mfil" not in gen.formats_symbols
+        assert "male_first_and_init_last" not in NameGenerator(locale="en_INTER").formats
+        with pytest.raises(FormatNotFoundError):
+            gen.get_format("mfil")
+
+    @pytest.mark.parametrize("name,frmt", [("broken", "{male_first_names"), ("empty_field", "{}")])
+    def test_invalid_format(self, name, frmt):
+        gen = NameGenerator(locale="en_INTER")
+        with pytest.raises(FormatError):
+            gen.add_format(name, frmt)
+
+    def test_duplicate_format(self):
+        gen = NameGenerator(locale="en_INTER")
+        with pytest.raises(ValueError):
+            gen.add_format("mfl", "{male_first_names}")
+
 class TestNameGenerator:
 
     @pytest.fixture(scope="class")
@@ -38,4 +75,247 @@ class TestNameGenerator:
     ("imfl", ('B. Wigg', 'M. Harrier', 'J. Foister')),
     ("iffl", ('B. Hudnell', 'R. Screen', 'A. Coleman'))])
     def test_name_formats(self, name_generator, format_name, name):
-        assert name_generator(3, format_name=format_name) == name
\ No newline at end of file
+        assert name_generator(3, format_name=format_name) == name
+    def test_lazy_source_loading(self):
+        gen = NameGenerator(locale="en_INTER", seed=42)
+        assert gen.data == {}
+        gen(3, format_name="lmf")
+        assert set(gen.data) == {"last_names", "male_first_names"}
+
+    def test_shared_data(self):
+        gen = NameGenerator(locale="en_INTER", seed=42)
+        expected = gen(3, format_name="lmf")
+        gen = NameGenerator(locale="en_INTER", seed=42)
+        pools = gen.share_data()
+        try:
+            assert set(pools) == {"male_first_names", "female_first_names", "last_names"}
+            assert len(pickle.dumps(gen)) < 4096
+            assert pickle.loads(pickle.dumps(gen))(3, format_name="lmf") == gen(3, format_name="lmf") == expected
+        finally:
+            gen.unshare_data()
+        assert gen.data == {}
+
+class TestFromTextGenerator:
+    def test_line_index(self, tmp_path):
+        source = tmp_path / "words.txt"
+        source.write_bytes(b"alpha\r\nbeta\n\ngamma")
+        index_dir = tmp_path / "indexes"
+        gen = FromTextGenerator(file_path=str(source), default_format="{words}", index_dir=str(index_dir), seed=42)
+        assert set(gen(20)) == {"alpha", "beta", "gamma"}
+        assert gen.data["words"][[0, 1, 2]] == ["alpha", "beta", "gamma"]
+        assert sorted(os.listdir(tmp_path)) == ["indexes", "words.txt"]
+
+        # A rewritten file of the same modification time is indexed again, and it's old index is removed.
+        modified = os.stat(source).st_mtime_ns
+        source.write_bytes(b"alpha\ndelta\nepsilon\nzeta")
+        os.utime(source, ns=(modified, modified))
+        assert LineIndexedFile(str(source), index_dir=str(index_dir))[[1, 3]] == ["delta", "zeta"]
+        assert len(os.listdir(index_dir)) == 1
+
+    def test_directory_source(self, tmp_path):
+        gen = FromTextGenerator(file_path="resources/text_files/names/en_US", default_format="{male_first_names} {last_names}",
+                                index_dir=str(tmp_path), seed=42)
+        assert gen(3) == ('Jace Higgenbotham', 'Aryan Herold', 'Amos Stine')
+        assert set(gen.data) == {"male_first_names", "last_names"}
+
+class TestTextGenerator:
+    def test_sentences(self):
+        gen = TextGenerator(sentence_length=(3, 6), seed=42)
+        assert gen(2) == ('Polished niche current.', 'Humble abide below howling incident market.')
+
+    def test_paragraphs(self):
+        gen = TextGenerator(sentence_length=(2, 4), sentences_per_paragraph=(2, 3), seed=42)
+        for paragraph in gen(50, format_name="nv", paragraphs=True):
+            sentences = paragraph[:-1].split(". ")
+            assert paragraph.endswith(".") and 2 <= len(sentences) <= 3
+            assert all(sentence[0].isupper() for sentence in sentences)
+
+class TestPatternGenerator:
+    def test_patterns(self):
+        gen = PatternGenerator(default_format="###-###-####", seed=42)
+        assert gen(2) == ('518-091-7795', '633-341-0847')
+        gen.add_format("escaped", r"ID\#[A-C]{3}x")
+        for sample in gen(100, format_name="escaped"):
+            assert len(sample) == 7 and sample.startswith("ID#") and sample.endswith("x")
+            assert set(sample[3:6]) <= set("ABC")
+        assert all(len(sample) == 16 and set(sample) <= set("0123456789abcdef") for sample in gen(100, format_name="hex_id"))
+        gen.add_format("skipped", "X#{0}Y[a-c]{0}")
+        assert set(gen(10, format_name="skipped")) == {"XY"}
+
+    @pytest.mark.parametrize("pattern", ["", "[", "[]", "[z-a]", "#{x}", "#{0}", "\\", "é"])
+    def test_invalid_patterns(self, pattern):
+        with pytest.raises(FormatError):
+            PatternGenerator(seed=42).add_format("invalid", pattern)
+
+class TestFormattedNumberGenerator:
+    def test_formats(self):
+        gen = FormattedNumberGenerator(-5000, 5000, seed=42)
+        assert gen(2) == ('-4,107.50', '2,739.56')
+        assert gen(3, format_name="accounting") == ('$1,545.71', '($611.22)', '($669.85)')
+
+    @pytest.mark.parametrize("frmt", ["{:,.2f}", "{:.3f}", "{:+_.1f}", "{: .2f}", "€{:,.0f} EUR"])
+    def test_matches_str_format(self, frmt):
+        gen = FormattedNumberGenerator(-10**7, 10**7, default_format=frmt, seed=42)
+        precision = int(frmt.split(".")[1][0])
+        scale = 10 ** precision
+        values = FormattedNumberGenerator(-10**7, 10**7, seed=42).random_generator.integers(-10**7 * scale, 10**7 * scale, size=1000)
+        # Python puts the sign after the currency, the generator before it, so compare without the prefix.
+        expected = [frmt.format(int(value) / scale + 0.0).replace("€", "") for value in values]
+        assert [sample.replace("€", "") for sample in gen(1000)] == expected
+
+    @pytest.mark.parametrize("frmt", ["{:,.2f} {:,.2f}", "no field", "{:x}", "{0!r}"])
+    def test_invalid_formats(self, frmt):
+        with pytest.raises(FormatError):
+            FormattedNumberGenerator(0, 1, seed=42).add_format("invalid", frmt)
+
+    def test_numeric_range(self):
+        gen = FormattedNumberGenerator(1, 500, default_format_name="dollars", seed=42, name="amount")
+        assert isinstance(gen, NumericGenerator) and (gen.low, gen.high, gen.name) == (1, 500, "amount")
+        with pytest.raises(ValueError):
+            FormattedNumberGenerator(5, 1)
+        # There are no cents in [0.001, 0.002).
+        with pytest.raises(ValueError):
+            FormattedNumberGenerator(0.001, 0.002, seed=42)(5, format_name="dollars")
+
+    @pytest.mark.parametrize("low, high, format_name, expected", [(0, 5, "integer", ["0", "1", "2", "3", "4"]),
+                                                                  (0, 0.05, "dollars", ["$0.00", "$0.01", "$0.02", "$0.03", "$0.04"]),
+                                                                  (0.995, 1.03, "dollars", ["$1.00", "$1.01", "$1.02"])])
+    def test_uniform_in_range(self, low, high, format_name, expected):
+        counts = Counter(FormattedNumberGenerator(low, high, seed=42)(30000, format_name=format_name))
+        assert sorted(counts) == expected
+        assert all(abs(count - 30000 / len(expected)) < 0.05 * 30000 / len(expected) for count in counts.values())
+
+class TestUniqueIntegerGenerator:
+    @pytest.mark.parametrize("low, high", [(0, 1), (-7, 1000), (0, 2**16 + 3)])
+    def test_permutation(self, low, high):
+        gen = UniqueIntegerGenerator(low, high, seed=42)
+        assert sorted(gen(high - low)) == list(range(low, high))
+        with pytest.raises(ValueError):
+            gen(1)
+
+    def test_random_access_and_state(self):
+        gen = UniqueIntegerGenerator(0, 10**9, seed=42)
+        state = gen.get_state()
+        samples = gen(100)
+        assert gen.generate_range(50, 100) == samples[50:]
+        assert tuple(gen.permute([0, 99])) == (samples[0], samples[99])
+        gen.set_state(state)
+        assert gen(100) == samples
+        # A generator of another seed and bit generator is restored to the saved permutation.
+        restored = UniqueIntegerGenerator(0, 10**9, bit_generator="SFC64")
+        restored.set_state(json.loads(json.dumps(state)))
+        assert restored(100) == samples and restored.bit_generator == gen.bit_generator
+
+    def test_shards(self):
+        gen = UniqueIntegerGenerator(0, 1000, seed=42)
+        first_samples = gen(100)
+        shards = gen.spawn_shards(3)
+        shards_samples = [sample for shard in shards for sample in shard(300)]
+        assert len(set(shards_samples)) == 900
+        assert set(first_samples + tuple(shards_samples)) == set(range(1000))
+
+class TestNumericDtypes:
+    @pytest.mark.parametrize("low, high, dtype", [(0, 120, "uint8"), (-5, 5, "int8"), (0, 70000, "uint32"), (-2**40, 0, "int64")])
+    def test_integer_narrowing(self, low, high, dtype):
+        gen = IntegerGenerator(low, high, dtype="auto", seed=42)
+        samples = np.asarray(gen(1000))
+        assert gen.dtype == dtype and samples.dtype == dtype
+        assert samples.min() >= low and samples.max() < high
+        assert IntegerGenerator(low, high, seed=42).dtype == "int64"
+        assert IntegerGenerator(low, high, 42)(10) == IntegerGenerator(low, high, seed=42)(10)
+
+    def test_float32(self):
+        gen = FloatGenerator(1, 1.001, dtype="float32", seed=42)
+        samples = np.asarray(gen(10000))
+        assert samples.dtype == np.float32 and samples.min() >= 1 and samples.max() < np.float32(1.001)
+        assert FloatGenerator(0, 1, dtype="auto").dtype == "float32"
+        assert FloatGenerator(10**8, 10**8 + 1, dtype="auto").dtype == "float64"
+
+    @pytest.mark.parametrize("generator_type, dtype", [(IntegerGenerator, "uint8"), (IntegerGenerator, "float32"), (FloatGenerator, "int8")])
+    def test_invalid_dtype(self, generator_type, dtype):
+        with pytest.raises(ValueError):
+            generator_type(-1, 300, dtype=dtype)
+
+class TestCorrelatedGenerator:
+    def make_generator(self):
+        return CorrelatedGenerator([("normal", 170, 10), ("integer", 1, 20), ("exponential", 2)],
+                                    [[1, 0.7, -0.4], [0.7, 1, 0], [-0.4, 0, 1]], names=["height", "quantity", "wait"], seed=42)
+
+    def test_marginals_and_correlation(self):
+        gen = self.make_generator()
+        height = np.array(gen(50000))
+        quantity, wait = (np.array(output(50000)) for output in gen.outputs[1:])
+        assert abs(height.mean() - 170) < 0.5 and abs(wait.mean() - 2) < 0.1
+        assert quantity.min() == 1 and quantity.max() == 19
+        assert 0.6 < np.corrcoef(height, quantity)[0, 1] < 0.75
+        assert -0.4 < np.corrcoef(height, wait)[0, 1] < -0.2
+        with pytest.raises(ValueError):
+            gen.outputs[1](10)
+
+    def test_generate_range(self):
+        gen = self.make_generator()
+        full = [output.generate_range(0, 5000, 1024) for output in gen.outputs]
+        part = [output.generate_range(3000, 5000, 1024) for output in gen.outputs]
+        assert [column[3000:] for column in full] == part
+
+    @pytest.mark.parametrize("correlation", [[[1, 2], [2, 1]], [[1, 0.5], [0.4, 1]], [[1, 0], [0, 1], [0, 0]]])
+    def test_invalid_correlation(self, correlation):
+        with pytest.raises(ValueError):
+            CorrelatedGenerator([("normal", 0, 1), ("uniform", 0, 1)], correlation)
+
+class TestUniquenessTracker:
+    def test_generate_unique_across_calls(self):
+        gen = IntegerGenerator(0, 1000, seed=3)
+        with UniquenessTracker() as tracker:
+            samples = np.concatenate([gen.generate_unique(300, tracker) for _ in range(3)])
+            assert len(np.unique(samples)) == 900 and len(tracker) == 900
+            with pytest.raises(IndexError):
+                gen.generate_unique(200, tracker)
+
+    def test_hash_values(self):
+        assert len(np.unique(hash_values(["a", "ab", "abc", "b", "ba", "a" * 40]))) == 6
+        assert (hash_values(["ab", "xyz"])[0] == hash_values(["ab"])[0])
+        assert (hash_values([0.0]) == hash_values([-0.0])).all()
+
+    def test_spill_and_bloom(self, tmp_path):
+        gen = PatternGenerator(default_format="a{8}", seed=42)
+        tracker = UniquenessTracker(spill_dir=str(tmp_path), memory_keys=500)
+        for _ in range(10):
+            gen.generate_unique(200, tracker)
+        assert len(tracker) == 2000 and os.listdir(tracker._spill_dir)
+        assert tracker.check_and_add(["known", "known", "other"]).tolist() == [True, False, True]
+        assert tracker.contains(["known", "unknown"]).tolist() == [True, False]
+        tracker.close()
+        assert os.listdir(str(tmp_path)) == []
+
+        bloom = UniquenessTracker("bloom", capacity=10000, error_rate=0.01)
+        bloom.add(np.arange(10000))
+        assert bloom.contains(np.arange(10000)).all()
+        assert bloom.contains(np.arange(10000, 30000)).mean() < 0.03
+
+
+class TestDateGenerator:
+    def test_ordered_chunks(self):
+        gen = DateGenerator("1-1-2021", "1-1-2022", default_format="%Y-%m-%d %H:%M:%S", ordered=True, rate=1 / 60, seed=42)
+        dates = gen(1000, steps="s")
+        state = gen.get_state()
+        next_dates = gen(1000, steps="s")
+        assert list(dates + next_dates) == sorted(dates + next_dates)
+        gen.set_state(state)
+        assert gen(1000, steps="s") == next_dates
+
+    def test_diurnal_profile(self):
+        profile = [0] * 12 + [1] * 12
+        gen = DateGenerator("1-1-2021", "1-1-2022", default_format="%H", ordered=True, rate=1 / 60, diurnal_profile=profile, seed=42)
+        assert all(int(hour) >= 12 for hour in gen(5000, steps="s"))
+
+    def test_ordered_errors(self):
+        with pytest.raises(ValueError):
+            DateGenerator("1-1-2021", "2-1-2021", ordered=True)
+        with pytest.raises(ValueError):
+            DateGenerator("1-1-2021", "2-1-2021", diurnal_profile=[1] * 24)
+        gen = DateGenerator("1-1-2021", "2-1-2021", ordered=True, rate=1)
+        with pytest.raises(ValueError):
+            gen(10**6)
+        with pytest.raises(ValueError):
+            gen.generate_range(0, 10)
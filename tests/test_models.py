@@ -0,0 +1,588 @@
+import asyncio
+import functools
+import json
+import pickle
+import os
+import socket
+import threading
+import time
+import io
+import pytest
+import numpy as np
+import pandas as pd
+from makedata.data_generators.numeric_generators.PrimitveNumerics import *
+from makedata.models.BaseModels import BaseModel
+from makedata.models.ModelFormats import ModelFormats
+from makedata.models.ModelCache import ModelCache
+from makedata.data_generators.formatted_generators.NameGenerator import NameGenerator
+from makedata.data_generators.formatted_generators.DateGenerator import DateGenerator
+from makedata.data_generators.derived_generators.DerivedGenerator import DerivedGenerator
+from makedata.data_generators.numeric_generators.UniqueNumerics import UniqueIntegerGenerator
+from makedata.data_generators.numeric_generators.CorrelatedNumerics import CorrelatedGenerator
+from makedata.models.Schema import Schema
+from makedata.CommandLine import main, load_model
+from makedata.models.ModelSpecs import compile_spec, GenerationPlan
+from makedata.data_generators.SharedSources import SharedPool
+from makedata.Instrumentation import instrument, MetricsRegistry
+from makedata.models.LoadGeneration import RateProfile
+
+class TestBaseModel:
+    def test_generators_seeded_independently(self):
+        model = BaseModel([IntegerGenerator(0, 1000, name="a"), IntegerGenerator(0, 1000, name="b")], seed=42)
+        data = model(10, return_type=ModelFormats.DICT, split_samples=False)
+        assert data["a"] != data["b"]
+
+    def test_seed_reproducible(self):
+        make_model = lambda: BaseModel([IntegerGenerator(0, 1000, name="a"), FloatGenerator(0, 1, name="b")], seed=42)
+        assert make_model()(10) == make_model()(10)
+
+    def test_reset_seeds(self):
+        model = BaseModel([IntegerGenerator(0, 1000, name="a"), FloatGenerator(0, 1, name="b")], seed=42)
+        first = model(10)
+        model.reset_seeds(42)
+        assert model(10) == first
+
+    def test_bit_generator(self):
+        model = BaseModel([IntegerGenerator(0, 1000, name="a")], seed=42, bit_generator="SFC64")
+        assert model.gens_dict["a"].random_generator.bit_generator.__class__.__name__ == "SFC64"
+        with pytest.raises(ValueError):
+            IntegerGenerator(0, 1000, bit_generator="NotABitGenerator")
+
+    def test_spawn_shards(self):
+        gen = IntegerGenerator(0, 1000, seed=42)
+        first, second = gen.spawn_shards(2)
+        assert first(10) != second(10)
+        assert [shard(10) for shard in IntegerGenerator(0, 1000, seed=42).spawn_shards(2)] == \
+                [shard(10) for shard in IntegerGenerator(0, 1000, seed=42).spawn_shards(2)]
+
+    def test_state_roundtrip(self):
+        model = BaseModel([IntegerGenerator(0, 1000, name="a"), FloatGenerator(0, 1, name="b")], seed=42, bit_generator="Philox")
+        state = model.get_state()
+        first = model(10)
+        model.set_state(state)
+        assert model(10) == first
+        assert model.rows_generated == 10
+
+    def test_resume_chunks(self, tmp_path):
+        make_model = lambda: BaseModel([IntegerGenerator(0, 1000, name="a"), FloatGenerator(0, 1, name="b")], seed=42)
+        uninterrupted = list(make_model().iter_chunks(25, 10))
+
+        checkpoint_path = str(tmp_path / "checkpoint.json")
+        interrupted = make_model().iter_chunks(25, 10, checkpoint_path=checkpoint_path)
+        written = [next(interrupted), next(interrupted)]
+        interrupted.close()
+        # Only the first chunk was checkpointed, the second one is discarded and generated again.
+        resumed = written[:1] + list(make_model().iter_chunks(25, 10, checkpoint_path=checkpoint_path))
+        assert resumed == uninterrupted
+
+class TestModelCache:
+    @staticmethod
+    def make_model():
+        return BaseModel([NameGenerator(locale="en_INTER", default_format_name="ffl", name="name"), IntegerGenerator(0, 100, name="age")], seed=42)
+
+    def test_hit_matches_generation(self, tmp_path):
+        cache = ModelCache(str(tmp_path))
+        uncached_model = self.make_model()
+        expected = [uncached_model(5), uncached_model(5)]
+
+        first_model = self.make_model()
+        assert [first_model(5, cache=cache), first_model(5, cache=cache)] == expected
+        second_model = self.make_model()
+        assert [second_model(5, cache=cache), second_model(5, cache=cache)] == expected
+        assert second_model.rows_generated == 10
+        assert cache.stats()["hits"] == 2 and cache.stats()["misses"] == 2
+
+    def test_lru_eviction(self, tmp_path):
+        cache = ModelCache(str(tmp_path), max_size=1)
+        model = self.make_model()
+        model(5, cache=cache)
+        model(5, cache=cache)
+        assert cache.stats()["entries"] == 0 and cache.evictions == 2
+
+    def test_functions_are_part_of_key(self, tmp_path):
+        cache = ModelCache(str(tmp_path))
+        def make_model(function):
+            return BaseModel([IntegerGenerator(0, 100, name="a"), DerivedGenerator(function, ["a"], name="b")], seed=1)
+
+        doubled = make_model(lambda rng, a: a * 2)(5, split_samples=False, cache=cache)
+        shifted = make_model(lambda rng, a: a + 100)(5, split_samples=False, cache=cache)
+        assert cache.hits == 0 and min(shifted["b"]) >= 100
+        assert make_model(lambda rng, a: a * 2)(5, split_samples=False, cache=cache) == doubled and cache.hits == 1
+
+class TestIncrementalGeneration:
+    @staticmethod
+    def make_model():
+        return BaseModel([NameGenerator(locale="en_INTER", default_format_name="ffl", name="name"), IntegerGenerator(0, 100, name="age")],
+                            seed=42, block_size=16)
+
+    def test_range_matches_single_call(self):
+        model = self.make_model()
+        whole = model.generate_range(0, 50)
+        assert {**model.generate_range(0, 20), **model.generate_range(20, 50)} == whole
+
+    @pytest.mark.parametrize("return_type", [ModelFormats.SAVE_CSV, ModelFormats.SAVE_NDJSON])
+    def test_append(self, tmp_path, return_type):
+        whole_path, appended_path = str(tmp_path / "whole"), str(tmp_path / "appended")
+        self.make_model().generate_range(0, 50, return_type=return_type, save_path=whole_path)
+
+        model = self.make_model()
+        model.append(20, appended_path, return_type=return_type)
+        model.append(30, appended_path, return_type=return_type)
+        with open(whole_path) as whole, open(appended_path) as appended:
+            assert whole.read() == appended.read()
+
+    def test_range_counts_its_samples(self):
+        gen = IntegerGenerator(0, 100, seed=1)
+        with instrument() as registry:
+            assert len(gen.generate_range(3, 10, 4)) == 7
+        assert gen.samples_generated == 7 and registry.counters[(gen.name, "samples")] == 7
+
+class TestDependentColumns:
+    def make_model(self, **kwargs):
+        total = DerivedGenerator(lambda rng, prices, quantities: prices * quantities, inputs=["price", "quantity"], name="total")
+        noisy = DerivedGenerator(lambda rng, totals: totals + rng.integers(0, 2, size=len(totals)), inputs=["total"], name="noisy")
+        return BaseModel([noisy, total, IntegerGenerator(1, 100, name="price"), IntegerGenerator(1, 5, name="quantity")], seed=42, **kwargs)
+
+    def test_dependency_order(self):
+        model = self.make_model()
+        assert model.generation_levels == (("price", "quantity"), ("total",), ("noisy",))
+        data = model(100, split_samples=False)
+        assert list(data) == ["noisy", "total", "price", "quantity"]
+        assert all(t == p * q for t, p, q in zip(data["total"], data["price"], data["quantity"]))
+        assert all(0 <= n - t <= 1 for n, t in zip(data["noisy"], data["total"]))
+
+    def test_concurrent_and_range(self):
+        data = self.make_model()(100, split_samples=False)
+        assert self.make_model(max_workers=4)(100, split_samples=False) == data
+        model = self.make_model(block_size=16)
+        full = model.generate_range(0, 50, split_samples=False)
+        part = model.generate_range(20, 37, split_samples=False)
+        assert all(full[name][20:37] == part[name] for name in full)
+
+    def test_invalid_inputs(self):
+        with pytest.raises(ValueError):
+            BaseModel([DerivedGenerator(lambda rng, x: x, inputs=["missing"], name="a")])
+        with pytest.raises(ValueError):
+            BaseModel([DerivedGenerator(lambda rng, x: x, inputs=["b"], name="a"), DerivedGenerator(lambda rng, x: x, inputs=["a"], name="b")])
+
+class TestSchema:
+    def make_schema(self, skew=0.0):
+        schema = Schema()
+        users = BaseModel([UniqueIntegerGenerator(0, 10**9, name="user_id"), IntegerGenerator(18, 80, name="age")], seed=1, block_size=64)
+        schema.add_table("users", users, rows=500, index_key="user_id")
+        orders = BaseModel([UniqueIntegerGenerator(0, 10**9, name="order_id"), schema.foreign_key("users", skew=skew, name="user_id")], seed=2)
+        schema.add_table("orders", orders, rows=5000, index_key="order_id")
+        return schema
+
+    @pytest.mark.parametrize("skew", [0.0, 1.0, 1.5])
+    def test_referential_integrity(self, tmp_path, skew):
+        paths = self.make_schema(skew).export(str(tmp_path), chunk_size=300)
+        users = pd.read_csv(paths["users"])
+        orders = pd.read_csv(paths["orders"])
+        assert len(users) == 500 and users["user_id"].is_unique
+        assert len(orders) == 5000 and orders["user_id"].isin(users["user_id"]).all()
+
+    def test_skewed_fan_out(self):
+        uniform = pd.Series(self.make_schema(0.0).foreign_key("users", seed=3)(5000))
+        skewed = pd.Series(self.make_schema(1.5).foreign_key("users", skew=1.5, seed=3)(5000))
+        assert skewed.value_counts().iloc[0] > 5 * uniform.value_counts().iloc[0]
+
+    def test_materialized_key(self):
+        schema = Schema()
+        people = BaseModel([NameGenerator(locale="en_INTER", default_format_name="ffl", name="name")], seed=3)
+        schema.add_table("people", people, rows=50, index_key="name")
+        names = set(people.generate_range(0, 50, split_samples=False)["name"])
+        assert set(schema.foreign_key("people", seed=4)(1000)) <= names
+        with pytest.raises(ValueError):
+            schema.foreign_key("missing")
+        people.add_constraint(lambda columns: columns["name"] != "")
+        with pytest.raises(ValueError):
+            Schema().add_table("people", people, rows=50)
+        events = BaseModel([DateGenerator("1-1-2021", "1-1-2022", ordered=True, rate=1, name="time")], seed=3)
+        with pytest.raises(ValueError):
+            Schema().add_table("events", events, rows=50)
+
+class TestAsyncGeneration:
+    def make_model(self):
+        return BaseModel([IntegerGenerator(0, 1000, name="a"), FloatGenerator(0, 1, name="b")], seed=42)
+
+    def test_same_as_sync(self):
+        async def generate():
+            return (await self.make_model().agenerate(50, split_samples=False),
+                    await self.make_model().agenerate(50, split_samples=False, chunk_size=20),
+                    [chunk async for chunk in self.make_model().aiter_chunks(50, 20, split_samples=False)])
+        single, chunked, chunks = asyncio.run(generate())
+        sync_chunks = list(self.make_model().iter_chunks(50, 20, split_samples=False))
+        assert single == self.make_model()(50, split_samples=False)
+        assert chunks == sync_chunks
+        assert chunked == {name: sum((chunk[name] for chunk in sync_chunks), tuple()) for name in chunked}
+
+    def test_cancellation_between_chunks(self):
+        model = self.make_model()
+        async def generate_and_cancel():
+            task = asyncio.create_task(model.agenerate(10**6, split_samples=False, chunk_size=10**4))
+            # Let the task start it's first chunk.
+            await asyncio.sleep(0)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+        asyncio.run(generate_and_cancel())
+        assert model.rows_generated == 10**4
+
+class TestCommandLine:
+    SPEC = "from makedata.models.BaseModels import BaseModel\n" \
+           "from makedata.data_generators.numeric_generators.UniqueNumerics import UniqueIntegerGenerator\n" \
+           "from makedata.data_generators.numeric_generators.PrimitveNumerics import IntegerGenerator\n" \
+           "from makedata.data_generators.formatted_generators.NameGenerator import NameGenerator\n" \
+           "def people():\n" \
+           "    return BaseModel([UniqueIntegerGenerator(0, 10**9, name='id'), NameGenerator(locale='en_INTER', default_format_name='ffl', name='name')], seed=3)\n" \
+           "def children():\n" \
+           "    return BaseModel([UniqueIntegerGenerator(0, 10**9, name='id'), IntegerGenerator(0, 100, name='age')], seed=3,\n" \
+           "                     constraints=[lambda columns: columns['age'] < 18])\n" \
+           "from makedata.data_generators.formatted_generators.DateGenerator import DateGenerator\n" \
+           "def events():\n" \
+           "    return BaseModel([IntegerGenerator(0, 100, name='user'),\n" \
+           "                      DateGenerator('1-1-2021', '1-1-2022', default_format='%Y-%m-%d %H:%M:%S', ordered=True, rate=1, name='time')], seed=3)\n"
+
+    @pytest.fixture
+    def spec(self, tmp_path, monkeypatch):
+        (tmp_path / "cli_people_spec.py").write_text(self.SPEC)
+        monkeypatch.syspath_prepend(str(tmp_path))
+        return "cli_people_spec:people"
+
+    def test_same_output_for_any_chunking(self, spec, tmp_path):
+        outputs = []
+        for chunk_size, workers in [(1000, 1), (70, 1), (130, 2)]:
+            path = tmp_path / f"people_{chunk_size}.csv"
+            assert main([spec, "-n", "1000", "-c", str(chunk_size), "-w", str(workers), "-i", "id", "-o", str(path), "-q"]) == 0
+            outputs.append(path.read_text())
+        assert outputs[0] == outputs[1] == outputs[2]
+        data = pd.read_csv(tmp_path / "people_1000.csv", index_col="id")
+        assert len(data) == 1000 and data.index.is_unique
+
+    def test_ndjson_and_report(self, spec, capsys):
+        main([spec, "-n", "5", "-f", "ndjson", "--seed", "7"])
+        captured = capsys.readouterr()
+        assert len(pd.read_json(io.StringIO(captured.out), lines=True)) == 5
+        assert "rows/sec" in captured.err and "seed 7" in captured.err
+
+    def test_constrained_model(self, spec, tmp_path):
+        path = tmp_path / "children.csv"
+        assert main(["cli_people_spec:children", "-n", "300", "-c", "70", "-i", "id", "-o", str(path), "-q"]) == 0
+        data = pd.read_csv(path, index_col="id")
+        assert len(data) == 300 and (data["age"] < 18).all()
+        with pytest.raises(SystemExit):
+            main(["cli_people_spec:children", "-n", "300", "-w", "2", "-o", str(path), "-q"])
+
+    def test_ordered_dates_model(self, spec, tmp_path):
+        path = tmp_path / "events.csv"
+        assert main(["cli_people_spec:events", "-n", "300", "-c", "70", "-o", str(path), "-q"]) == 0
+        data = pd.read_csv(path)
+        assert len(data) == 300 and data["time"].is_monotonic_increasing
+        with pytest.raises(SystemExit):
+            main(["cli_people_spec:events", "-n", "300", "-w", "2", "-o", str(path), "-q"])
+
+    def test_invalid_spec(self, spec):
+        with pytest.raises(SystemExit):
+            main(["cli_people_spec", "-n", "5"])
+        with pytest.raises(ValueError):
+            load_model("makedata.models.ModelFormats:ModelFormats.DICT")
+
+class TestModelSpecs:
+    SPEC = {"name": "people", "seed": 42, "index_key": "id",
+            "generators": [{"type": "UniqueIntegerGenerator", "name": "id", "low": 0, "high": 10**9},
+                           {"type": "NameGenerator", "name": "name", "locale": "en_INTER", "default_format_name": "ffl",
+                            "formats": {"last_only": "{last_names}"}},
+                           {"type": "DerivedGenerator", "name": "email", "inputs": ["name"],
+                            "function": {"import": "tests.test_models:make_email"}}]}
+
+    def test_compiled_once_and_reusable(self):
+        plan = compile_spec(self.SPEC)
+        assert compile_spec(dict(self.SPEC)) is plan
+        first, second = plan.model(), plan.model()
+        assert first(10, index_key=plan.index_key) == second(10, index_key=plan.index_key)
+        assert plan.model().gens_dict["name"].get_format("last_only") == "{last_names}"
+
+    def test_toml_and_json_files(self, tmp_path):
+        (tmp_path / "people.json").write_text(json.dumps(self.SPEC))
+        (tmp_path / "people.toml").write_text('seed = 42\nindex_key = "id"\n\n[[generators]]\ntype = "UniqueIntegerGenerator"\nname = "id"\nlow = 0\nhigh = 1_000_000_000\n\n'
+                                              '[[generators]]\ntype = "NameGenerator"\nname = "name"\nlocale = "en_INTER"\ndefault_format_name = "ffl"\n'
+                                              '\n[generators.formats]\nlast_only = "{last_names}"\n')
+        json_plan, toml_plan = compile_spec(str(tmp_path / "people.json")), compile_spec(str(tmp_path / "people.toml"))
+        assert json_plan.model()(10, split_samples=False)["name"] == toml_plan.model()(10, split_samples=False)["name"]
+
+    def test_pickled_plan(self):
+        cached = compile_spec(self.SPEC)
+        plan = cached.copy()
+        assert plan.digest == cached.digest and plan.index_key == cached.index_key
+        plan.share_data()
+        try:
+            assert not any(isinstance(pool, SharedPool) for pool in cached._model.gens_dict["name"].data.values())
+            unpickled = pickle.loads(pickle.dumps(plan))
+            assert unpickled.digest == plan.digest
+            assert unpickled.model()(20) == plan.model()(20) == cached.model()(20)
+            del unpickled
+        finally:
+            plan.unshare_data()
+        assert plan.model()(5)
+
+    def test_invalid_spec(self):
+        with pytest.raises(ValueError):
+            compile_spec({"generators": [{"type": "NotAGenerator"}]})
+        with pytest.raises(ValueError):
+            compile_spec({"generators": [{"type": "IntegerGenerator", "lower": 0}]})
+        with pytest.raises(ValueError):
+            compile_spec({"generators": [{"type": "IntegerGenerator", "low": 0, "high": 5, "name": "a"}], "index_key": "b"})
+
+    def test_partial_constraints_digest(self):
+        def make_plan(low):
+            return GenerationPlan(BaseModel([IntegerGenerator(0, 100, name="a")], seed=1, constraints=[functools.partial(at_least, name="a", low=low)]))
+        assert make_plan(10).digest == make_plan(10).digest != make_plan(20).digest
+
+    def test_command_line(self, tmp_path):
+        (tmp_path / "people.json").write_text(json.dumps(self.SPEC))
+        main([str(tmp_path / "people.json"), "-n", "300", "-c", "70", "-o", str(tmp_path / "people.csv"), "-q"])
+        data = pd.read_csv(tmp_path / "people.csv", index_col="id")
+        sources = dict(compile_spec(self.SPEC)._model.gens_dict["name"].data)
+        main([str(tmp_path / "people.json"), "-n", "300", "-c", "70", "-w", "2", "-o", str(tmp_path / "people_workers.csv"), "-q"])
+        assert compile_spec(self.SPEC)._model.gens_dict["name"].data == sources
+        assert data.equals(pd.read_csv(tmp_path / "people_workers.csv", index_col="id"))
+        assert len(data) == 300 and (data["email"] == data["name"].apply(lambda name: name.lower().replace(" ", ".") + "@example.com")).all()
+
+
+def at_least(columns, name, low):
+    return columns[name] >= low
+
+
+def make_email(random_generator, names):
+    return np.char.add(np.char.replace(np.char.lower(np.asarray(names, dtype=str)), " ", "."), "@example.com")
+
+
+class TestInstrumentation:
+    def make_model(self):
+        return BaseModel([NameGenerator(locale="en_INTER", default_format_name="ffl", name="name"), IntegerGenerator(0, 100, name="age")], seed=42, name="people")
+
+    def test_phases_and_sinks(self, tmp_path):
+        path = str(tmp_path / "people.csv")
+        with instrument() as registry:
+            self.make_model()(500, return_type=ModelFormats.SAVE_CSV, save_path=path)
+        snapshot = registry.snapshot()
+        assert {"sampling", "formatting", "total"} <= set(snapshot["name"]["timings"])
+        assert {"sampling", "conversion", "total"} <= set(snapshot["age"]["timings"])
+        assert set(snapshot["people"]["timings"]) == {"generation", "output", "total"}
+        assert snapshot["name"]["counters"]["samples"] == snapshot["people"]["counters"]["rows"] == 500
+        assert snapshot[path]["counters"] == {"rows": 500, "bytes": os.path.getsize(path)}
+        assert json.loads(registry.report("json")) == snapshot
+        assert "people" in registry.report()
+
+    def test_disabled_and_callbacks(self):
+        model = self.make_model()
+        registry = MetricsRegistry(trace_memory=True)
+        events = []
+        registry.subscribe(lambda *event: events.append(event))
+        model(10)
+        assert not events and not registry.snapshot()
+        with instrument(registry):
+            data = BaseModel([NameGenerator(locale="en_INTER", default_format_name="ffl", name="name")], seed=42, name="people")(100, return_type=ModelFormats.JSON)
+        assert ("JSON", "count", "bytes", len(data.encode("utf-8"))) in events
+        assert registry.memory_peaks["people"] > 0
+        assert self.make_model()(10) == BaseModel([NameGenerator(locale="en_INTER", default_format_name="ffl", name="name"),
+                                                   IntegerGenerator(0, 100, name="age")], seed=42)(10)
+
+
+class TestLoadGeneration:
+    def make_model(self):
+        return BaseModel([NameGenerator(locale="en_INTER", default_format_name="ffl", name="name"), IntegerGenerator(0, 100, name="age")], seed=42)
+
+    def test_rate_profile(self):
+        profile = RateProfile([(60, 100, 5000), (600, 5000), (30, 5000, 0)])
+        assert profile.rows_by(60) == 153000
+        assert profile.total_rows == 153000 + 3000000 + 75000
+        assert profile.rate_at(30) == 2550 and profile.rate_at(1000) == 0
+        with pytest.raises(ValueError):
+            RateProfile([(0, 100)])
+
+    def test_paced_file_stream(self, tmp_path):
+        path = str(tmp_path / "stream.ndjson")
+        model = self.make_model()
+        report = model.stream(RateProfile([(0.2, 0, 2000), (0.2, 2000)]), path)
+        assert report.rows == report.target_rows == 600
+        # The last rows are due at the end of the profile, so they can't be emitted before it.
+        assert report.elapsed >= 0.4 - 0.01
+        expected = self.make_model().generate_range(0, 600, split_samples=False)
+        assert pd.read_json(path, lines=True)["name"].tolist() == list(expected["name"])
+        assert model.stream_position == 600
+        with pytest.raises(ValueError):
+            model.stream(100, path)
+
+    def test_socket_and_backpressure(self, tmp_path):
+        address = str(tmp_path / "load.sock")
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(address)
+        server.listen(1)
+        received = []
+        def consume():
+            connection = server.accept()[0]
+            with connection, connection.makefile("r", encoding="utf-8") as lines:
+                received.extend(lines)
+        consumer = threading.Thread(target=consume)
+        consumer.start()
+        report = self.make_model().stream(1000, f"unix://{address}", duration=0.2)
+        consumer.join()
+        server.close()
+        assert len(received) == report.rows == 200
+
+        emitted = []
+        def slow_callback(rows):
+            # The first tick blocks, unless it was so late that all the rows were due in it.
+            if not emitted and len(rows) < 500:
+                time.sleep(0.2)
+            emitted.extend(rows)
+        report = self.make_model().stream(1000, slow_callback, duration=0.5, catch_up=False)
+        assert len(emitted) == 500 and (report.stalled > 0.1 or report.ticks == 1)
+        # The schedule is pushed back by the stall, so the last rows are due after it.
+        assert report.elapsed >= 0.5 + report.stalled - 0.01
+        assert set(emitted[0]) == {"name", "age"}
+
+    def test_constrained_stream(self):
+        model = self.make_model()
+        model.add_constraint(lambda columns: columns["age"] >= 50)
+        emitted = []
+        report = model.stream(1000, emitted.extend, duration=0.1)
+        assert report.rows == len(emitted) == 100 and all(row["age"] >= 50 for row in emitted)
+
+    def test_ordered_dates_stream(self):
+        model = BaseModel([IntegerGenerator(0, 100, name="user"),
+                           DateGenerator("1-1-2021", "1-1-2022", default_format="%Y-%m-%d %H:%M:%S", ordered=True, rate=1, name="time")], seed=42)
+        assert not model.position_addressable
+        emitted = []
+        report = model.stream(10000, emitted.extend, duration=0.05)
+        times = [row["time"] for row in emitted]
+        assert report.rows == len(emitted) == 500 and times == sorted(times)
+
+    def test_interrupted_stream_position(self):
+        model = self.make_model()
+        emitted = []
+        def failing_sink(rows):
+            if emitted:
+                raise ConnectionError("The sink is gone.")
+            emitted.extend(rows)
+        with pytest.raises(ConnectionError):
+            model.stream(10000, failing_sink, duration=0.5, batch_size=50)
+        # Only the emitted rows are consumed, the stream continues from the first row that wasn't emitted.
+        assert model.stream_position == len(emitted)
+        rest = []
+        model.stream(10000, rest.extend, duration=0.01)
+        expected = self.make_model().generate_range(len(emitted), len(emitted) + 100, split_samples=False)
+        assert [row["name"] for row in rest] == list(expected["name"])
+
+
+class TestConstraints:
+    def make_model(self):
+        return BaseModel([IntegerGenerator(0, 100, name="start"), IntegerGenerator(0, 100, name="end"),
+                            NameGenerator(locale="en_INTER", default_format_name="ffl", name="name")],
+                            seed=7, constraints=[lambda columns: columns["end"] > columns["start"] + 50])
+
+    def test_rows_follow_constraints(self):
+        model = self.make_model()
+        data = model(2000, split_samples=False)
+        start, end = np.array(data["start"]), np.array(data["end"])
+        assert len(start) == 2000 and (end > start + 50).all()
+        assert 0.05 < model.acceptance_rate < 0.2
+        data = model(500, index_key="name", split_samples=False)
+        assert len(set(data["name"])) == 500
+        with pytest.raises(ValueError):
+            model.generate_range(0, 10)
+
+    def test_resume_and_impossible_constraints(self, tmp_path):
+        model = self.make_model()
+        model(100)
+        state = json.loads(json.dumps(model.get_state()))
+        expected = model(100)
+        resumed = self.make_model()
+        resumed.set_state(state)
+        assert resumed(100) == expected
+
+        model.add_constraint(lambda columns: columns["start"] > 1000)
+        with pytest.raises(ValueError):
+            model(10)
+        model.constraints[-1] = lambda columns: columns["start"]
+        with pytest.raises(ValueError):
+            model(10)
+
+    def test_cache_keyed_by_constraint(self, tmp_path):
+        cache = ModelCache(str(tmp_path))
+        low = BaseModel([IntegerGenerator(0, 100, name="a")], seed=1, constraints=[lambda columns: columns["a"] < 50])(5, split_samples=False, cache=cache)
+        high = BaseModel([IntegerGenerator(0, 100, name="a")], seed=1, constraints=[lambda columns: columns["a"] >= 50])(5, split_samples=False, cache=cache)
+        assert cache.hits == 0 and max(low["a"]) < 50 <= min(high["a"])
+
+
+class TestUniqueColumns:
+    def test_unique_across_chunks(self):
+        model = BaseModel([IntegerGenerator(0, 5000, name="id"), IntegerGenerator(0, 100, name="start"), IntegerGenerator(0, 100, name="end")],
+                            seed=3, constraints=[lambda columns: columns["end"] > columns["start"]])
+        tracker = model.track_unique("id")
+        chunks = list(model.iter_chunks(3000, 1000, return_type=ModelFormats.DF))
+        data = pd.concat(chunks)
+        assert data["id"].is_unique and len(data) == 3000 and len(tracker) == 3000
+        assert (data["end"] > data["start"]).all()
+        with pytest.raises(ValueError):
+            model(3000)
+        assert len(tracker) == 3000
+
+    def test_unique_with_index_key(self):
+        model = BaseModel([IntegerGenerator(0, 12, name="idx"), IntegerGenerator(0, 400, name="value")], seed=1)
+        tracker = model.track_unique("value")
+        values = []
+        for _ in range(20):
+            data = model(10, index_key="idx", drop_index=False, split_samples=False)
+            assert len(set(data["idx"])) == 10
+            values += list(data["value"])
+        assert len(set(values)) == 200 and len(tracker) == 200 and tracker.contains(np.array(values)).all()
+
+    def test_unsupported_generation(self, tmp_path):
+        model = BaseModel([IntegerGenerator(0, 100, name="id")], seed=1)
+        with pytest.raises(ValueError):
+            model.track_unique("missing")
+        model.track_unique("id", mode="bloom", capacity=100)
+        with pytest.raises(ValueError):
+            model.generate_range(0, 10)
+        with pytest.raises(ValueError):
+            model(10, cache=ModelCache(str(tmp_path)))
+
+
+class TestCorrelatedColumns:
+    def test_correlated_columns_in_model(self):
+        body = CorrelatedGenerator([("normal", 170, 10), ("lognormal", 4.2, 0.15)], [[1, 0.9], [0.9, 1]], names=["height", "weight"])
+        model = BaseModel([IntegerGenerator(0, 5, name="group"), *body.outputs], seed=42)
+        data = model(20000, return_type=ModelFormats.DF)
+        assert list(data.columns) == ["group", "height", "weight"]
+        assert data["height"].corr(data["weight"]) > 0.85
+        stream = model.generate_range(0, 3000, split_samples=False)
+        assert model.generate_range(1000, 3000, split_samples=False)["weight"] == stream["weight"][1000:]
+
+
+class TestColumnDtypes:
+    def make_model(self):
+        return BaseModel([IntegerGenerator(0, 120, dtype="auto", name="age"), IntegerGenerator(-5, 5, dtype="int8", name="delta"),
+                            FloatGenerator(0, 1, dtype="float32", name="score")], seed=42)
+
+    def test_output_formats(self, tmp_path):
+        model = self.make_model()
+        assert model(10, return_type=ModelFormats.DF).dtypes.tolist() == [np.uint8, np.int8, np.float32]
+        assert np.asarray(model(10, split_samples=False)["score"]).dtype == np.float32
+        data = json.loads(model(10, return_type=ModelFormats.JSON))
+        assert all(-5 <= row["delta"] < 5 and len(repr(row["score"])) < 12 for row in data.values())
+        path = str(tmp_path / "rows.ndjson")
+        model.generate_range(0, 100, return_type=ModelFormats.SAVE_NDJSON, save_path=path)
+        assert pd.read_json(path, lines=True)["age"].max() < 120
+
+    def test_cache_keeps_dtypes(self, tmp_path):
+        cache = ModelCache(str(tmp_path))
+        model = self.make_model()
+        state = model.get_state()
+        generated = model(50, split_samples=False, cache=cache)
+        model.set_state(state)
+        loaded = model(50, split_samples=False, cache=cache)
+        assert cache.hits == 1 and loaded == generated
+        assert [np.asarray(column).dtype for column in loaded.values()] == [np.uint8, np.int8, np.float32]